@@ -1,6 +1,6 @@
 ﻿from fastapi import APIRouter
 
-from app.api.v1 import accounts, profiles, analytics, scraper
+from app.api.v1 import accounts, profiles, analytics, scraper, batch
 
 router = APIRouter(prefix="/api/v1")
 
@@ -9,3 +9,4 @@ router.include_router(accounts.router, prefix="/accounts", tags=["accounts"])
 router.include_router(profiles.router, prefix="/profiles", tags=["profiles"])
 router.include_router(analytics.router, prefix="/analytics", tags=["analytics"])
 router.include_router(scraper.router, prefix="/scraper", tags=["scraper"])
+router.include_router(batch.router, prefix="/batch", tags=["batch"])
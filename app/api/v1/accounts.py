@@ -1,33 +1,109 @@
-from typing import List, Dict
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from typing import List, Dict, Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Response
+from sqlalchemy.orm import Session, sessionmaker
 
+from app.core.utils.cursors import NEXT_CURSOR_HEADER, encode_cursor, decode_cursor
 from app.db.session import get_db
 from app.models.account import InstagramAccount
-from app.services.account_service import get_accounts, delete_account
+from app.schemas.account import BulkAccountsRequest
+from app.services.account_service import get_accounts, delete_account, delete_accounts
 from app.services.scraper_service import delete_account as delete_account_from_scraper
+from app.services.scraper_service import delete_accounts as delete_accounts_from_scraper
 from app.services.cache import clear_cache_pattern
+from app.services.profile_service import refresh_summary_cache
+from app.services.purge_service import create_purge_job, get_purge_job, run_purge_job
 
 router = APIRouter()
 
 @router.get("/", response_model=List[dict])
-async def read_accounts(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+async def read_accounts(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = Query(None, description="Page token from the X-Next-Cursor header of the previous page"),
+    db: Session = Depends(get_db)
+):
     """
     Retrieve all tracked Instagram accounts.
+    
+    When a page is full, the X-Next-Cursor response header holds the token
+    for the next page.
     """
-    accounts = get_accounts(db, skip=skip, limit=limit)
+    after_id = None
+    if cursor:
+        try:
+            after_id = int(decode_cursor(cursor)["id"])
+        except (ValueError, KeyError, TypeError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    
+    accounts = get_accounts(db, skip=skip, limit=limit, after_id=after_id)
+    if accounts and len(accounts) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor({"id": accounts[-1]["id"]})
     return accounts
 
+def _schedule_purge(background_tasks: BackgroundTasks, db: Session, accounts: List[Dict]) -> Dict:
+    """
+    Create a purge job for deleted accounts and run it after the response is sent.
+    """
+    job = create_purge_job(accounts)
+    # The job runs outside the request, so it gets its own sessions on the same engine
+    background_tasks.add_task(run_purge_job, job["job_id"], sessionmaker(bind=db.get_bind()))
+    return job
+
+@router.get("/purge-jobs/{job_id}", response_model=Dict)
+async def read_purge_job(job_id: str):
+    """
+    Get the status of a background purge job started by an account deletion.
+    """
+    job = get_purge_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Purge job {job_id} not found")
+    return job
+
+@router.delete("/", response_model=Dict)
+async def delete_accounts_endpoint(
+    request: BulkAccountsRequest,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db)
+):
+    """
+    Delete many Instagram accounts from tracking.
+    
+    Accounts are removed from the scraper service with bounded concurrency,
+    then every account the scraper deleted is marked as deleted in one
+    transaction. Their historical data is purged by a background job.
+    """
+    scraper_result = await delete_accounts_from_scraper(request.usernames)
+    
+    deleted = delete_accounts(db, scraper_result["deleted"])
+    job = _schedule_purge(background_tasks, db, deleted) if deleted else None
+    
+    # Clear all cache entries related to the deleted accounts
+    for account in deleted:
+        clear_cache_pattern(f"*{account['username']}*")
+    refresh_summary_cache()
+    
+    return {
+        "status": "success" if not scraper_result["failed"] else "partial",
+        "requested": len(set(request.usernames)),
+        "deleted": deleted,
+        "failed": scraper_result["failed"],
+        "purge_job_id": job["job_id"] if job else None
+    }
+
 @router.delete("/{username}", response_model=Dict)
 async def delete_account_endpoint(
     username: str,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
     """
     Delete an Instagram account from tracking.
     
     This permanently deletes the account and all its historical data
-    from both the scraper service and the database.
+    from both the scraper service and the database. The account is marked
+    as deleted immediately; its profile history is purged in the background
+    (see /accounts/purge-jobs/{job_id}).
     """
     # First delete from scraper service
     scraper_result = await delete_account_from_scraper(username)
@@ -46,11 +122,15 @@ async def delete_account_endpoint(
             detail=f"Account {username} not found in database"
         )
     
+    job = _schedule_purge(background_tasks, db, [db_result])
+    
     # Clear all cache entries related to this account
     clear_cache_pattern(f"*{username}*")
+    refresh_summary_cache()
     
     return {
         "status": "success",
-        "message": f"Account '{username}' and all associated profile data deleted successfully",
-        "account": db_result
+        "message": f"Account '{username}' deleted successfully; profile data purge scheduled",
+        "account": db_result,
+        "purge_job_id": job["job_id"]
     }
\ No newline at end of file
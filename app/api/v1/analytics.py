@@ -1,10 +1,15 @@
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.encoders import jsonable_encoder
 from sqlalchemy.orm import Session
 
 from app.db.session import get_db
-from app.services.analytics_service import get_growth_metrics, get_comparison_data
+from app.services.analytics_service import (
+    get_growth_metrics, get_follower_changes, get_rolling_average, get_comparison_data, get_fleet_summary, parse_metrics
+)
 from app.services.cache import get_cache, set_cache
+from app.services.profile_service import SUMMARY_CACHE_KEY
+from app.services.resampling import parse_grid
 
 router = APIRouter()
 
@@ -12,25 +17,42 @@ router = APIRouter()
 async def read_growth_metrics(
     username: str,
     days: Optional[int] = Query(30, description="Number of days to analyze"),
+    resolution: Optional[str] = Query(None, description="raw, hour or day; chosen from the window when omitted"),
+    metrics: Optional[str] = Query(
+        None,
+        description="Comma-separated metrics to compute (growth, changes_between_scrapes, change_12h, "
+                    "change_24h, rolling_avg_7day); all when omitted"
+    ),
     refresh: Optional[bool] = Query(False, description="Force refresh data from database"),
     db: Session = Depends(get_db)
 ):
     """
     Calculate growth metrics for a specific account.
     
-    - Change between each scrape
+    - Net, percentage and average daily growth
+    - Change between each scrape (or rollup bucket for long windows)
     - Change in last 12 hours
     - Change in last 24 hours
     - 7-day rolling average of daily change
+    
+    Only the metrics selected with metrics= are computed.
     """
+    try:
+        selected = parse_metrics(metrics)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
     # Check cache first unless refresh is requested
-    cache_key = f"growth_metrics:{username}:{days}"
+    cache_key = f"growth_metrics:{username}:{days}:{resolution or 'auto'}:{','.join(sorted(selected)) if selected else 'all'}"
     if not refresh:
         cached_data = get_cache(cache_key)
         if cached_data:
             return cached_data
     
-    metrics = get_growth_metrics(db, username=username, days=days)
+    try:
+        metrics = get_growth_metrics(db, username=username, days=days, resolution=resolution, metrics=selected)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     if not metrics:
         raise HTTPException(status_code=404, detail=f"Growth metrics for {username} not found")
     
@@ -60,19 +82,10 @@ async def read_follower_changes(
         if cached_data:
             return cached_data
             
-    metrics = get_growth_metrics(db, username=username, days=days)
-    if not metrics:
+    result = get_follower_changes(db, username=username, days=days)
+    if not result:
         raise HTTPException(status_code=404, detail=f"Follower changes for {username} not found")
     
-    result = {
-        "username": metrics["username"],
-        "current_followers": metrics["end_followers"],
-        "changes_between_scrapes": metrics["changes_between_scrapes"],
-        "change_12h": metrics["change_12h"],
-        "change_24h": metrics["change_24h"],
-        "data_points": metrics["data_points"]
-    }
-    
     # Cache result for 15 minutes (900 seconds)
     set_cache(cache_key, result, expire_seconds=900)
     
@@ -81,58 +94,93 @@ async def read_follower_changes(
 @router.get("/rolling-average/{username}", response_model=dict)
 async def read_rolling_average(
     username: str,
-    days: Optional[int] = Query(7, description="Rolling window in days"),
     refresh: Optional[bool] = Query(False, description="Force refresh data from database"),
     db: Session = Depends(get_db)
 ):
     """
-    Get rolling average of follower growth.
+    Get the 7-day rolling average of follower growth, over the week up to the
+    account's latest observation.
     """
     # Check cache first unless refresh is requested
-    cache_key = f"rolling_average:{username}:{days}"
+    cache_key = f"rolling_average:{username}"
     if not refresh:
         cached_data = get_cache(cache_key)
         if cached_data:
             return cached_data
     
-    # Add extra days to ensure we have enough data for the rolling average calculation
-    metrics = get_growth_metrics(db, username=username, days=days + 14)
-    if not metrics:
+    result = get_rolling_average(db, username=username)
+    if not result:
         raise HTTPException(status_code=404, detail=f"Rolling average for {username} not found")
     
-    result = {
-        "username": metrics["username"],
-        "current_followers": metrics["end_followers"],
-        "rolling_avg_7day": metrics["rolling_avg_7day"]
-    }
-    
     # Cache result for 15 minutes (900 seconds)
     set_cache(cache_key, result, expire_seconds=900)
     
     return result
 
+@router.get("/summary", response_model=dict)
+async def read_fleet_summary(
+    refresh: Optional[bool] = Query(False, description="Force refresh data from database"),
+    db: Session = Depends(get_db)
+):
+    """
+    Dashboard summary of every tracked account in one request.
+    
+    - Latest follower count
+    - Change over the 12 hours, 24 hours and 7 days before the latest
+      observation, measured as in the growth metrics
+    
+    Cached as a whole until the next ingest batch.
+    """
+    if not refresh:
+        cached_data = get_cache(SUMMARY_CACHE_KEY)
+        if cached_data:
+            return cached_data
+    
+    summary = jsonable_encoder(get_fleet_summary(db))
+    
+    # Cache result for 15 minutes (900 seconds); ingest clears it earlier
+    set_cache(SUMMARY_CACHE_KEY, summary, expire_seconds=900)
+    
+    return summary
+
 @router.get("/compare", response_model=dict)
 async def compare_accounts(
     usernames: List[str] = Query(..., description="List of usernames to compare"),
     days: Optional[int] = Query(30, description="Number of days to analyze"),
+    resolution: Optional[str] = Query(None, description="raw, hour or day; chosen from the window when omitted"),
+    grid: Optional[str] = Query(None, description="Also align the series on a time grid, e.g. 1h or 1d"),
+    fill: str = Query("locf", description="step, locf or linear; how grid points are filled"),
     refresh: Optional[bool] = Query(False, description="Force refresh data from database"),
     db: Session = Depends(get_db)
 ):
     """
     Compare growth metrics between multiple accounts.
+    
+    With grid the follower series are returned aligned onto a shared time
+    grid under "aligned", for plotting accounts side by side.
     """
     # Sort usernames to ensure consistent cache key
     sorted_usernames = sorted(usernames)
     usernames_str = ",".join(sorted_usernames)
     
     # Check cache first unless refresh is requested
-    cache_key = f"comparison:{usernames_str}:{days}"
+    cache_key = f"comparison:{usernames_str}:{days}:{resolution or 'auto'}:{grid or 'none'}:{fill}"
     if not refresh:
         cached_data = get_cache(cache_key)
         if cached_data:
             return cached_data
     
-    comparison = get_comparison_data(db, usernames=usernames, days=days)
+    try:
+        comparison = get_comparison_data(
+            db,
+            usernames=usernames,
+            days=days,
+            resolution=resolution,
+            grid=parse_grid(grid) if grid else None,
+            fill=fill
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     # Cache result for 15 minutes (900 seconds)
     set_cache(cache_key, comparison, expire_seconds=900)
@@ -0,0 +1,25 @@
+from typing import Dict
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from app.db.session import get_db
+from app.schemas.batch import BatchRequest
+from app.services.batch_service import run_batch
+
+router = APIRouter()
+
+@router.post("", response_model=Dict)
+async def run_batch_queries(
+    request: BatchRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    Run many profile and analytics queries in one round trip.
+    
+    Each sub-query names a type (profile, history, growth, changes or
+    rolling_average), a username and the parameters of the matching GET
+    endpoint. They share one database session, username resolution and the
+    follower series fetched for overlapping windows. Every sub-query gets
+    its own status, so one unknown account does not fail the batch.
+    """
+    return {"results": run_batch(db, request.queries)}
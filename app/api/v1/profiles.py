@@ -1,43 +1,251 @@
-from typing import List, Optional, Dict
-from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import List, Optional, Dict, Tuple, Union
+from datetime import datetime, timedelta
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
+from app.core.utils.cursors import NEXT_CURSOR_HEADER, encode_cursor, decode_cursor
+from app.core.utils.date_utils import to_local_naive
 from app.db.session import get_db
-from app.services.profile_service import get_latest_profiles, get_profile_history, get_latest_profile
+from app.services.profile_service import (
+    get_latest_profiles, get_profile_history, get_profile_history_page, get_profiles_history, get_latest_profile,
+    get_profiles_at_time, get_profiles_at_times, parse_fields
+)
+from app.services.account_index import account_index
+from app.services.export_service import iter_history, to_ndjson, to_csv, to_arrow, to_parquet
+from app.services.columnar import MEDIA_TYPES, check_format, encode_history
+from app.services.resampling import build_grid, check_method, parse_grid, resample_history
 
 router = APIRouter()
 
+def time_grid(
+    grid: Optional[str] = Query(None, description="Resample onto a time grid with this spacing, e.g. 15m, 1h or 1d"),
+    fill: str = Query("locf", description="step, locf (last value carried forward) or linear")
+) -> Optional[Tuple[timedelta, str]]:
+    if not grid:
+        return None
+    try:
+        check_method(fill)
+        return parse_grid(grid), fill
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def _grid_points(days: int, grid: Tuple[timedelta, str]) -> List[datetime]:
+    # Built before any history is read, so that oversized grids fail fast
+    end_date = datetime.now()
+    try:
+        return build_grid(end_date - timedelta(days=days), end_date, grid[0])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def _on_grid(history: List[dict], points: List[datetime], grid: Tuple[timedelta, str]) -> List[dict]:
+    step, fill = grid
+    return resample_history(history, points, step, fill)
+
+def selected_fields(
+    fields: Optional[str] = Query(
+        None,
+        description="Comma-separated fields to return (username, follower_count, checked_at, "
+                    "profile_pic_url, full_name, biography); all by default"
+    )
+) -> Optional[List[str]]:
+    try:
+        return parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.get("/", response_model=List[dict])
-async def read_latest_profiles(db: Session = Depends(get_db)):
+async def read_latest_profiles(
+    fields: Optional[List[str]] = Depends(selected_fields),
+    db: Session = Depends(get_db)
+):
     """
     Retrieve latest profile data for all accounts.
     """
-    profiles = get_latest_profiles(db)
+    profiles = get_latest_profiles(db, fields=fields)
     return profiles
 
 @router.get("/current/{username}", response_model=Dict)
 async def read_current_profile(
     username: str,
+    fields: Optional[List[str]] = Depends(selected_fields),
     db: Session = Depends(get_db)
 ):
     """
     Retrieve current profile data with follower count for a specific account.
     """
-    profile = get_latest_profile(db, username=username)
+    profile = get_latest_profile(db, username=username, fields=fields)
     if not profile:
         raise HTTPException(status_code=404, detail=f"Profile for {username} not found")
     return profile
 
+def _parse_time(value: str) -> datetime:
+    # Timestamps are stored naive in local time, so offsets are converted first
+    try:
+        moment = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid time: {value}")
+    return to_local_naive(moment)
+
+@router.get("/at", response_model=Union[List[dict], Dict[str, List[dict]]])
+async def read_profiles_at(
+    time: Optional[str] = Query(None, description="ISO 8601 timestamp"),
+    times: Optional[str] = Query(None, description="Comma-separated ISO 8601 timestamps"),
+    fields: Optional[List[str]] = Depends(selected_fields),
+    db: Session = Depends(get_db)
+):
+    """
+    Retrieve every account's latest profile data at or before a point in time.
+    
+    With times= the profiles at each of several timestamps are returned in
+    one request, keyed by the timestamps as given.
+    """
+    if bool(time) == bool(times):
+        raise HTTPException(status_code=400, detail="Pass either time or times")
+    if time:
+        return get_profiles_at_time(db, _parse_time(time), fields=fields)
+    
+    requested = {value.strip(): _parse_time(value) for value in times.split(",") if value.strip()}
+    profiles = get_profiles_at_times(db, list(requested.values()), fields=fields)
+    return {value: profiles[target_time] for value, target_time in requested.items()}
+
+@router.get("/history", response_model=Dict[str, List[dict]])
+async def read_profiles_history(
+    usernames: str = Query(..., description="Comma-separated usernames"),
+    days: Optional[int] = Query(30, description="Number of days of history to retrieve"),
+    grid: Optional[Tuple[timedelta, str]] = Depends(time_grid),
+    fields: Optional[List[str]] = Depends(selected_fields),
+    db: Session = Depends(get_db)
+):
+    """
+    Retrieve historical profile data for many accounts in one request,
+    grouped per username.
+    
+    With grid every account is resampled onto the same grid points.
+    """
+    if grid:
+        points = _grid_points(days, grid)
+        fields = ["follower_count", "checked_at"]
+    histories = get_profiles_history(
+        db, [name.strip() for name in usernames.split(",") if name.strip()], days=days, fields=fields
+    )
+    if not histories:
+        raise HTTPException(status_code=404, detail="No known accounts in usernames")
+    if grid:
+        return {username: _on_grid(history, points, grid) for username, history in histories.items()}
+    return histories
+
 @router.get("/history/{username}", response_model=List[dict])
 async def read_profile_history(
     username: str,
+    response: Response,
     days: Optional[int] = Query(30, description="Number of days of history to retrieve"),
+    limit: Optional[int] = Query(None, ge=1, le=10000, description="Page size in snapshots; paginates the history"),
+    cursor: Optional[str] = Query(None, description="Page token from the X-Next-Cursor header of the previous page"),
+    output_format: str = Query("json", alias="format", description="json, arrow (IPC stream) or parquet"),
+    grid: Optional[Tuple[timedelta, str]] = Depends(time_grid),
+    fields: Optional[List[str]] = Depends(selected_fields),
     db: Session = Depends(get_db)
 ):
     """
     Retrieve historical profile data for a specific account.
+    
+    With limit (or cursor) the stored snapshots are returned page by page;
+    the X-Next-Cursor response header holds the token for the next page.
+    format=arrow and format=parquet return the checked_at and follower_count
+    columns instead of JSON. With grid the follower series is resampled
+    onto regular grid points.
     """
-    profiles = get_profile_history(db, username=username, days=days)
+    if output_format != "json" and output_format not in MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail=f"Unsupported format: {output_format}")
+    if grid and (limit or cursor or output_format != "json"):
+        raise HTTPException(status_code=400, detail="grid cannot be combined with limit, cursor or format")
+    try:
+        check_format(output_format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # Columnar formats only carry the follower series
+    if output_format in MEDIA_TYPES:
+        fields = ["follower_count", "checked_at"]
+    
+    if limit or cursor:
+        after = None
+        if cursor:
+            try:
+                values = decode_cursor(cursor)
+                after = (datetime.fromisoformat(values["checked_at"]), int(values["id"]))
+            except (ValueError, KeyError, TypeError):
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+        
+        profiles, next_key = get_profile_history_page(
+            db, username=username, days=days, limit=limit or 1000, after=after, fields=fields
+        )
+        if next_key:
+            response.headers[NEXT_CURSOR_HEADER] = encode_cursor({
+                "checked_at": next_key[0].isoformat(),
+                "id": next_key[1]
+            })
+    elif grid:
+        points = _grid_points(days, grid)
+        profiles = get_profile_history(db, username=username, days=days, fields=["follower_count", "checked_at"])
+    else:
+        profiles = get_profile_history(db, username=username, days=days, fields=fields)
     if not profiles:
         raise HTTPException(status_code=404, detail=f"Profile history for {username} not found")
-    return profiles
\ No newline at end of file
+    if grid:
+        return _on_grid(profiles, points, grid)
+    if output_format in MEDIA_TYPES:
+        return Response(
+            content=encode_history(profiles, output_format),
+            media_type=MEDIA_TYPES[output_format],
+            headers={
+                name: value for name, value in response.headers.items() if name.lower() == NEXT_CURSOR_HEADER.lower()
+            }
+        )
+    return profiles
+
+EXPORT_FORMATS = {
+    "ndjson": (to_ndjson, "application/x-ndjson"),
+    "csv": (to_csv, "text/csv"),
+    "arrow": (to_arrow, MEDIA_TYPES["arrow"]),
+    "parquet": (to_parquet, MEDIA_TYPES["parquet"])
+}
+
+@router.get("/export")
+async def export_profile_history(
+    usernames: str = Query(..., description="Comma-separated usernames to export"),
+    days: int = Query(30, description="Number of days of history to export"),
+    export_format: str = Query("ndjson", alias="format", description="ndjson, csv, arrow or parquet"),
+    db: Session = Depends(get_db)
+):
+    """
+    Stream the snapshot history of one or many accounts as NDJSON, CSV, an
+    Arrow IPC stream or Parquet (the last two need pyarrow installed).
+    
+    Rows are sent as they are read from a server-side database cursor, so
+    large exports start immediately and run in constant memory. Unknown
+    usernames are skipped.
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format: {export_format}")
+    try:
+        check_format(export_format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    accounts = {}
+    for username in dict.fromkeys(name.strip() for name in usernames.split(",") if name.strip()):
+        account_id = account_index.resolve(db, username)
+        if account_id:
+            accounts[account_id] = username
+    if not accounts:
+        raise HTTPException(status_code=404, detail="No known accounts to export")
+    
+    encode, media_type = EXPORT_FORMATS[export_format]
+    rows = iter_history(db.get_bind(), accounts, datetime.now() - timedelta(days=days))
+    return StreamingResponse(
+        encode(rows),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="profile_history.{export_format}"'}
+    )
@@ -1,11 +1,14 @@
-from typing import List, Dict
+from typing import List, Dict, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
 from app.db.session import get_db
+from app.schemas.account import BulkAccountsRequest
+from app.services.account_service import add_accounts as add_accounts_to_db, get_pending_purge_usernames
+from app.services.scrape_coordinator import coordinate_scrape
 from app.services.scraper_service import (
-    fetch_latest_profiles, fetch_accounts, trigger_scrape, 
-    add_account, delete_account
+    fetch_latest_profiles, fetch_accounts,
+    add_account, delete_account, add_accounts
 )
 
 router = APIRouter()
@@ -26,12 +29,48 @@ async def read_scraper_accounts():
     accounts = await fetch_accounts()
     return accounts
 
+@router.post("/accounts", response_model=dict)
+async def add_scraper_accounts(
+    request: BulkAccountsRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    Add many accounts to track in the Scraper Service.
+    
+    Usernames are sent to the scraper in batches, and the accounts it added
+    are mirrored into the local database in one transaction. Accounts that
+    were deleted and still wait for their purge are reported as failed.
+    """
+    pending = set(get_pending_purge_usernames(db, request.usernames))
+    result = await add_accounts([username for username in request.usernames if username not in pending])
+    result["failed"].extend(
+        {"username": username, "reason": "Account is being deleted; add it again once its purge has finished"}
+        for username in sorted(pending)
+    )
+    
+    created = add_accounts_to_db(db, result["added"])
+    
+    return {
+        "status": "success" if not result["failed"] else "partial",
+        "requested": len(set(request.usernames)),
+        "added": result["added"],
+        "skipped": result["skipped"],
+        "failed": result["failed"],
+        "created_in_db": len(created)
+    }
+
 @router.post("/trigger", response_model=dict)
-async def trigger_scraper():
+async def trigger_scraper(
+    username: Optional[str] = Query(None, description="Only scrape this account")
+):
     """
     Trigger a manual scrape in the Scraper Service.
+    
+    Requests are coalesced: while a scrape is running for the same scope
+    (all accounts or one account) callers are attached to it and receive its
+    job id, and a scope is scraped at most once per minimum interval.
     """
-    result = await trigger_scrape()
+    result = await coordinate_scrape(username)
     return result
 
 @router.post("/add-account", response_model=dict)
@@ -43,8 +43,103 @@ class Settings(BaseSettings):
     # Scraper service URL - defaults to mock service in local dev
     SCRAPER_SERVICE_URL: str = os.getenv("SCRAPER_SERVICE_URL", "http://localhost:8001")
     
+    # Shared HTTP client used for all Scraper Service calls
+    SCRAPER_HTTP2: bool = os.getenv("SCRAPER_HTTP2", "true").lower() in ("true", "1", "t")
+    SCRAPER_MAX_CONNECTIONS: int = int(os.getenv("SCRAPER_MAX_CONNECTIONS", "20"))
+    SCRAPER_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("SCRAPER_MAX_KEEPALIVE_CONNECTIONS", "10"))
+    SCRAPER_KEEPALIVE_EXPIRY: float = float(os.getenv("SCRAPER_KEEPALIVE_EXPIRY", "30.0"))
+    SCRAPER_CONNECT_TIMEOUT: float = float(os.getenv("SCRAPER_CONNECT_TIMEOUT", "5.0"))
+    
+    # Per-operation read timeouts (seconds)
+    SCRAPER_READ_TIMEOUT: float = float(os.getenv("SCRAPER_READ_TIMEOUT", "10.0"))
+    SCRAPER_WRITE_TIMEOUT: float = float(os.getenv("SCRAPER_WRITE_TIMEOUT", "10.0"))
+    SCRAPER_TRIGGER_TIMEOUT: float = float(os.getenv("SCRAPER_TRIGGER_TIMEOUT", "30.0"))
+    
+    # Retries (idempotent GETs only) and circuit breaker for Scraper Service calls
+    SCRAPER_RETRY_ATTEMPTS: int = int(os.getenv("SCRAPER_RETRY_ATTEMPTS", "3"))
+    SCRAPER_RETRY_BASE_DELAY: float = float(os.getenv("SCRAPER_RETRY_BASE_DELAY", "0.2"))
+    SCRAPER_RETRY_MAX_DELAY: float = float(os.getenv("SCRAPER_RETRY_MAX_DELAY", "2.0"))
+    SCRAPER_RETRY_BUDGET: float = float(os.getenv("SCRAPER_RETRY_BUDGET", "10.0"))
+    SCRAPER_BREAKER_FAILURE_THRESHOLD: int = int(os.getenv("SCRAPER_BREAKER_FAILURE_THRESHOLD", "5"))
+    SCRAPER_BREAKER_RESET_SECONDS: float = float(os.getenv("SCRAPER_BREAKER_RESET_SECONDS", "30.0"))
+    
+    # How long a last-good scraper response may be served while the scraper is down
+    SCRAPER_LAST_GOOD_TTL: int = int(os.getenv("SCRAPER_LAST_GOOD_TTL", "300"))
+    
+    # Bulk account operations: usernames per scraper request and requests in flight
+    SCRAPER_BATCH_SIZE: int = int(os.getenv("SCRAPER_BATCH_SIZE", "100"))
+    SCRAPER_BATCH_CONCURRENCY: int = int(os.getenv("SCRAPER_BATCH_CONCURRENCY", "4"))
+    
+    # Deleted accounts are purged in the background, this many profile rows per statement
+    PURGE_CHUNK_SIZE: int = int(os.getenv("PURGE_CHUNK_SIZE", "1000"))
+    # Purge accounts left marked as deleted by an interrupted purge at startup
+    PURGE_RESUME_ON_STARTUP: bool = os.getenv("PURGE_RESUME_ON_STARTUP", "true").lower() in ("true", "1", "t")
+    
+    # Manual scrape triggers: one in-flight scrape per scope and a minimum interval
+    # between scrapes. Set SCRAPE_COORDINATION=redis to share state between workers.
+    SCRAPE_MIN_INTERVAL_SECONDS: int = int(os.getenv("SCRAPE_MIN_INTERVAL_SECONDS", "60"))
+    SCRAPE_COORDINATION: str = os.getenv("SCRAPE_COORDINATION", "memory")
+    SCRAPE_LOCK_TTL: int = int(os.getenv("SCRAPE_LOCK_TTL", "300"))
+    
+    # Snapshot storage: "full" inserts a row per scrape, "collapsed" extends the
+    # previous row's last_seen_at when follower count and attributes are unchanged
+    PROFILE_STORAGE_MODE: str = os.getenv("PROFILE_STORAGE_MODE", "full")
+    
+    # PostgreSQL only: "monthly" stores snapshots in monthly range partitions of
+    # instagram_profiles, creating this many months ahead of the current one
+    PROFILE_PARTITIONING: str = os.getenv("PROFILE_PARTITIONING", "none")
+    PROFILE_PARTITION_MONTHS_AHEAD: int = int(os.getenv("PROFILE_PARTITION_MONTHS_AHEAD", "2"))
+    
+    # Analytics read raw snapshots for windows up to ROLLUP_RAW_MAX_DAYS, the
+    # hourly rollup up to ROLLUP_HOURLY_MAX_DAYS and the daily rollup beyond that
+    ROLLUP_RAW_MAX_DAYS: int = int(os.getenv("ROLLUP_RAW_MAX_DAYS", "30"))
+    ROLLUP_HOURLY_MAX_DAYS: int = int(os.getenv("ROLLUP_HOURLY_MAX_DAYS", "180"))
+    
+    # Retention: raw snapshots, hourly and daily rollups older than this many days
+    # are compacted away by a background job (0 keeps a tier forever)
+    RETENTION_ENABLED: bool = os.getenv("RETENTION_ENABLED", "false").lower() in ("true", "1", "t")
+    RETENTION_RAW_DAYS: int = int(os.getenv("RETENTION_RAW_DAYS", "30"))
+    RETENTION_HOURLY_DAYS: int = int(os.getenv("RETENTION_HOURLY_DAYS", "365"))
+    RETENTION_DAILY_DAYS: int = int(os.getenv("RETENTION_DAILY_DAYS", "0"))
+    RETENTION_INTERVAL_SECONDS: int = int(os.getenv("RETENTION_INTERVAL_SECONDS", "3600"))
+    RETENTION_CHUNK_SIZE: int = int(os.getenv("RETENTION_CHUNK_SIZE", "1000"))
+    
+    # Cold archive: whole months of snapshots older than ARCHIVE_AFTER_DAYS are moved
+    # to compressed per-account files under ARCHIVE_DIR (replaces raw retention)
+    ARCHIVE_ENABLED: bool = os.getenv("ARCHIVE_ENABLED", "false").lower() in ("true", "1", "t")
+    ARCHIVE_DIR: str = os.getenv("ARCHIVE_DIR", "./archive")
+    ARCHIVE_AFTER_DAYS: int = int(os.getenv("ARCHIVE_AFTER_DAYS", "90"))
+    
+    # In-process follower series for the last HOT_STORE_WINDOW_DAYS, consulted
+    # before the database; least recently queried accounts are evicted above
+    # HOT_STORE_MAX_POINTS observations. Each worker only sees its own ingests
+    # immediately: writes handled by other workers or by the fetch scripts
+    # (which ingest in their own process) show up once its copy is reloaded,
+    # up to HOT_STORE_TTL_SECONDS later
+    HOT_STORE_ENABLED: bool = os.getenv("HOT_STORE_ENABLED", "false").lower() in ("true", "1", "t")
+    HOT_STORE_WARM_ON_STARTUP: bool = os.getenv("HOT_STORE_WARM_ON_STARTUP", "true").lower() in ("true", "1", "t")
+    HOT_STORE_WINDOW_DAYS: int = int(os.getenv("HOT_STORE_WINDOW_DAYS", "30"))
+    HOT_STORE_MAX_POINTS: int = int(os.getenv("HOT_STORE_MAX_POINTS", "2000000"))
+    HOT_STORE_TTL_SECONDS: int = int(os.getenv("HOT_STORE_TTL_SECONDS", "300"))
+    
+    # Memory-mapped series snapshot shared by workers on one host (empty disables).
+    # One worker (SERIES_SNAPSHOT_WRITER) rewrites it every interval, the others
+    # map it read-only and only read newer observations from the database. When
+    # several workers are writers, the one holding a lock on <path>.lock writes
+    SERIES_SNAPSHOT_PATH: str = os.getenv("SERIES_SNAPSHOT_PATH", "")
+    SERIES_SNAPSHOT_WRITER: bool = os.getenv("SERIES_SNAPSHOT_WRITER", "true").lower() in ("true", "1", "t")
+    SERIES_SNAPSHOT_INTERVAL_SECONDS: int = int(os.getenv("SERIES_SNAPSHOT_INTERVAL_SECONDS", "300"))
+    
+    # Usernames are resolved to account ids from an in-process map, reloaded
+    # after this many seconds to see accounts changed by other workers
+    ACCOUNT_INDEX_TTL_SECONDS: int = int(os.getenv("ACCOUNT_INDEX_TTL_SECONDS", "60"))
+    
+    # "python" computes growth metrics from the fetched series, "sql" computes
+    # them on raw snapshots in the database with window functions
+    ANALYTICS_BACKEND: str = os.getenv("ANALYTICS_BACKEND", "python")
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
 
-settings = Settings()
+settings = Settings()
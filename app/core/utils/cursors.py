@@ -0,0 +1,29 @@
+from typing import Dict
+import base64
+import json
+
+# Header carrying the token for the next page of a keyset-paginated response
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(values: Dict) -> str:
+    """
+    Opaque page token for the last row of a page.
+    """
+    payload = json.dumps(values, separators=(",", ":"), default=str).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).decode("ascii").rstrip("=")
+
+def decode_cursor(token: str) -> Dict:
+    """
+    Values encoded by encode_cursor.
+
+    Raises:
+        ValueError: If the token is malformed
+    """
+    try:
+        payload = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        values = json.loads(payload)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(values, dict):
+        raise ValueError("Invalid cursor")
+    return values
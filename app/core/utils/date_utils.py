@@ -15,6 +15,18 @@ def get_date_range(days: int) -> Tuple[datetime, datetime]:
     start_date = end_date - timedelta(days=days)
     return start_date, end_date
 
+def to_local_naive(moment: datetime) -> datetime:
+    """
+    Convert a timestamp to the naive local time used for stored timestamps.
+    
+    Args:
+        moment: Naive (already local) or timezone-aware datetime
+        
+    Returns:
+        Naive datetime in local time
+    """
+    return moment.astimezone().replace(tzinfo=None) if moment.tzinfo else moment
+
 def date_range_to_str(start_date: datetime, end_date: datetime) -> str:
     """
     Format date range for display.
@@ -0,0 +1,44 @@
+from typing import Callable, Optional
+
+from sqlalchemy.orm import Session
+
+def delete_in_chunks(
+    db: Session,
+    model,
+    *criteria,
+    chunk_size: int = 1000,
+    on_chunk: Optional[Callable[[int], None]] = None
+) -> int:
+    """
+    Delete rows matching criteria in bounded-size batches.
+    
+    Each batch selects up to chunk_size primary keys and issues
+    DELETE ... WHERE id IN (...), committing after every batch so that locks
+    and transaction size stay small and no rows are loaded into the session.
+    
+    Args:
+        db: Database session
+        model: Mapped class with an integer "id" primary key
+        criteria: Filter expressions selecting the rows to delete
+        chunk_size: Maximum rows deleted per statement
+        on_chunk: Optional callback receiving the number of rows deleted in each batch
+        
+    Returns:
+        Total number of rows deleted
+    """
+    total = 0
+    while True:
+        ids = [
+            row_id for (row_id,) in db.query(model.id).filter(*criteria).limit(chunk_size)
+        ]
+        if not ids:
+            break
+        
+        db.query(model).filter(model.id.in_(ids)).delete(synchronize_session=False)
+        db.commit()
+        
+        total += len(ids)
+        if on_chunk:
+            on_chunk(len(ids))
+    
+    return total
@@ -3,7 +3,9 @@ from datetime import datetime, timedelta
 
 from app.db.session import engine, SessionLocal
 from app.models.account import InstagramAccount
-from app.models.profile import InstagramProfile
+from app.services.ingest_service import record_snapshot
+from app.core.utils.db_migrations import run_migrations
+from app.core.utils.partitions import ensure_partitions
 
 def initialize_db():
     """
@@ -17,12 +19,15 @@ def initialize_db():
         # Create tables
         from app.db.session import Base
         Base.metadata.create_all(bind=engine)
+        ensure_partitions(engine, start=datetime.now() - timedelta(days=31))
         
         # Seed with some sample data
         seed_sample_data()
         
         print("Database initialized with sample data.")
     else:
+        # Bring existing databases up to the current schema
+        run_migrations(engine)
         print("Database tables already exist.")
 
 def seed_sample_data():
@@ -51,15 +56,15 @@ def seed_sample_data():
             if days_ago > 0:
                 follower_count += 50000 + (days_ago * 1000)
             
-            profile = InstagramProfile(
-                account_id=account1.id,
+            record_snapshot(
+                db,
+                account1.id,
                 follower_count=follower_count,
                 profile_pic_url="https://example.com/instagram.jpg",
                 full_name="Instagram",
                 biography="Instagram official account",
                 checked_at=date_point
             )
-            db.add(profile)
         
         # Sample data for second account
         follower_count = 30000000
@@ -70,15 +75,15 @@ def seed_sample_data():
             if days_ago > 0:
                 follower_count += 20000 + (days_ago * 500)
             
-            profile = InstagramProfile(
-                account_id=account2.id,
+            record_snapshot(
+                db,
+                account2.id,
                 follower_count=follower_count,
                 profile_pic_url="https://example.com/google.jpg",
                 full_name="Google",
                 biography="Google official account",
                 checked_at=date_point
             )
-            db.add(profile)
         
         db.commit()
     finally:
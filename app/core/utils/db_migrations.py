@@ -0,0 +1,257 @@
+from typing import List, Dict
+import logging
+
+from sqlalchemy import inspect, text, select, table, column, Integer, String, Text, DateTime
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.models.profile import InstagramProfile
+from app.models.profile_attributes import ProfileAttributes
+from app.models.rollup import FollowerRollupHourly, FollowerRollupDaily
+from app.services.rollup_service import backfill_rollups
+from app.core.utils.partitions import partitioning_enabled, ensure_partitions
+
+logger = logging.getLogger(__name__)
+
+ATTRIBUTE_FIELDS = ("full_name", "biography", "profile_pic_url")
+
+# Pre-normalization layout of the snapshot table
+_legacy_profiles = table(
+    "instagram_profiles",
+    column("id", Integer),
+    column("account_id", Integer),
+    column("checked_at", DateTime),
+    column("full_name", String),
+    column("biography", Text),
+    column("profile_pic_url", Text),
+    column("attributes_id", Integer),
+)
+
+def _profile_columns(engine: Engine) -> set:
+    inspector = inspect(engine)
+    if not inspector.has_table("instagram_profiles"):
+        return set()
+    return {col["name"] for col in inspector.get_columns("instagram_profiles")}
+
+def migrate_profile_attributes(engine: Engine) -> bool:
+    """
+    Move full_name, biography and profile_pic_url out of instagram_profiles.
+
+    For every account the snapshots are walked in time order and a row in
+    instagram_profile_attributes is created each time the attributes change;
+    snapshots then reference it through attributes_id and the old text
+    columns are dropped. Accounts are processed one transaction at a time and
+    already-linked snapshots are skipped, so the migration can be resumed.
+
+    Returns:
+        True if the migration ran, False if the schema was already current
+    """
+    columns = _profile_columns(engine)
+    if "full_name" not in columns:
+        return False
+
+    logger.info("Migrating profile attributes out of instagram_profiles")
+    ProfileAttributes.__table__.create(bind=engine, checkfirst=True)
+
+    if "attributes_id" not in columns:
+        with engine.begin() as conn:
+            conn.execute(text(
+                "ALTER TABLE instagram_profiles ADD COLUMN attributes_id INTEGER "
+                "REFERENCES instagram_profile_attributes(id)"
+            ))
+
+    with engine.connect() as conn:
+        account_ids = [
+            row[0] for row in conn.execute(
+                select(_legacy_profiles.c.account_id).where(
+                    _legacy_profiles.c.attributes_id.is_(None)
+                ).distinct()
+            )
+        ]
+
+    attributes_table = ProfileAttributes.__table__
+    for account_id in account_ids:
+        with engine.begin() as conn:
+            rows = conn.execute(
+                select(
+                    _legacy_profiles.c.id,
+                    _legacy_profiles.c.checked_at,
+                    *[_legacy_profiles.c[field] for field in ATTRIBUTE_FIELDS]
+                ).where(
+                    _legacy_profiles.c.account_id == account_id,
+                    _legacy_profiles.c.attributes_id.is_(None)
+                ).order_by(_legacy_profiles.c.checked_at, _legacy_profiles.c.id)
+            ).all()
+
+            current_values = None
+            current_id = None
+            updates: List[Dict] = []
+            for row in rows:
+                values = tuple(getattr(row, field) for field in ATTRIBUTE_FIELDS)
+                if values != current_values:
+                    current_id = conn.execute(
+                        attributes_table.insert().values(
+                            account_id=account_id,
+                            first_seen_at=row.checked_at,
+                            **dict(zip(ATTRIBUTE_FIELDS, values))
+                        )
+                    ).inserted_primary_key[0]
+                    current_values = values
+                updates.append({"row_id": row.id, "attributes_id": current_id})
+
+            if updates:
+                conn.execute(
+                    text("UPDATE instagram_profiles SET attributes_id = :attributes_id WHERE id = :row_id"),
+                    updates
+                )
+
+    with engine.begin() as conn:
+        for field in ATTRIBUTE_FIELDS:
+            conn.execute(text(f"ALTER TABLE instagram_profiles DROP COLUMN {field}"))
+
+    logger.info(f"Profile attributes migrated for {len(account_ids)} accounts")
+    return True
+
+def migrate_profile_last_seen(engine: Engine) -> bool:
+    """
+    Add last_seen_at (collapsed storage mode) and the (account_id, checked_at)
+    index to instagram_profiles.
+    
+    Returns:
+        True if anything was added, False if the schema was already current
+    """
+    columns = _profile_columns(engine)
+    if not columns:
+        return False
+    
+    changed = False
+    with engine.begin() as conn:
+        if "last_seen_at" not in columns:
+            conn.execute(text("ALTER TABLE instagram_profiles ADD COLUMN last_seen_at TIMESTAMP"))
+            changed = True
+        
+        indexes = {index["name"] for index in inspect(conn).get_indexes("instagram_profiles")}
+        if "ix_instagram_profiles_account_checked" not in indexes:
+            conn.execute(text(
+                "CREATE INDEX ix_instagram_profiles_account_checked "
+                "ON instagram_profiles (account_id, checked_at)"
+            ))
+            changed = True
+    
+    return changed
+
+def migrate_attributes_index(engine: Engine) -> bool:
+    """
+    Add the (account_id, first_seen_at) index to instagram_profile_attributes.
+    
+    Returns:
+        True if the index was added, False if it already existed
+    """
+    with engine.begin() as conn:
+        inspector = inspect(conn)
+        if not inspector.has_table("instagram_profile_attributes"):
+            return False
+        indexes = {index["name"] for index in inspector.get_indexes("instagram_profile_attributes")}
+        if "ix_instagram_profile_attributes_account_first_seen" in indexes:
+            return False
+        conn.execute(text(
+            "CREATE INDEX ix_instagram_profile_attributes_account_first_seen "
+            "ON instagram_profile_attributes (account_id, first_seen_at)"
+        ))
+    return True
+
+def migrate_follower_rollups(engine: Engine) -> bool:
+    """
+    Create the hourly and daily follower rollup tables and backfill them for
+    every account that has snapshots but no rollups yet. Each account is
+    committed separately, so the migration can be resumed.
+    
+    Returns:
+        True if any account was backfilled, False if the rollups were current
+    """
+    if not _profile_columns(engine):
+        return False
+    
+    FollowerRollupHourly.__table__.create(bind=engine, checkfirst=True)
+    FollowerRollupDaily.__table__.create(bind=engine, checkfirst=True)
+    
+    with Session(bind=engine) as db:
+        account_ids = [
+            row[0] for row in db.query(InstagramProfile.account_id).filter(
+                ~InstagramProfile.account_id.in_(select(FollowerRollupDaily.account_id))
+            ).distinct()
+        ]
+        for account_id in account_ids:
+            backfill_rollups(db, account_id)
+    
+    if account_ids:
+        logger.info(f"Follower rollups backfilled for {len(account_ids)} accounts")
+    return bool(account_ids)
+
+def migrate_profile_partitions(engine: Engine) -> bool:
+    """
+    Convert instagram_profiles into a monthly range-partitioned table when
+    PROFILE_PARTITIONING=monthly is set on PostgreSQL.
+    
+    The existing table is renamed, the partitioned table and partitions
+    covering all existing snapshots are created, and the rows are copied over
+    in one transaction. This rewrites the whole table, so run it in a
+    maintenance window.
+    
+    Returns:
+        True if the table was converted, False if nothing needed to be done
+    """
+    if not partitioning_enabled(engine) or not _profile_columns(engine):
+        return False
+    
+    with engine.connect() as conn:
+        relkind = conn.execute(text(
+            "SELECT relkind FROM pg_class WHERE oid = CAST('instagram_profiles' AS regclass)"
+        )).scalar()
+    if relkind == "p":
+        return False
+    
+    logger.info("Converting instagram_profiles to monthly partitions")
+    old = "instagram_profiles_unpartitioned"
+    with engine.begin() as conn:
+        conn.execute(text(f"ALTER TABLE instagram_profiles RENAME TO {old}"))
+        # Free the index and sequence names for the new table
+        for index in ("instagram_profiles_pkey", "ix_instagram_profiles_id", "ix_instagram_profiles_account_checked"):
+            conn.execute(text(f"ALTER INDEX IF EXISTS {index} RENAME TO {index.replace('instagram_profiles', old)}"))
+        conn.execute(text(f"ALTER SEQUENCE IF EXISTS instagram_profiles_id_seq RENAME TO {old}_id_seq"))
+        
+        InstagramProfile.__table__.create(bind=conn)
+        oldest = conn.execute(text(f"SELECT MIN(checked_at) FROM {old}")).scalar()
+        ensure_partitions(conn, start=oldest)
+        
+        conn.execute(text(
+            "INSERT INTO instagram_profiles "
+            "(id, account_id, follower_count, checked_at, attributes_id, last_seen_at) "
+            "SELECT id, account_id, follower_count, checked_at, attributes_id, last_seen_at "
+            f"FROM {old} WHERE checked_at IS NOT NULL"
+        ))
+        conn.execute(text(
+            "SELECT setval(pg_get_serial_sequence('instagram_profiles', 'id'), "
+            "(SELECT COALESCE(MAX(id), 0) + 1 FROM instagram_profiles), false)"
+        ))
+        conn.execute(text(f"DROP TABLE {old}"))
+    
+    return True
+
+# Migrations in the order they must be applied. Each one checks the current
+# schema and does nothing if it has already been applied.
+MIGRATIONS = [
+    migrate_profile_attributes,
+    migrate_attributes_index,
+    migrate_profile_last_seen,
+    migrate_follower_rollups,
+    migrate_profile_partitions,
+]
+
+def run_migrations(engine: Engine) -> None:
+    """
+    Apply all pending schema migrations.
+    """
+    for migration in MIGRATIONS:
+        if migration(engine):
+            logger.info(f"Applied migration {migration.__name__}")
@@ -0,0 +1,184 @@
+from contextlib import contextmanager
+from datetime import datetime
+from typing import List, Optional, Set, Tuple
+import asyncio
+import logging
+import re
+
+from sqlalchemy import text, select, func
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.db.session import PROFILES_PARTITIONED
+from app.models.profile import InstagramProfile
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = "instagram_profiles"
+DEFAULT_PARTITION = f"{PARENT_TABLE}_default"
+
+# How often the app checks that upcoming partitions exist
+MAINTENANCE_INTERVAL_SECONDS = 6 * 3600
+
+_PARTITION_NAME = re.compile(rf"^{PARENT_TABLE}_(\d{{4}})_(\d{{2}})$")
+
+def month_start(moment: datetime) -> datetime:
+    return moment.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+def add_months(month: datetime, count: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + count
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+def partition_name(month: datetime) -> str:
+    return f"{PARENT_TABLE}_{month:%Y_%m}"
+
+def partition_ddl(month: datetime) -> str:
+    """
+    CREATE TABLE statement for the partition holding the given month.
+    """
+    month = month_start(month)
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(month)} PARTITION OF {PARENT_TABLE} "
+        f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{add_months(month, 1):%Y-%m-%d}')"
+    )
+
+def partitioning_enabled(bind) -> bool:
+    """
+    True if snapshots are partitioned on this database (PostgreSQL with
+    PROFILE_PARTITIONING=monthly). Always False on SQLite.
+    """
+    return PROFILES_PARTITIONED and bind.dialect.name == "postgresql"
+
+@contextmanager
+def _begin(bind):
+    if isinstance(bind, Engine):
+        with bind.begin() as conn:
+            yield conn
+    else:
+        yield bind
+
+def list_partitions(bind) -> List[Tuple[str, datetime]]:
+    """
+    Monthly partitions of instagram_profiles as (name, month), oldest first.
+    The default partition is not included.
+    """
+    if not partitioning_enabled(bind):
+        return []
+
+    with _begin(bind) as conn:
+        names = conn.execute(text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = CAST(:parent AS regclass)"
+        ), {"parent": PARENT_TABLE}).scalars().all()
+
+    partitions = []
+    for name in names:
+        match = _PARTITION_NAME.match(name)
+        if match:
+            partitions.append((name, datetime(int(match.group(1)), int(match.group(2)), 1)))
+    return sorted(partitions, key=lambda partition: partition[1])
+
+def ensure_partitions(bind, start: Optional[datetime] = None, months_ahead: Optional[int] = None) -> List[str]:
+    """
+    Create the monthly partitions from start (default: the current month)
+    through PROFILE_PARTITION_MONTHS_AHEAD months ahead, plus a default
+    partition for rows outside every monthly range.
+
+    Args:
+        bind: Engine or connection
+        start: First month to cover
+        months_ahead: Months to create after the current one
+
+    Returns:
+        Names of the partitions that were created
+    """
+    if not partitioning_enabled(bind):
+        return []
+
+    months_ahead = settings.PROFILE_PARTITION_MONTHS_AHEAD if months_ahead is None else months_ahead
+    now = datetime.now()
+    month = month_start(min(start or now, now))
+    last = add_months(month_start(now), months_ahead)
+
+    existing = {name for name, _ in list_partitions(bind)}
+    created = []
+    with _begin(bind) as conn:
+        while month <= last:
+            name = partition_name(month)
+            if name not in existing:
+                conn.execute(text(partition_ddl(month)))
+                created.append(name)
+            month = add_months(month, 1)
+        conn.execute(text(f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {PARENT_TABLE} DEFAULT"))
+
+    if created:
+        logger.info(f"Created profile partitions: {', '.join(created)}")
+    return created
+
+def months_to_keep(bind, cutoff: datetime) -> Set[datetime]:
+    """
+    Months before cutoff whose snapshots must survive retention: those
+    holding an account's latest snapshot, and those holding a collapsed run
+    whose last_seen_at reaches cutoff or later.
+
+    Runs two queries over the whole table, so callers compute it once per
+    retention run rather than per partition.
+    """
+    profiles = InstagramProfile.__table__
+    with _begin(bind) as conn:
+        latest = conn.execute(
+            select(func.max(profiles.c.checked_at)).group_by(profiles.c.account_id).having(
+                func.max(profiles.c.checked_at) < cutoff
+            )
+        ).scalars().all()
+        ongoing = conn.execute(
+            select(profiles.c.checked_at).where(
+                profiles.c.checked_at < cutoff,
+                func.coalesce(profiles.c.last_seen_at, profiles.c.checked_at) >= cutoff
+            )
+        ).scalars().all()
+    return {month_start(moment) for moment in [*latest, *ongoing]}
+
+def drop_partitions_before(bind, cutoff: datetime) -> List[str]:
+    """
+    Drop monthly partitions that lie entirely before cutoff.
+
+    Partitions in months_to_keep are kept so that current follower counts and
+    collapsed runs reaching past cutoff stay available; retention deletes
+    their other rows individually instead. Rows must already be downsampled
+    into the rollups.
+
+    Returns:
+        Names of the dropped partitions
+    """
+    partitions = [
+        (name, month) for name, month in list_partitions(bind)
+        if add_months(month, 1) <= cutoff
+    ]
+    if not partitions:
+        return []
+
+    keep = months_to_keep(bind, cutoff)
+    dropped = []
+    for name, month in partitions:
+        if month in keep:
+            continue
+        with _begin(bind) as conn:
+            conn.execute(text(f"DROP TABLE {name}"))
+        dropped.append(name)
+
+    if dropped:
+        logger.info(f"Dropped expired profile partitions: {', '.join(dropped)}")
+    return dropped
+
+async def partition_maintenance_loop(engine: Engine) -> None:
+    """
+    Keep upcoming monthly partitions created while the app runs.
+    """
+    while True:
+        try:
+            await asyncio.to_thread(ensure_partitions, engine)
+        except Exception as e:
+            logger.error(f"Partition maintenance failed: {e}")
+        await asyncio.sleep(MAINTENANCE_INTERVAL_SECONDS)
@@ -35,6 +35,9 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 # Create base class for models
 Base = declarative_base()
 
+# Snapshots are stored in monthly range partitions on PostgreSQL when enabled
+PROFILES_PARTITIONED = settings.PROFILE_PARTITIONING == "monthly" and engine.dialect.name == "postgresql"
+
 # Dependency for FastAPI
 def get_db():
     db = SessionLocal()
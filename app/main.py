@@ -1,21 +1,71 @@
-﻿from fastapi import FastAPI
+﻿from contextlib import asynccontextmanager
+import asyncio
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import logging
 
 from app.api.router import router as api_router
 from app.core.config import settings
+from app.db.session import SessionLocal, engine
+from app.services.scraper_client import start_scraper_client, close_scraper_client
+from app.services.retention_service import retention_loop
+from app.core.utils.partitions import partitioning_enabled, partition_maintenance_loop
+from app.services.hot_store import hot_series_store
+from app.services.series_snapshot import prepare_snapshot, snapshot_loop
+from app.services.purge_service import resume_pending_purges
 
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
 )
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Open the pooled Scraper Service client once for the whole app lifetime
+    await start_scraper_client()
+    
+    # Load the recent follower series of all accounts into memory, on top of
+    # the shared series snapshot when one is configured
+    snapshot = None
+    if settings.HOT_STORE_ENABLED and settings.SERIES_SNAPSHOT_PATH:
+        try:
+            snapshot = await asyncio.to_thread(prepare_snapshot, SessionLocal)
+        except Exception as e:
+            logger.warning(f"Could not prepare the series snapshot: {e}")
+    if settings.HOT_STORE_ENABLED and settings.HOT_STORE_WARM_ON_STARTUP:
+        try:
+            await asyncio.to_thread(hot_series_store.load_all, SessionLocal)
+        except Exception as e:
+            logger.warning(f"Could not warm the hot series store: {e}")
+    
+    # Compact old snapshots in the background when a retention policy is set,
+    # and keep upcoming monthly partitions created on a partitioned database
+    background_tasks = []
+    if settings.RETENTION_ENABLED or settings.ARCHIVE_ENABLED:
+        background_tasks.append(asyncio.create_task(retention_loop(SessionLocal)))
+    if partitioning_enabled(engine):
+        background_tasks.append(asyncio.create_task(partition_maintenance_loop(engine)))
+    if settings.HOT_STORE_ENABLED and settings.SERIES_SNAPSHOT_PATH:
+        background_tasks.append(asyncio.create_task(snapshot_loop(SessionLocal, snapshot)))
+    
+    # Finish purging accounts deleted before the last shutdown
+    if settings.PURGE_RESUME_ON_STARTUP:
+        background_tasks.append(asyncio.create_task(asyncio.to_thread(resume_pending_purges, SessionLocal)))
+    
+    yield
+    
+    for task in background_tasks:
+        task.cancel()
+    await close_scraper_client()
 
 # Create FastAPI app
 app = FastAPI(
     title=settings.PROJECT_NAME,
     description="Logic Service API for Instagram data analytics",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 # Set all CORS enabled origins
@@ -26,7 +76,7 @@ app.add_middleware(
     allow_methods=["GET", "POST", "OPTIONS", "PUT", "DELETE"],
     allow_headers=["Content-Type", "Authorization", "X-Requested-With", "Accept", "Origin", "DNT",
                    "If-Modified-Since", "Cache-Control", "Range", "X-Auth-Token"],
-    expose_headers=["Content-Length", "Content-Range", "Content-Type"],
+    expose_headers=["Content-Length", "Content-Range", "Content-Type", "X-Next-Cursor"],
     max_age=600,  # Cache preflight requests for 10 minutes
 )
 
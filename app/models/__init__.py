@@ -1,2 +1,4 @@
 from app.models.account import InstagramAccount
-from app.models.profile import InstagramProfile
\ No newline at end of file
+from app.models.profile import InstagramProfile
+from app.models.profile_attributes import ProfileAttributes
+from app.models.rollup import FollowerRollupHourly, FollowerRollupDaily
\ No newline at end of file
@@ -1,21 +1,43 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, func
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Index, func
 from sqlalchemy.orm import relationship
 
-from app.db.session import Base
+from app.db.session import Base, PROFILES_PARTITIONED
 
 class InstagramProfile(Base):
+    """
+    A follower-count snapshot. Text attributes live in ProfileAttributes and
+    are shared by all snapshots taken while they were unchanged.
+    
+    Snapshots are read through profile_service, which expands collapsed runs
+    (checked_at .. last_seen_at) back into their first and last observation.
+    
+    With PROFILE_PARTITIONING=monthly on PostgreSQL the table is range
+    partitioned by checked_at (see app.core.utils.partitions), which requires
+    checked_at to be part of the primary key.
+    """
     __tablename__ = "instagram_profiles"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     account_id = Column(Integer, ForeignKey("instagram_accounts.id"))
     follower_count = Column(Integer)
-    profile_pic_url = Column(Text)
-    full_name = Column(String)
-    biography = Column(Text)
-    checked_at = Column(DateTime, default=func.now())
+    checked_at = Column(DateTime, default=func.now(), primary_key=PROFILES_PARTITIONED)
+    attributes_id = Column(Integer, ForeignKey("instagram_profile_attributes.id"))
+    
+    # In collapsed storage mode a row covers a run of identical scrapes:
+    # checked_at is the first observation and last_seen_at the last one
+    # (NULL when the row holds a single observation)
+    last_seen_at = Column(DateTime, nullable=True)
+    
+    __table_args__ = (
+        Index("ix_instagram_profiles_account_checked", "account_id", "checked_at"),
+        {"postgresql_partition_by": "RANGE (checked_at)"} if PROFILES_PARTITIONED else {},
+    )
     
     # Relationship with account
     account = relationship("InstagramAccount", back_populates="profiles")
     
+    # Attribute version current when the snapshot was taken
+    attributes = relationship("ProfileAttributes")
+    
     def __repr__(self):
         return f"<InstagramProfile(account_id={self.account_id}, followers={self.follower_count})>"
\ No newline at end of file
@@ -0,0 +1,31 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index, func
+from sqlalchemy.orm import relationship
+
+from app.db.session import Base
+
+class ProfileAttributes(Base):
+    """
+    One version of an account's slowly-changing profile attributes.
+    
+    A new row is stored only when full_name, biography or profile_pic_url
+    change; snapshots reference the version that was current when scraped.
+    """
+    __tablename__ = "instagram_profile_attributes"
+
+    id = Column(Integer, primary_key=True, index=True)
+    account_id = Column(Integer, ForeignKey("instagram_accounts.id"), index=True)
+    full_name = Column(String)
+    biography = Column(Text)
+    profile_pic_url = Column(Text)
+    first_seen_at = Column(DateTime, default=func.now())
+    
+    # Ingest looks up the version in effect at a scrape's time
+    __table_args__ = (
+        Index("ix_instagram_profile_attributes_account_first_seen", "account_id", "first_seen_at"),
+    )
+    
+    # Relationship with account
+    account = relationship("InstagramAccount")
+    
+    def __repr__(self):
+        return f"<ProfileAttributes(account_id={self.account_id}, full_name='{self.full_name}')>"
@@ -0,0 +1,36 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy.orm import declared_attr
+
+from app.db.session import Base
+
+class FollowerRollupMixin:
+    """
+    Per-account follower statistics for one time bucket, maintained as
+    snapshots are ingested (see rollup_service).
+    """
+    id = Column(Integer, primary_key=True, index=True)
+    bucket_start = Column(DateTime, nullable=False)
+    first_count = Column(Integer)
+    first_at = Column(DateTime)
+    last_count = Column(Integer)
+    last_at = Column(DateTime)
+    min_count = Column(Integer)
+    max_count = Column(Integer)
+    sample_count = Column(Integer, default=0)
+
+    @declared_attr
+    def account_id(cls):
+        return Column(Integer, ForeignKey("instagram_accounts.id"), nullable=False)
+
+    @declared_attr
+    def __table_args__(cls):
+        return (UniqueConstraint("account_id", "bucket_start", name=f"uq_{cls.__tablename__}_bucket"),)
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}(account_id={self.account_id}, bucket={self.bucket_start}, last={self.last_count})>"
+
+class FollowerRollupHourly(FollowerRollupMixin, Base):
+    __tablename__ = "follower_rollup_hourly"
+
+class FollowerRollupDaily(FollowerRollupMixin, Base):
+    __tablename__ = "follower_rollup_daily"
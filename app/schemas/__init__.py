@@ -0,0 +1 @@
+# Request schemas module init
\ No newline at end of file
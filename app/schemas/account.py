@@ -0,0 +1,8 @@
+from typing import List
+from pydantic import BaseModel, Field
+
+class BulkAccountsRequest(BaseModel):
+    """
+    Request body for bulk account operations.
+    """
+    usernames: List[str] = Field(..., min_length=1, description="Instagram usernames")
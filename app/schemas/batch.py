@@ -0,0 +1,24 @@
+from typing import List, Literal, Optional
+from pydantic import BaseModel, Field
+
+# Sub-queries accepted in one batch request
+BATCH_MAX_QUERIES = 100
+
+class BatchQuery(BaseModel):
+    """
+    One sub-query of a batch request; its parameters mirror the GET endpoint
+    of the same type and default like it.
+    """
+    id: Optional[str] = Field(None, description="Echoed back with the result")
+    type: Literal["profile", "history", "growth", "changes", "rolling_average"]
+    username: str
+    days: Optional[int] = Field(None, ge=1, description="Window in days (history, growth, changes)")
+    resolution: Optional[str] = Field(None, description="raw, hour or day (growth)")
+    metrics: Optional[str] = Field(None, description="Comma-separated metrics (growth)")
+    fields: Optional[str] = Field(None, description="Comma-separated fields (profile, history)")
+
+class BatchRequest(BaseModel):
+    """
+    Request body for running many sub-queries in one round trip.
+    """
+    queries: List[BatchQuery] = Field(..., min_length=1, max_length=BATCH_MAX_QUERIES)
@@ -0,0 +1,67 @@
+from typing import Dict, Optional
+import threading
+import time
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.account import InstagramAccount
+
+class AccountIndex:
+    """
+    In-process map of tracked usernames to account ids.
+
+    Loaded from the database on first use and again every
+    ACCOUNT_INDEX_TTL_SECONDS to pick up accounts added or deleted by other
+    processes. Accounts added or deleted through this process update the map
+    immediately, so unknown usernames are answered without a query.
+    """
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._ids = {}
+            self._loaded_at = None
+
+    def load(self, db: Session) -> int:
+        """
+        Reload the map of every account that is not deleted.
+
+        Returns:
+            Number of accounts loaded
+        """
+        ids = {
+            username: account_id
+            for username, account_id in db.query(InstagramAccount.username, InstagramAccount.id).filter(
+                InstagramAccount.status != "deleted"
+            )
+        }
+        with self._lock:
+            self._ids = ids
+            self._loaded_at = time.monotonic()
+        return len(ids)
+
+    def _stale(self) -> bool:
+        return self._loaded_at is None or time.monotonic() - self._loaded_at > settings.ACCOUNT_INDEX_TTL_SECONDS
+
+    def resolve(self, db: Session, username: str) -> Optional[int]:
+        """
+        Account id of a tracked username, or None if it is unknown or deleted.
+        """
+        if self._stale():
+            self.load(db)
+        return self._ids.get(username)
+
+    def add(self, username: str, account_id: int) -> None:
+        with self._lock:
+            self._ids[username] = account_id
+
+    def remove(self, username: str) -> None:
+        with self._lock:
+            self._ids.pop(username, None)
+
+account_index = AccountIndex()
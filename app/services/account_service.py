@@ -1,13 +1,37 @@
 from typing import List, Dict, Optional
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from app.models.account import InstagramAccount
+from app.services.hot_store import hot_series_store
+from app.services.account_index import account_index
 
-def get_accounts(db: Session, skip: int = 0, limit: int = 100) -> List[dict]:
+# Attempts of add_accounts when concurrent adds keep colliding with it
+ADD_ATTEMPTS = 3
+
+def _account_to_dict(account: InstagramAccount) -> Dict:
+    return {
+        "id": account.id,
+        "username": account.username,
+        "status": account.status,
+        "created_at": account.created_at
+    }
+
+def get_accounts(db: Session, skip: int = 0, limit: int = 100, after_id: Optional[int] = None) -> List[dict]:
     """
-    Retrieve all tracked Instagram accounts.
+    Retrieve all tracked Instagram accounts, ordered by id.
+    
+    Pass the id of the last account of the previous page as after_id to page
+    by key instead of by offset, which costs the same at any depth.
     """
-    db_accounts = db.query(InstagramAccount).offset(skip).limit(limit).all()
+    query = db.query(InstagramAccount).filter(
+        InstagramAccount.status != "deleted"
+    ).order_by(InstagramAccount.id)
+    if after_id is not None:
+        query = query.filter(InstagramAccount.id > after_id)
+    else:
+        query = query.offset(skip)
+    db_accounts = query.limit(limit).all()
     
     return [
         {
@@ -21,7 +45,11 @@ def get_accounts(db: Session, skip: int = 0, limit: int = 100) -> List[dict]:
 
 def delete_account(db: Session, username: str) -> Optional[Dict]:
     """
-    Delete an Instagram account and all associated profile data from the database.
+    Mark an Instagram account as deleted.
+    
+    The account immediately disappears from the API; its profile history and
+    the account row itself are removed afterwards by a purge job
+    (see purge_service).
     
     Args:
         db: Database session
@@ -30,20 +58,113 @@ def delete_account(db: Session, username: str) -> Optional[Dict]:
     Returns:
         Dict with account details or None if account not found
     """
-    db_account = db.query(InstagramAccount).filter(InstagramAccount.username == username).first()
+    db_account = db.query(InstagramAccount).filter(
+        InstagramAccount.username == username,
+        InstagramAccount.status != "deleted"
+    ).first()
     if not db_account:
         return None
     
-    # Store account data before deletion for return value
-    account_data = {
-        "id": db_account.id,
-        "username": db_account.username,
-        "status": db_account.status,
-        "created_at": db_account.created_at
-    }
+    # Store account data before marking it for the return value
+    account_data = _account_to_dict(db_account)
+    
+    db_account.status = "deleted"
+    db.commit()
+    account_index.remove(username)
+    hot_series_store.evict(username)
+    
+    return account_data
+
+def get_pending_purge_usernames(db: Session, usernames: List[str]) -> List[str]:
+    """
+    Usernames among usernames whose account is deleted but not purged yet.
+    """
+    return [
+        username for (username,) in db.query(InstagramAccount.username).filter(
+            InstagramAccount.username.in_(list(set(usernames))),
+            InstagramAccount.status == "deleted"
+        )
+    ]
+
+def add_accounts(db: Session, usernames: List[str]) -> List[Dict]:
+    """
+    Add many Instagram accounts to the database in a single transaction.
+    
+    Usernames that already exist are left untouched, including ones added by
+    a concurrent request in the meantime.
+    
+    Args:
+        db: Database session
+        usernames: Instagram usernames to add
+        
+    Returns:
+        List of dicts for the newly created accounts
+        
+    Raises:
+        ValueError: If an account is deleted and still waiting for its purge;
+            it can be added again once the purge has removed it
+    """
+    unique = list(dict.fromkeys(usernames))
+    if not unique:
+        return []
+    
+    pending = get_pending_purge_usernames(db, unique)
+    if pending:
+        raise ValueError(f"Accounts are being deleted, add them again later: {', '.join(sorted(pending))}")
+    
+    for attempt in range(ADD_ATTEMPTS):
+        existing = {
+            username for (username,) in db.query(InstagramAccount.username).filter(
+                InstagramAccount.username.in_(unique)
+            )
+        }
+        
+        new_accounts = [
+            InstagramAccount(username=username, status="active")
+            for username in unique if username not in existing
+        ]
+        db.add_all(new_accounts)
+        try:
+            db.commit()
+            break
+        except IntegrityError:
+            # A concurrent add created some of the usernames after they were
+            # looked up; skip those and insert the rest
+            db.rollback()
+            if attempt == ADD_ATTEMPTS - 1:
+                raise
+    for account in new_accounts:
+        account_index.add(account.username, account.id)
+    
+    return [_account_to_dict(account) for account in new_accounts]
+
+def delete_accounts(db: Session, usernames: List[str]) -> List[Dict]:
+    """
+    Mark many Instagram accounts as deleted in a single transaction.
+    
+    Profile history is removed afterwards by a purge job (see purge_service).
+    
+    Args:
+        db: Database session
+        usernames: Instagram usernames to delete
+        
+    Returns:
+        List of dicts for the deleted accounts (unknown usernames are ignored)
+    """
+    db_accounts = db.query(InstagramAccount).filter(
+        InstagramAccount.username.in_(list(set(usernames))),
+        InstagramAccount.status != "deleted"
+    ).all()
+    if not db_accounts:
+        return []
+    
+    deleted = [_account_to_dict(account) for account in db_accounts]
     
-    # Delete the account (this will cascade delete profiles due to relationship)
-    db.delete(db_account)
+    for account in db_accounts:
+        account.status = "deleted"
     db.commit()
+    for account in deleted:
+        account_index.remove(account["username"])
+        hot_series_store.evict(account["username"])
     
-    return account_data
\ No newline at end of file
+    return deleted
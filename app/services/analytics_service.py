@@ -1,37 +1,67 @@
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional
 from datetime import datetime, timedelta
+import math
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 
 from app.models.account import InstagramAccount
 from app.models.profile import InstagramProfile
-from app.services.profile_service import get_profile_history
+from app.core.config import settings
+from app.services.profile_service import (
+    get_follower_series, get_latest_profile, get_observations_before, get_profiles_at_times
+)
+from app.services.rollup_service import RESOLUTIONS
 from app.core.utils.date_utils import get_date_range
+from app.services.account_index import account_index
+from app.services.archive_service import archive_cutoff
+from app.services.retention_service import raw_retention_cutoff
+from app.services.resampling import build_grid, check_method, resample
+from app.services.sql_analytics import (
+    series_summary, changes_between_scrapes, observation_before, daily_last_values
+)
 
-def get_growth_metrics(db: Session, username: str, days: int = 30) -> Optional[Dict]:
+def choose_resolution(days: int, resolution: Optional[str] = None) -> str:
     """
-    Calculate growth metrics for a specific account over a period of days.
+    Pick the coarsest series resolution that satisfies a request.
+    
+    An explicit resolution is the coarsest one the caller accepts and is used
+    as is. Otherwise it follows from the window: raw snapshots up to
+    ROLLUP_RAW_MAX_DAYS, hourly rollups up to ROLLUP_HOURLY_MAX_DAYS and
+    daily rollups beyond that.
     """
-    # Get the profile history
-    profiles = get_profile_history(db, username=username, days=days)
+    if resolution is not None:
+        if resolution not in RESOLUTIONS:
+            raise ValueError(f"Unknown resolution '{resolution}', expected one of {', '.join(RESOLUTIONS)}")
+        return resolution
+    if days <= settings.ROLLUP_RAW_MAX_DAYS:
+        return "raw"
+    if days <= settings.ROLLUP_HOURLY_MAX_DAYS:
+        return "hour"
+    return "day"
+
+# Metrics computed by get_growth_metrics on request; the series bounds
+# (dates, start and end followers, data points) are always returned
+METRICS = ("growth", "changes_between_scrapes", "change_12h", "change_24h", "rolling_avg_7day")
+
+def parse_metrics(value: Optional[str]) -> Optional[List[str]]:
+    """
+    Parse a comma-separated metrics= selection, None meaning all metrics.
     
-    if not profiles or len(profiles) < 2:
+    Raises:
+        ValueError: If a metric is unknown
+    """
+    if not value:
         return None
-    
-    # Calculate metrics
-    first_count = profiles[0]["follower_count"] if profiles else 0
-    last_count = profiles[-1]["follower_count"] if profiles else 0
-    
-    # Net growth
-    net_growth = last_count - first_count
-    
-    # Percentage growth
-    percentage_growth = (net_growth / first_count * 100) if first_count > 0 else 0
-    
-    # Daily averages
-    daily_growth = net_growth / days if days > 0 else 0
-    
-    # Calculate growth between each scrape
+    metrics = [metric.strip() for metric in value.split(",") if metric.strip()]
+    unknown = [metric for metric in metrics if metric not in METRICS]
+    if unknown:
+        raise ValueError(f"Unknown metrics '{', '.join(unknown)}', expected any of {', '.join(METRICS)}")
+    return metrics
+
+def calculate_changes_between_scrapes(profiles: List[Dict]) -> List[Dict]:
+    """
+    Change between each pair of consecutive points of a series.
+    """
     changes_between_scrapes = []
     for i in range(1, len(profiles)):
         change = {
@@ -43,30 +73,206 @@ def get_growth_metrics(db: Session, username: str, days: int = 30) -> Optional[D
             "hours_between": (profiles[i]["checked_at"] - profiles[i-1]["checked_at"]).total_seconds() / 3600
         }
         changes_between_scrapes.append(change)
+    return changes_between_scrapes
+
+def _growth(first_count: int, last_count: int, days: int) -> Dict:
+    """
+    Net growth, percentage growth and daily average between two counts.
+    """
+    net_growth = last_count - first_count
+    percentage_growth = (net_growth / first_count * 100) if first_count > 0 else 0
+    daily_growth = net_growth / days if days > 0 else 0
+    return {
+        "net_growth": net_growth,
+        "percentage_growth": round(percentage_growth, 2),
+        "average_daily_growth": round(daily_growth, 2)
+    }
+
+def get_growth_metrics(
+    db: Session,
+    username: str,
+    days: int = 30,
+    resolution: Optional[str] = None,
+    metrics: Optional[List[str]] = None,
+    load_series: Callable[..., List[Dict]] = get_follower_series
+) -> Optional[Dict]:
+    """
+    Calculate growth metrics for a specific account over a period of days.
     
-    # Calculate 12-hour change
-    change_12h = calculate_period_change(profiles, hours=12)
+    The follower series is fetched once and only the requested metrics are
+    computed from it.
     
-    # Calculate 24-hour change
-    change_24h = calculate_period_change(profiles, hours=24)
+    Args:
+        db: Database session
+        username: Account username
+        days: Number of days to analyze
+        resolution: "raw", "hour" or "day"; chosen from the window when omitted
+        metrics: Metrics to compute (see METRICS); all when omitted
+        load_series: Fetches the series, with get_follower_series' signature
+    """
+    resolution = choose_resolution(days, resolution)
+    selected = set(METRICS if metrics is None else metrics)
     
-    # Calculate 7-day rolling average
-    rolling_avg_7day = calculate_rolling_average(profiles, days=7)
+    if settings.ANALYTICS_BACKEND == "sql" and resolution == "raw":
+        account_id = account_index.resolve(db, username)
+        start_date = datetime.now() - timedelta(days=days)
+        if account_id and not _reaches_older_tiers(start_date):
+            return _sql_growth_metrics(db, account_id, username, days, start_date, selected)
     
-    return {
+    # Get the follower series at the chosen resolution
+    profiles = load_series(db, username=username, days=days, resolution=resolution)
+    
+    if not profiles or len(profiles) < 2:
+        return None
+    
+    first_count = profiles[0]["follower_count"]
+    last_count = profiles[-1]["follower_count"]
+    
+    result = {
         "username": username,
-        "start_date": profiles[0]["checked_at"] if profiles else None,
-        "end_date": profiles[-1]["checked_at"] if profiles else None,
+        "start_date": profiles[0]["checked_at"],
+        "end_date": profiles[-1]["checked_at"],
         "start_followers": first_count,
-        "end_followers": last_count,
-        "net_growth": net_growth,
-        "percentage_growth": round(percentage_growth, 2),
-        "average_daily_growth": round(daily_growth, 2),
-        "change_12h": change_12h,
-        "change_24h": change_24h,
-        "rolling_avg_7day": rolling_avg_7day,
-        "changes_between_scrapes": changes_between_scrapes,
-        "data_points": len(profiles)
+        "end_followers": last_count
+    }
+    
+    if "growth" in selected:
+        result.update(_growth(first_count, last_count, days))
+    
+    if "change_12h" in selected:
+        result["change_12h"] = calculate_period_change(profiles, hours=12)
+    
+    if "change_24h" in selected:
+        result["change_24h"] = calculate_period_change(profiles, hours=24)
+    
+    if "rolling_avg_7day" in selected:
+        # The latest point of each day is the same at every resolution, so the
+        # rolling average is taken from the 7 days up to the latest observation
+        week_start = profiles[-1]["checked_at"] - timedelta(days=7)
+        recent = [profile for profile in profiles if profile["checked_at"] >= week_start]
+        result["rolling_avg_7day"] = calculate_rolling_average(recent, days=7)
+    
+    if "changes_between_scrapes" in selected:
+        result["changes_between_scrapes"] = calculate_changes_between_scrapes(profiles)
+    
+    result["data_points"] = len(profiles)
+    result["resolution"] = resolution
+    return result
+
+def _reaches_older_tiers(start_date: datetime) -> bool:
+    # Windows reaching into archived or compacted history need the Python path
+    cold_cutoff = archive_cutoff()
+    raw_cutoff = raw_retention_cutoff()
+    return bool((cold_cutoff and start_date < cold_cutoff) or (raw_cutoff and start_date < raw_cutoff))
+
+def _sql_growth_metrics(
+    db: Session,
+    account_id: int,
+    username: str,
+    days: int,
+    start_date: datetime,
+    selected: set
+) -> Optional[Dict]:
+    """
+    get_growth_metrics on raw snapshots with ANALYTICS_BACKEND=sql: every
+    metric is computed by window-function queries (see sql_analytics) and
+    only their results are read.
+    """
+    summary = series_summary(db, account_id, start_date)
+    if not summary or summary["data_points"] < 2:
+        return None
+    
+    first = {"follower_count": summary["start_followers"], "checked_at": summary["start_date"]}
+    last = {"follower_count": summary["end_followers"], "checked_at": summary["end_date"]}
+    result = {
+        "username": username,
+        "start_date": first["checked_at"],
+        "end_date": last["checked_at"],
+        "start_followers": first["follower_count"],
+        "end_followers": last["follower_count"]
+    }
+    
+    if "growth" in selected:
+        result.update(_growth(first["follower_count"], last["follower_count"], days))
+    
+    for hours in (12, 24):
+        if f"change_{hours}h" in selected:
+            # Closest observation before the target time, else the earliest one
+            anchor = observation_before(
+                db, account_id, start_date, last["checked_at"] - timedelta(hours=hours), last["checked_at"]
+            )
+            result[f"change_{hours}h"] = _change_between(anchor or first, last)
+    
+    if "rolling_avg_7day" in selected:
+        week_start = max(start_date, last["checked_at"] - timedelta(days=7))
+        result["rolling_avg_7day"] = calculate_rolling_average(daily_last_values(db, account_id, week_start), days=7)
+    
+    if "changes_between_scrapes" in selected:
+        result["changes_between_scrapes"] = changes_between_scrapes(db, account_id, start_date)
+    
+    result["data_points"] = summary["data_points"]
+    result["resolution"] = "raw"
+    return result
+
+def get_follower_changes(
+    db: Session,
+    username: str,
+    days: int = 7,
+    load_series: Callable[..., List[Dict]] = get_follower_series
+) -> Optional[Dict]:
+    """
+    Changes between scrapes and 12/24-hour changes of an account.
+    """
+    metrics = get_growth_metrics(
+        db,
+        username=username,
+        days=days,
+        metrics=["changes_between_scrapes", "change_12h", "change_24h"],
+        load_series=load_series
+    )
+    if not metrics:
+        return None
+    
+    return {
+        "username": metrics["username"],
+        "current_followers": metrics["end_followers"],
+        "changes_between_scrapes": metrics["changes_between_scrapes"],
+        "change_12h": metrics["change_12h"],
+        "change_24h": metrics["change_24h"],
+        "data_points": metrics["data_points"]
+    }
+
+def get_rolling_average(
+    db: Session,
+    username: str,
+    load_series: Callable[..., List[Dict]] = get_follower_series
+) -> Optional[Dict]:
+    """
+    7-day rolling average of the daily follower change of an account, over
+    the week up to its latest observation (however long ago that was).
+    """
+    latest = get_latest_profile(db, username=username, fields=["checked_at"])
+    if not latest:
+        return None
+    
+    # Fetch back to a week before the latest observation; nothing comes
+    # after it, and one point per day is all the average needs
+    days = math.ceil((datetime.now() - latest["checked_at"]) / timedelta(days=1)) + 7
+    metrics = get_growth_metrics(
+        db,
+        username=username,
+        days=days,
+        resolution="day",
+        metrics=["rolling_avg_7day"],
+        load_series=load_series
+    )
+    if not metrics:
+        return None
+    
+    return {
+        "username": metrics["username"],
+        "current_followers": metrics["end_followers"],
+        "rolling_avg_7day": metrics["rolling_avg_7day"]
     }
 
 def calculate_period_change(profiles: List[Dict], hours: int = 24) -> Dict:
@@ -91,22 +297,28 @@ def calculate_period_change(profiles: List[Dict], hours: int = 24) -> Dict:
         closest_profile = profiles[0]
     
     if closest_profile:
-        change = profiles[-1]["follower_count"] - closest_profile["follower_count"]
-        percentage = (change / closest_profile["follower_count"] * 100) if closest_profile["follower_count"] > 0 else 0
-        hours_actual = (profiles[-1]["checked_at"] - closest_profile["checked_at"]).total_seconds() / 3600
-        
-        return {
-            "change": change,
-            "percentage": round(percentage, 2),
-            "previous_count": closest_profile["follower_count"],
-            "current_count": profiles[-1]["follower_count"],
-            "hours_actual": round(hours_actual, 1),
-            "from_timestamp": closest_profile["checked_at"],
-            "to_timestamp": profiles[-1]["checked_at"]
-        }
+        return _change_between(closest_profile, profiles[-1])
     
     return {"change": 0, "percentage": 0}
 
+def _change_between(previous: Dict, current: Dict) -> Dict:
+    """
+    Follower change from one point (follower_count, checked_at) to another.
+    """
+    change = current["follower_count"] - previous["follower_count"]
+    percentage = (change / previous["follower_count"] * 100) if previous["follower_count"] > 0 else 0
+    hours_actual = (current["checked_at"] - previous["checked_at"]).total_seconds() / 3600
+    
+    return {
+        "change": change,
+        "percentage": round(percentage, 2),
+        "previous_count": previous["follower_count"],
+        "current_count": current["follower_count"],
+        "hours_actual": round(hours_actual, 1),
+        "from_timestamp": previous["checked_at"],
+        "to_timestamp": current["checked_at"]
+    }
+
 def calculate_rolling_average(profiles: List[Dict], days: int = 7) -> Dict:
     """
     Calculate rolling average of follower growth over specified days.
@@ -120,8 +332,11 @@ def calculate_rolling_average(profiles: List[Dict], days: int = 7) -> Dict:
     # Filter profiles within the rolling window
     window_profiles = [p for p in profiles if p["checked_at"] >= start_time]
     
+    # A rollup point stands for sample_count scrapes
+    data_points = sum(p.get("sample_count", 1) for p in window_profiles)
+    
     if len(window_profiles) < 2:
-        return {"average_change": 0, "data_points": len(window_profiles)}
+        return {"average_change": 0, "data_points": data_points}
     
     # Group by day and calculate daily changes
     day_changes = []
@@ -161,19 +376,78 @@ def calculate_rolling_average(profiles: List[Dict], days: int = 7) -> Dict:
         "average_change": round(avg_change, 2),
         "total_change": sum(day_changes),
         "days_covered": len(sorted_days),
-        "data_points": len(window_profiles),
+        "data_points": data_points,
         "from_date": window_profiles[0]["checked_at"].date().isoformat() if window_profiles else None,
         "to_date": window_profiles[-1]["checked_at"].date().isoformat() if window_profiles else None
     }
 
-def get_comparison_data(db: Session, usernames: List[str], days: int = 30) -> Dict:
+# Periods of the follower changes in the dashboard summary
+SUMMARY_PERIODS = {"change_12h": timedelta(hours=12), "change_24h": timedelta(hours=24), "change_7d": timedelta(days=7)}
+
+def get_fleet_summary(db: Session) -> Dict:
+    """
+    Latest followers and 12h/24h/7d changes of every tracked account.
+    
+    Like the change_12h and change_24h growth metrics, each change is
+    measured back from the account's latest observation (not from now), to
+    the closest observation at or before that time or else the earliest
+    one. The latest snapshots and the earlier observations are each read
+    for the whole fleet in one query (see get_profiles_at_times and
+    get_observations_before). A change is None when the account has a
+    single observation.
+    """
+    now = datetime.now()
+    fields = ["username", "follower_count", "checked_at"]
+    latest_profiles = get_profiles_at_times(db, [now], fields=fields)[now]
+    
+    account_ids = {profile["username"]: account_index.resolve(db, profile["username"]) for profile in latest_profiles}
+    earlier = get_observations_before(db, {
+        account_ids[profile["username"]]: [profile["checked_at"] - period for period in SUMMARY_PERIODS.values()]
+        for profile in latest_profiles
+        if account_ids[profile["username"]]
+    })
+    
+    accounts = []
+    for latest in latest_profiles:
+        entry = dict(latest)
+        previous_points = earlier.get(account_ids[latest["username"]], [None] * len(SUMMARY_PERIODS))
+        for name, previous in zip(SUMMARY_PERIODS, previous_points):
+            measurable = previous is not None and previous["checked_at"] < latest["checked_at"]
+            entry[name] = _change_between(previous, latest) if measurable else None
+        accounts.append(entry)
+    
+    return {
+        "generated_at": now,
+        "accounts": accounts
+    }
+
+def get_comparison_data(
+    db: Session,
+    usernames: List[str],
+    days: int = 30,
+    resolution: Optional[str] = None,
+    grid: Optional[timedelta] = None,
+    fill: str = "locf"
+) -> Dict:
     """
     Compare growth metrics between multiple accounts.
+    
+    With a grid spacing the accounts' series are also returned aligned onto
+    a shared time grid (see resampling.resample) under "aligned".
+    
+    Raises:
+        ValueError: If fill is unknown or the grid has too many points
     """
+    if grid:
+        # Rejected before any series is read
+        check_method(fill)
+        end_date = datetime.now()
+        points = build_grid(end_date - timedelta(days=days), end_date, grid)
+    
     results = {}
     
     for username in usernames:
-        metrics = get_growth_metrics(db, username=username, days=days)
+        metrics = get_growth_metrics(db, username=username, days=days, resolution=resolution)
         if metrics:
             results[username] = metrics
     
@@ -192,7 +466,20 @@ def get_comparison_data(db: Session, usernames: List[str], days: int = 30) -> Di
                 "daily_growth": daily_growth_rank.index(username) + 1
             }
     
-    return {
+    comparison = {
         "accounts": results,
         "comparison_period_days": days
-    }
\ No newline at end of file
+    }
+    
+    if grid:
+        series = {
+            username: get_follower_series(db, username=username, days=days, resolution=choose_resolution(days, resolution))
+            for username in results
+        }
+        comparison["aligned"] = {
+            "grid": points,
+            "fill": fill,
+            "series": resample(series, points, grid, fill)
+        }
+    
+    return comparison
\ No newline at end of file
@@ -0,0 +1,245 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+from datetime import datetime, timedelta
+import logging
+import os
+import shutil
+import zlib
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.utils.db_chunks import delete_in_chunks
+from app.core.utils.partitions import month_start, add_months
+from app.models.profile import InstagramProfile
+
+logger = logging.getLogger(__name__)
+
+# Archive files hold one account-month of observations as three columns
+# (timestamps, follower counts, attribute version ids), each delta-encoded as
+# zigzag varints, and the whole payload zlib-compressed.
+MAGIC = b"IGA1"
+
+EPOCH = datetime(1970, 1, 1)
+
+# (checked_at, follower_count, attributes_id)
+Observation = Tuple[datetime, int, Optional[int]]
+
+def _write_varint(out: bytearray, value: int) -> None:
+    # Zigzag so that negative deltas stay short
+    value = (value << 1) ^ (value >> 63)
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+def _read_varints(data: bytes) -> Iterable[int]:
+    value = shift = 0
+    for byte in data:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        yield (value >> 1) ^ -(value & 1)
+        value = shift = 0
+
+def _write_column(out: bytearray, values: List[int]) -> None:
+    previous = 0
+    for value in values:
+        _write_varint(out, value - previous)
+        previous = value
+
+def encode_observations(observations: List[Observation]) -> bytes:
+    """
+    Encode observations (sorted by time) into the archive file format.
+    """
+    out = bytearray()
+    _write_varint(out, len(observations))
+    _write_column(out, [(checked_at - EPOCH) // timedelta(microseconds=1) for checked_at, _, _ in observations])
+    _write_column(out, [count or 0 for _, count, _ in observations])
+    # Attribute version ids start at 1, so 0 stands for "none"
+    _write_column(out, [attributes_id or 0 for _, _, attributes_id in observations])
+    return MAGIC + zlib.compress(bytes(out))
+
+def decode_observations(data: bytes) -> List[Observation]:
+    """
+    Decode an archive file written by encode_observations.
+    """
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError("Not a profile archive file")
+
+    values = _read_varints(zlib.decompress(data[len(MAGIC):]))
+    count = next(values, 0)
+    columns = []
+    for _ in range(3):
+        column, total = [], 0
+        for _ in range(count):
+            total += next(values)
+            column.append(total)
+        columns.append(column)
+
+    timestamps, counts, attribute_ids = columns
+    return [
+        (EPOCH + timedelta(microseconds=micros), follower_count, attributes_id or None)
+        for micros, follower_count, attributes_id in zip(timestamps, counts, attribute_ids)
+    ]
+
+def archive_cutoff(now: Optional[datetime] = None) -> Optional[datetime]:
+    """
+    Time before which snapshots may live in the archive instead of the
+    database, or None if archiving is disabled.
+    """
+    if not settings.ARCHIVE_ENABLED:
+        return None
+    return (now or datetime.now()) - timedelta(days=settings.ARCHIVE_AFTER_DAYS)
+
+def _account_dir(account_id: int) -> str:
+    return os.path.join(settings.ARCHIVE_DIR, str(account_id))
+
+def archive_path(account_id: int, month: datetime) -> str:
+    return os.path.join(_account_dir(account_id), f"{month:%Y-%m}.bin")
+
+def archived_account_ids() -> List[int]:
+    """
+    Accounts that have an archive directory.
+    """
+    if not os.path.isdir(settings.ARCHIVE_DIR):
+        return []
+    return sorted(int(name) for name in os.listdir(settings.ARCHIVE_DIR) if name.isdigit())
+
+def _archived_months(account_id: int) -> List[datetime]:
+    directory = _account_dir(account_id)
+    if not os.path.isdir(directory):
+        return []
+    return sorted(
+        datetime.strptime(name[:-len(".bin")], "%Y-%m")
+        for name in os.listdir(directory) if name.endswith(".bin")
+    )
+
+def _read_month(account_id: int, month: datetime) -> List[Observation]:
+    path = archive_path(account_id, month)
+    if not os.path.exists(path):
+        return []
+    with open(path, "rb") as f:
+        return decode_observations(f.read())
+
+def _write_month(account_id: int, month: datetime, observations: List[Observation]) -> None:
+    path = archive_path(account_id, month)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Write to a temporary file first so readers never see a partial file
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(encode_observations(observations))
+    os.replace(tmp_path, path)
+
+def read_archive(account_id: int, start: datetime, end: Optional[datetime] = None) -> List[Observation]:
+    """
+    Archived observations of an account with start <= checked_at < end,
+    oldest first.
+    """
+    end = end or datetime.now()
+    observations = []
+    month = month_start(start)
+    while month < end:
+        observations.extend(
+            observation for observation in _read_month(account_id, month)
+            if start <= observation[0] < end
+        )
+        month = add_months(month, 1)
+    return observations
+
+def read_archive_at(account_id: int, target_time: datetime) -> Optional[Observation]:
+    """
+    Latest archived observation of an account at or before target_time, or
+    None. Month files are read newest first until one has an observation.
+    """
+    for month in reversed(_archived_months(account_id)):
+        if month > target_time:
+            continue
+        observations = [observation for observation in _read_month(account_id, month) if observation[0] <= target_time]
+        if observations:
+            return observations[-1]
+    return None
+
+def delete_archive(account_id: int) -> bool:
+    """
+    Remove every archive file of an account (when it is purged).
+
+    Returns:
+        True if the account had an archive directory
+    """
+    directory = _account_dir(account_id)
+    if not os.path.isdir(directory):
+        return False
+    shutil.rmtree(directory)
+    return True
+
+def archive_account_month(db: Session, account_id: int, month: datetime, keep_after: datetime, chunk_size: int = 1000) -> int:
+    """
+    Move one month of an account's snapshots into its archive file.
+
+    Rows are merged into any existing file for the month, the file is
+    written, and only then are the rows deleted. Rows taken at or after
+    keep_after (the account's latest snapshot) and collapsed runs reaching
+    into the next month stay in the database.
+
+    Returns:
+        Number of rows archived
+    """
+    next_month = add_months(month, 1)
+    limit = min(next_month, keep_after)
+    criteria = (
+        InstagramProfile.account_id == account_id,
+        InstagramProfile.checked_at >= month,
+        InstagramProfile.checked_at < limit,
+        func.coalesce(InstagramProfile.last_seen_at, InstagramProfile.checked_at) < next_month,
+    )
+    rows = db.query(
+        InstagramProfile.checked_at,
+        InstagramProfile.last_seen_at,
+        InstagramProfile.follower_count,
+        InstagramProfile.attributes_id
+    ).filter(*criteria).all()
+    if not rows:
+        return 0
+
+    observations = {observation[0]: observation for observation in _read_month(account_id, month)}
+    for checked_at, last_seen_at, follower_count, attributes_id in rows:
+        observations[checked_at] = (checked_at, follower_count, attributes_id)
+        if last_seen_at and last_seen_at > checked_at:
+            observations[last_seen_at] = (last_seen_at, follower_count, attributes_id)
+    _write_month(account_id, month, sorted(observations.values()))
+
+    return delete_in_chunks(db, InstagramProfile, *criteria, chunk_size=chunk_size)
+
+def archive_before(db: Session, cutoff: datetime, chunk_size: int = 1000) -> Dict:
+    """
+    Archive every whole month of snapshots that ends before cutoff.
+
+    Each account's latest snapshot is kept in the database so that current
+    follower counts stay available.
+
+    Returns:
+        Dict with the number of account-months and rows archived
+    """
+    last_month = month_start(cutoff)
+    candidates = db.query(
+        InstagramProfile.account_id,
+        func.min(InstagramProfile.checked_at),
+        func.max(InstagramProfile.checked_at)
+    ).group_by(InstagramProfile.account_id).having(
+        func.min(InstagramProfile.checked_at) < last_month
+    ).all()
+
+    result = {"archived_months": 0, "archived_rows": 0}
+    for account_id, oldest, latest in candidates:
+        month = month_start(oldest)
+        while month < last_month:
+            archived = archive_account_month(db, account_id, month, latest, chunk_size=chunk_size)
+            if archived:
+                result["archived_months"] += 1
+                result["archived_rows"] += archived
+            month = add_months(month, 1)
+
+    logger.info(f"Archived {result['archived_rows']} snapshots in {result['archived_months']} account-months")
+    return result
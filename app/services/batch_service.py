@@ -0,0 +1,113 @@
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime, timedelta
+
+from sqlalchemy.orm import Session
+
+from app.schemas.batch import BatchQuery
+from app.services.account_index import account_index
+from app.services.analytics_service import get_growth_metrics, get_follower_changes, get_rolling_average, parse_metrics
+from app.services.profile_service import get_follower_series, get_latest_profile, get_profile_history, parse_fields
+
+# Window of each sub-query type when days is omitted, as on the GET endpoints
+DEFAULT_DAYS = {"history": 30, "growth": 30, "changes": 7}
+
+class SharedSeries:
+    """
+    get_follower_series for the sub-queries of one batch.
+
+    Each series is fetched once; a raw series also serves every shorter
+    raw window of the same account, which is cut from it.
+    """
+
+    def __init__(self):
+        self.series: Dict[Tuple[str, str, int], List[Dict]] = {}
+
+    def __call__(self, db: Session, username: str, days: int = 30, resolution: str = "raw") -> List[Dict]:
+        if (username, resolution, days) in self.series:
+            return self.series[(username, resolution, days)]
+
+        if resolution == "raw":
+            covering = [
+                fetched_days for name, fetched_resolution, fetched_days in self.series
+                if name == username and fetched_resolution == "raw" and fetched_days > days
+            ]
+            if covering:
+                start_date = datetime.now() - timedelta(days=days)
+                points = self.series[(username, "raw", min(covering))]
+                return [point for point in points if point["checked_at"] >= start_date]
+
+        series = get_follower_series(db, username=username, days=days, resolution=resolution)
+        self.series[(username, resolution, days)] = series
+        return series
+
+def _run_query(db: Session, query: BatchQuery, days: int, shared: SharedSeries) -> Tuple[int, Optional[Dict], str]:
+    if query.type == "profile":
+        body = get_latest_profile(db, username=query.username, fields=parse_fields(query.fields))
+        return (200, body, "") if body else (404, None, f"Profile for {query.username} not found")
+
+    if query.type == "history":
+        body = get_profile_history(db, username=query.username, days=days, fields=parse_fields(query.fields))
+        return (200, body, "") if body else (404, None, f"Profile history for {query.username} not found")
+
+    if query.type == "growth":
+        body = get_growth_metrics(
+            db,
+            username=query.username,
+            days=days,
+            resolution=query.resolution,
+            metrics=parse_metrics(query.metrics),
+            load_series=shared
+        )
+        return (200, body, "") if body else (404, None, f"Growth metrics for {query.username} not found")
+
+    if query.type == "changes":
+        body = get_follower_changes(db, username=query.username, days=days, load_series=shared)
+        return (200, body, "") if body else (404, None, f"Follower changes for {query.username} not found")
+
+    body = get_rolling_average(db, username=query.username, load_series=shared)
+    return (200, body, "") if body else (404, None, f"Rolling average for {query.username} not found")
+
+def run_batch(db: Session, queries: List[BatchQuery]) -> List[Dict]:
+    """
+    Run many profile and analytics sub-queries on one database session.
+
+    Usernames are resolved once per batch, identical sub-queries are run
+    once, and follower series are shared between sub-queries (see
+    SharedSeries). Longer windows run first so that shorter raw windows can
+    be cut from their series.
+
+    Returns:
+        One result per sub-query, in request order: id, type, username,
+        status (200, 400 or 404) and either body or detail
+    """
+    known = {username: account_index.resolve(db, username) for username in {query.username for query in queries}}
+    shared = SharedSeries()
+    outcomes: Dict[Tuple, Tuple[int, Optional[Dict], str]] = {}
+
+    def window(query: BatchQuery) -> int:
+        return query.days or DEFAULT_DAYS.get(query.type, 0)
+
+    for query in sorted(queries, key=window, reverse=True):
+        key = (query.type, query.username, window(query), query.resolution, query.metrics, query.fields)
+        if key in outcomes:
+            continue
+        if not known[query.username]:
+            outcomes[key] = (404, None, f"Account {query.username} not found")
+            continue
+        try:
+            outcomes[key] = _run_query(db, query, window(query), shared)
+        except ValueError as e:
+            outcomes[key] = (400, None, str(e))
+
+    results = []
+    for query in queries:
+        status, body, detail = outcomes[(
+            query.type, query.username, window(query), query.resolution, query.metrics, query.fields
+        )]
+        result = {"id": query.id, "type": query.type, "username": query.username, "status": status}
+        if status == 200:
+            result["body"] = body
+        else:
+            result["detail"] = detail
+        results.append(result)
+    return results
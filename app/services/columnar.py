@@ -0,0 +1,106 @@
+from typing import Dict, Iterable, Iterator, List, Optional
+from itertools import islice
+
+# Arrow and Parquet output need the optional "pyarrow" package
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    ARROW_AVAILABLE = True
+except ImportError:
+    ARROW_AVAILABLE = False
+
+MEDIA_TYPES = {
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet"
+}
+
+def _schema(with_username: bool):
+    fields = [("checked_at", pa.timestamp("us")), ("follower_count", pa.int64())]
+    if with_username:
+        fields.insert(0, ("username", pa.string()))
+    return pa.schema(fields)
+
+class _ChunkSink:
+    """
+    Write-only file that hands out what has been written so far, so that
+    encoded output can be streamed while the writer is still open.
+    """
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        chunk = bytes(data)
+        self.chunks.append(chunk)
+        self.position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+def _batches(rows: Iterable[Dict], schema, batch_size: int) -> Iterator:
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, batch_size))
+        if not chunk:
+            return
+        yield pa.RecordBatch.from_pylist(chunk, schema=schema)
+
+def encode_rows(rows: Iterable[Dict], output_format: str, with_username: bool = False, batch_size: int = 5000) -> Iterator[bytes]:
+    """
+    Encode (username,) checked_at, follower_count rows as an Arrow IPC stream
+    or a Parquet file, batch_size rows per record batch or row group.
+
+    Each batch is yielded as soon as it is encoded, so that large results can
+    be streamed; concatenated, the chunks form the complete file.
+
+    Raises:
+        ValueError: If pyarrow is not installed or the format is unknown
+    """
+    if not ARROW_AVAILABLE:
+        raise ValueError(f"format={output_format} requires the pyarrow package")
+    if output_format not in MEDIA_TYPES:
+        raise ValueError(f"Unsupported format: {output_format}")
+
+    schema = _schema(with_username)
+    sink = _ChunkSink()
+    output = pa.PythonFile(sink, mode="w")
+    writer = pa.ipc.new_stream(output, schema) if output_format == "arrow" else pq.ParquetWriter(output, schema)
+    try:
+        for batch in _batches(rows, schema, batch_size):
+            if output_format == "arrow":
+                writer.write_batch(batch)
+            else:
+                writer.write_table(pa.Table.from_batches([batch], schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+def encode_history(history: List[Dict], output_format: str) -> bytes:
+    """
+    Encode a history list (checked_at and follower_count of each entry) as a
+    single Arrow IPC stream or Parquet file.
+    """
+    rows = ({"checked_at": point["checked_at"], "follower_count": point["follower_count"]} for point in history)
+    return b"".join(encode_rows(rows, output_format, batch_size=max(len(history), 1)))
+
+def check_format(output_format: Optional[str]) -> None:
+    """
+    Raise ValueError if a columnar format cannot be produced.
+    """
+    if output_format in MEDIA_TYPES and not ARROW_AVAILABLE:
+        raise ValueError(f"format={output_format} requires the pyarrow package")
@@ -0,0 +1,129 @@
+from typing import Dict, Iterable, Iterator, List
+from datetime import datetime
+import csv
+import io
+import json
+
+from sqlalchemy.orm import Session
+
+from app.models.profile import InstagramProfile
+from app.models.profile_attributes import ProfileAttributes
+from app.services.columnar import encode_rows
+from app.services.profile_service import carried_in_runs
+
+# Rows fetched from the database cursor at a time
+EXPORT_BATCH_SIZE = 5000
+
+EXPORT_FIELDS = ("username", "checked_at", "follower_count", "full_name", "biography", "profile_pic_url")
+
+def iter_history(bind, accounts: Dict[int, str], start: datetime) -> Iterator[Dict]:
+    """
+    Stream the stored snapshot history of accounts from start on, grouped by
+    account and oldest first, with collapsed runs expanded into their first
+    and last observation.
+
+    Rows are read through a server-side cursor on a session of their own, so
+    the export can outlive the request's session and runs in constant memory.
+
+    Args:
+        bind: Engine or connection to read from
+        accounts: Account ids mapped to usernames
+        start: Earliest observation to export
+    """
+    db = Session(bind=bind)
+    try:
+        snapshots = db.query(
+            InstagramProfile.account_id,
+            InstagramProfile.checked_at,
+            InstagramProfile.last_seen_at,
+            InstagramProfile.follower_count,
+            ProfileAttributes.full_name,
+            ProfileAttributes.biography,
+            ProfileAttributes.profile_pic_url
+        ).outerjoin(
+            ProfileAttributes, InstagramProfile.attributes_id == ProfileAttributes.id
+        ).filter(
+            InstagramProfile.account_id.in_(list(accounts))
+        )
+
+        # Filtering on checked_at alone keeps the index (and partition pruning)
+        # usable; collapsed runs started before start are looked up separately
+        carried_in = carried_in_runs(snapshots, start).order_by(InstagramProfile.account_id).all()
+        rows = snapshots.filter(
+            InstagramProfile.checked_at >= start
+        ).order_by(
+            InstagramProfile.account_id,
+            InstagramProfile.checked_at
+        ).execution_options(stream_results=True).yield_per(EXPORT_BATCH_SIZE)
+
+        for account_id, checked_at, last_seen_at, follower_count, full_name, biography, profile_pic_url in (
+            _merge_carried_in(carried_in, rows)
+        ):
+            observed = [checked_at]
+            if last_seen_at and last_seen_at > checked_at:
+                observed.append(last_seen_at)
+            for observed_at in observed:
+                if observed_at < start:
+                    continue
+                yield {
+                    "username": accounts[account_id],
+                    "checked_at": observed_at,
+                    "follower_count": follower_count,
+                    "full_name": full_name,
+                    "biography": biography,
+                    "profile_pic_url": profile_pic_url
+                }
+    finally:
+        db.close()
+
+def _merge_carried_in(carried_in: List, rows: Iterable) -> Iterator:
+    # Each carried-in run goes before its account's rows in the window
+    pending = iter(carried_in)
+    carried = next(pending, None)
+    for row in rows:
+        while carried is not None and carried.account_id <= row.account_id:
+            yield carried
+            carried = next(pending, None)
+        yield row
+    while carried is not None:
+        yield carried
+        carried = next(pending, None)
+
+def to_ndjson(rows: Iterator[Dict]) -> Iterator[bytes]:
+    """
+    Encode rows as newline-delimited JSON, one line per row.
+    """
+    for row in rows:
+        yield (json.dumps(row, default=datetime.isoformat) + "\n").encode("utf-8")
+
+def to_csv(rows: Iterator[Dict], rows_per_chunk: int = 1000) -> Iterator[bytes]:
+    """
+    Encode rows as CSV with a header line, rows_per_chunk rows per chunk.
+    """
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+    writer.writeheader()
+    pending = 0
+    for row in rows:
+        writer.writerow({**row, "checked_at": row["checked_at"].isoformat()})
+        pending += 1
+        if pending >= rows_per_chunk:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    yield buffer.getvalue().encode("utf-8")
+
+def to_arrow(rows: Iterator[Dict]) -> Iterator[bytes]:
+    """
+    Encode the username, checked_at and follower_count of rows as an Arrow
+    IPC stream, one record batch per EXPORT_BATCH_SIZE rows.
+    """
+    return encode_rows(rows, "arrow", with_username=True, batch_size=EXPORT_BATCH_SIZE)
+
+def to_parquet(rows: Iterator[Dict]) -> Iterator[bytes]:
+    """
+    Encode the username, checked_at and follower_count of rows as a Parquet
+    file, one row group per EXPORT_BATCH_SIZE rows.
+    """
+    return encode_rows(rows, "parquet", with_username=True, batch_size=EXPORT_BATCH_SIZE)
@@ -0,0 +1,339 @@
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+import logging
+import threading
+import time
+
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.models.account import InstagramAccount
+from app.models.profile import InstagramProfile
+from app.services.account_index import account_index
+
+logger = logging.getLogger(__name__)
+
+EPOCH = datetime(1970, 1, 1)
+
+def _to_micros(moment: datetime) -> int:
+    return (moment - EPOCH) // timedelta(microseconds=1)
+
+def _from_micros(micros: int) -> datetime:
+    return EPOCH + timedelta(microseconds=micros)
+
+class _Series:
+    """
+    One account's observations in the hot window as parallel int64 columns
+    (microsecond timestamps and follower counts), oldest first.
+
+    The older part may be a read-only view into a memory-mapped series
+    snapshot (see series_snapshot), shared with other processes; newer
+    observations go to the process's own arrays.
+    """
+    __slots__ = ("base_timestamps", "base_counts", "timestamps", "counts", "loaded_at")
+
+    def __init__(self, base_timestamps=(), base_counts=()):
+        self.base_timestamps = base_timestamps
+        self.base_counts = base_counts
+        self.timestamps = array("q")
+        self.counts = array("q")
+        self.loaded_at = time.monotonic()
+
+    def _materialize(self) -> None:
+        # Copy the shared part into own arrays before modifying it
+        if len(self.base_timestamps):
+            self.timestamps = array("q", self.base_timestamps) + self.timestamps
+            self.counts = array("q", self.base_counts) + self.counts
+            self.base_timestamps = self.base_counts = ()
+
+    def last(self, position: int = -1):
+        """
+        (timestamp, count) of the observation at a negative position.
+        """
+        tail = len(self.timestamps)
+        if -position <= tail:
+            return self.timestamps[position], self.counts[position]
+        base_position = position + tail
+        if -base_position <= len(self.base_timestamps):
+            return self.base_timestamps[base_position], self.base_counts[base_position]
+        return None
+
+    def add(self, micros: int, follower_count: int) -> None:
+        last = self.last()
+        if last is None or micros > last[0]:
+            self.timestamps.append(micros)
+            self.counts.append(follower_count)
+            return
+        if len(self.base_timestamps) and micros <= self.base_timestamps[-1]:
+            index = bisect_left(self.base_timestamps, micros)
+            if self.base_timestamps[index] == micros and self.base_counts[index] == follower_count:
+                return
+            self._materialize()
+        index = bisect_left(self.timestamps, micros)
+        if index < len(self.timestamps) and self.timestamps[index] == micros:
+            self.counts[index] = follower_count
+        else:
+            self.timestamps.insert(index, micros)
+            self.counts.insert(index, follower_count)
+
+    def extend_last(self, micros: int) -> None:
+        """
+        Move the last observation to a later time.
+        """
+        if not len(self.timestamps):
+            self._materialize()
+        self.timestamps[-1] = micros
+
+    def trim(self, start_micros: int) -> None:
+        index = bisect_left(self.base_timestamps, start_micros)
+        if index:
+            self.base_timestamps = self.base_timestamps[index:]
+            self.base_counts = self.base_counts[index:]
+        index = bisect_left(self.timestamps, start_micros)
+        if index:
+            del self.timestamps[:index]
+            del self.counts[:index]
+
+    def points(self, start_micros: int):
+        """
+        (timestamp, count) pairs from start_micros on.
+        """
+        index = bisect_left(self.base_timestamps, start_micros)
+        yield from zip(self.base_timestamps[index:], self.base_counts[index:])
+        index = bisect_left(self.timestamps, start_micros)
+        yield from zip(self.timestamps[index:], self.counts[index:])
+
+    def __len__(self) -> int:
+        return len(self.base_timestamps) + len(self.timestamps)
+
+class HotSeriesStore:
+    """
+    In-process cache of every account's follower series over the last
+    HOT_STORE_WINDOW_DAYS days.
+
+    Series are loaded at startup (or lazily on first use), appended to on
+    ingest and reloaded after HOT_STORE_TTL_SECONDS to pick up writes from
+    other processes. When more than HOT_STORE_MAX_POINTS observations are
+    held, the least recently queried accounts are evicted.
+
+    With a series snapshot attached, series are built on top of the
+    snapshot's memory-mapped columns and only newer observations are read
+    from the database.
+    """
+
+    def __init__(self):
+        self._series: "OrderedDict[str, _Series]" = OrderedDict()
+        self._points = 0
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+            self._points = 0
+            self._snapshot = None
+            self.hits = self.misses = 0
+
+    def evict(self, username: str) -> None:
+        with self._lock:
+            series = self._series.pop(username, None)
+            if series is not None:
+                self._points -= len(series)
+
+    def stats(self) -> Dict:
+        return {
+            "accounts": len(self._series),
+            "points": self._points,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+    def _window_start(self) -> datetime:
+        return datetime.now() - timedelta(days=settings.HOT_STORE_WINDOW_DAYS)
+
+    def _put(self, username: str, series: _Series) -> None:
+        # Caller holds the lock
+        previous = self._series.pop(username, None)
+        if previous is not None:
+            self._points -= len(previous)
+        self._series[username] = series
+        self._points += len(series)
+        while self._points > settings.HOT_STORE_MAX_POINTS and len(self._series) > 1:
+            _, evicted = self._series.popitem(last=False)
+            self._points -= len(evicted)
+
+    def _observations(self, db: Session, start: datetime, username: Optional[str] = None, snapshot=None):
+        query = db.query(
+            InstagramAccount.username,
+            InstagramProfile.checked_at,
+            InstagramProfile.last_seen_at,
+            InstagramProfile.follower_count
+        ).join(
+            InstagramAccount, InstagramProfile.account_id == InstagramAccount.id
+        ).filter(
+            InstagramAccount.status != "deleted",
+            func.coalesce(InstagramProfile.last_seen_at, InstagramProfile.checked_at) >= start
+        )
+        if username is not None:
+            query = query.filter(InstagramAccount.username == username)
+        if snapshot is not None:
+            # Only rows written or extended since the snapshot was taken
+            query = query.filter(or_(
+                InstagramProfile.id > snapshot.max_profile_id,
+                func.coalesce(InstagramProfile.last_seen_at, InstagramProfile.checked_at) >= snapshot.created_at
+            ))
+        return query.order_by(InstagramProfile.checked_at)
+
+    def _build(self, rows, start: datetime, built: Optional[Dict[str, _Series]] = None) -> Dict[str, _Series]:
+        # Collapsed rows are expanded into their first and last observation,
+        # as profile_service does
+        built = {} if built is None else built
+        for username, checked_at, last_seen_at, follower_count in rows:
+            series = built.setdefault(username, _Series())
+            if checked_at >= start:
+                series.add(_to_micros(checked_at), follower_count)
+            if last_seen_at and last_seen_at > checked_at:
+                series.add(_to_micros(last_seen_at), follower_count)
+        return built
+
+    def attach_snapshot(self, snapshot) -> None:
+        """
+        Build series loaded from now on from a SeriesSnapshot.
+        """
+        with self._lock:
+            self._snapshot = snapshot
+
+    def _window(self, db: Session, username: Optional[str] = None, use_snapshot: bool = True) -> Dict[str, _Series]:
+        start = self._window_start()
+        snapshot = self._snapshot if use_snapshot else None
+        if snapshot is None or snapshot.window_start > start:
+            rows = self._observations(db, start, username)
+            return self._build(rows if username else rows.yield_per(10000), start)
+
+        if username is not None:
+            usernames = [username]
+        else:
+            active = {name for (name,) in db.query(InstagramAccount.username).filter(InstagramAccount.status != "deleted")}
+            usernames = [name for name in snapshot.usernames() if name in active]
+
+        built: Dict[str, _Series] = {}
+        start_micros = _to_micros(start)
+        for name in usernames:
+            columns = snapshot.series(name)
+            if columns is not None:
+                series = _Series(*columns)
+                series.trim(start_micros)
+                built[name] = series
+
+        # Top up with what was written after the snapshot
+        rows = self._observations(db, start, username, snapshot)
+        return self._build(rows if username else rows.yield_per(10000), start, built)
+
+    def database_window(self, db: Session) -> Dict[str, _Series]:
+        """
+        Every account's hot window read from the database alone.
+        """
+        return self._window(db, use_snapshot=False)
+
+    def load_all(self, session_factory: sessionmaker) -> int:
+        """
+        Load the hot window of every account in one query.
+
+        Returns:
+            Number of accounts loaded
+        """
+        db: Session = session_factory()
+        try:
+            built = self._window(db)
+        finally:
+            db.close()
+
+        with self._lock:
+            for username, series in built.items():
+                self._put(username, series)
+        logger.info(f"Hot series store loaded {len(built)} accounts ({self._points} points)")
+        return len(built)
+
+    def _load(self, db: Session, username: str) -> Optional[_Series]:
+        if account_index.resolve(db, username) is None:
+            return None
+
+        series = self._window(db, username).get(username, _Series())
+        with self._lock:
+            self._put(username, series)
+        return series
+
+    def get_series(self, db: Session, username: str, days: float) -> Optional[List[Dict]]:
+        """
+        Follower series of an account over the last days, or None if the
+        window is outside the hot range (or the store is disabled) and the
+        caller should query the database.
+
+        Returns:
+            List of dicts with follower_count and checked_at, oldest first
+        """
+        if not settings.HOT_STORE_ENABLED or days > settings.HOT_STORE_WINDOW_DAYS:
+            return None
+
+        start = _to_micros(datetime.now() - timedelta(days=days))
+        with self._lock:
+            series = self._series.get(username)
+            if series is not None and time.monotonic() - series.loaded_at > settings.HOT_STORE_TTL_SECONDS:
+                series = None
+            if series is not None:
+                self._series.move_to_end(username)
+                self.hits += 1
+                # Copied under the lock: append() modifies the arrays in place
+                points = list(series.points(start))
+            else:
+                self.misses += 1
+
+        if series is None:
+            series = self._load(db, username)
+            if series is None:
+                return None
+            with self._lock:
+                points = list(series.points(start))
+
+        return [
+            {"follower_count": count, "checked_at": _from_micros(micros)}
+            for micros, count in points
+        ]
+
+    def append(self, username: str, checked_at: datetime, follower_count: int) -> None:
+        """
+        Add an ingested observation to an account's series if it is loaded.
+        Accounts not loaded yet pick the observation up from the database.
+        """
+        if not settings.HOT_STORE_ENABLED:
+            return
+
+        with self._lock:
+            series = self._series.get(username)
+            if series is None:
+                return
+
+            # In collapsed mode an unchanged count only moves the end of the run
+            micros = _to_micros(checked_at)
+            last, previous = series.last(-1), series.last(-2)
+            if (
+                settings.PROFILE_STORAGE_MODE == "collapsed"
+                and last is not None and previous is not None
+                and last[1] == previous[1] == follower_count
+                and micros > last[0]
+            ):
+                series.extend_last(micros)
+                return
+
+            size = len(series)
+            series.add(micros, follower_count)
+            series.trim(_to_micros(self._window_start()))
+            self._points += len(series) - size
+
+hot_series_store = HotSeriesStore()
@@ -0,0 +1,220 @@
+from typing import List, Dict, Optional, Tuple
+from datetime import datetime
+import logging
+
+from sqlalchemy.orm import Session
+from sqlalchemy import desc, func
+
+from app.core.config import settings
+from app.core.utils.date_utils import to_local_naive
+from app.models.account import InstagramAccount
+from app.models.profile import InstagramProfile
+from app.models.profile_attributes import ProfileAttributes
+from app.services.profile_service import refresh_analytics_cache, refresh_summary_cache
+from app.services.rollup_service import update_rollups
+from app.services.hot_store import hot_series_store
+from app.services.account_index import account_index
+
+logger = logging.getLogger(__name__)
+
+ATTRIBUTE_FIELDS = ("full_name", "biography", "profile_pic_url")
+
+def _parse_timestamp(value) -> datetime:
+    if isinstance(value, datetime):
+        return to_local_naive(value)
+    if value:
+        try:
+            return to_local_naive(datetime.fromisoformat(str(value).replace("Z", "+00:00")))
+        except ValueError:
+            logger.warning(f"Invalid checked_at value: {value}")
+    return datetime.now()
+
+def resolve_attributes(
+    db: Session,
+    account_id: int,
+    values: Dict,
+    seen_at: datetime,
+    latest_by_account: Optional[Dict[int, Tuple[ProfileAttributes, Optional[datetime]]]] = None
+) -> ProfileAttributes:
+    """
+    Return the attribute version matching values, creating a new version only
+    if they differ from the version in effect at seen_at (so backfilled or
+    out-of-order scrapes are compared with the attributes of their time, not
+    the account's newest ones).
+
+    Args:
+        db: Database session
+        account_id: Account the attributes belong to
+        values: Dict with full_name, biography and profile_pic_url
+        seen_at: When these attributes were observed
+        latest_by_account: Optional per-batch cache of each account's version
+            and the time the next version takes over (None if it is the newest)
+    """
+    cache = latest_by_account if latest_by_account is not None else {}
+
+    current, valid_until = cache.get(account_id, (None, None))
+    if current is None or current.first_seen_at > seen_at or (valid_until is not None and seen_at >= valid_until):
+        current = db.query(ProfileAttributes).filter(
+            ProfileAttributes.account_id == account_id,
+            ProfileAttributes.first_seen_at <= seen_at
+        ).order_by(desc(ProfileAttributes.first_seen_at), desc(ProfileAttributes.id)).first()
+        valid_until = db.query(func.min(ProfileAttributes.first_seen_at)).filter(
+            ProfileAttributes.account_id == account_id,
+            ProfileAttributes.first_seen_at > seen_at
+        ).scalar()
+
+    if current is None or any(getattr(current, field) != values.get(field) for field in ATTRIBUTE_FIELDS):
+        current = ProfileAttributes(
+            account_id=account_id,
+            first_seen_at=seen_at,
+            **{field: values.get(field) for field in ATTRIBUTE_FIELDS}
+        )
+        db.add(current)
+        db.flush()
+
+    cache[account_id] = (current, valid_until)
+    return current
+
+def _latest_snapshot(
+    db: Session,
+    account_id: int,
+    latest_snapshots: Optional[Dict[int, InstagramProfile]]
+) -> Optional[InstagramProfile]:
+    if latest_snapshots is not None and account_id in latest_snapshots:
+        return latest_snapshots[account_id]
+    return db.query(InstagramProfile).filter(
+        InstagramProfile.account_id == account_id
+    ).order_by(desc(InstagramProfile.checked_at)).first()
+
+def record_snapshot(
+    db: Session,
+    account_id: int,
+    follower_count: int,
+    checked_at: Optional[datetime] = None,
+    full_name: Optional[str] = None,
+    biography: Optional[str] = None,
+    profile_pic_url: Optional[str] = None,
+    latest_by_account: Optional[Dict[int, Tuple[ProfileAttributes, Optional[datetime]]]] = None,
+    latest_snapshots: Optional[Dict[int, InstagramProfile]] = None,
+    rollup_buckets: Optional[Dict] = None
+) -> InstagramProfile:
+    """
+    Add a follower snapshot for an account to the session (without committing).
+
+    In "collapsed" storage mode a scrape that matches the account's latest
+    snapshot (same follower count and attributes) extends that row's
+    last_seen_at instead of inserting a new row.
+
+    Args:
+        latest_by_account: Optional per-batch cache of attribute versions
+        latest_snapshots: Optional per-batch cache of each account's latest snapshot
+
+    Returns:
+        The inserted or extended snapshot
+    """
+    # Stored timestamps are naive local time; aware ones would not compare
+    checked_at = to_local_naive(checked_at) if checked_at else datetime.now()
+    attributes = resolve_attributes(
+        db,
+        account_id,
+        {"full_name": full_name, "biography": biography, "profile_pic_url": profile_pic_url},
+        checked_at,
+        latest_by_account
+    )
+    update_rollups(db, account_id, follower_count, checked_at, rollup_buckets)
+
+    if settings.PROFILE_STORAGE_MODE == "collapsed":
+        previous = _latest_snapshot(db, account_id, latest_snapshots)
+        if (
+            previous is not None
+            and previous.follower_count == follower_count
+            and previous.attributes_id == attributes.id
+            and checked_at > (previous.last_seen_at or previous.checked_at)
+        ):
+            previous.last_seen_at = checked_at
+            if latest_snapshots is not None:
+                latest_snapshots[account_id] = previous
+            return previous
+
+    snapshot = InstagramProfile(
+        account_id=account_id,
+        follower_count=follower_count,
+        checked_at=checked_at,
+        attributes_id=attributes.id
+    )
+    db.add(snapshot)
+
+    if latest_snapshots is not None:
+        previous = latest_snapshots.get(account_id)
+        if previous is None or checked_at >= previous.checked_at:
+            latest_snapshots[account_id] = snapshot
+    return snapshot
+
+def ingest_profiles(db: Session, profiles: List[Dict]) -> Dict:
+    """
+    Store a batch of profile payloads from the Scraper Service.
+
+    Accounts missing from the database are created. The whole batch is
+    committed in one transaction; afterwards the observations are appended to
+    the hot series store, the analytics cache of every affected account and
+    the dashboard summary are cleared.
+
+    Args:
+        db: Database session
+        profiles: Dicts with username, follower_count, checked_at and the
+            text attributes, as returned by the scraper's /profiles endpoint
+
+    Returns:
+        Dict with counts of stored snapshots and created accounts
+    """
+    usernames = {profile["username"] for profile in profiles if profile.get("username")}
+    accounts = {
+        account.username: account
+        for account in db.query(InstagramAccount).filter(InstagramAccount.username.in_(usernames))
+    }
+
+    created = []
+    for username in usernames - accounts.keys():
+        account = InstagramAccount(username=username, status="active")
+        db.add(account)
+        accounts[username] = account
+        created.append(account)
+    db.flush()
+
+    latest_by_account: Dict[int, Tuple[ProfileAttributes, Optional[datetime]]] = {}
+    latest_snapshots: Dict[int, InstagramProfile] = {}
+    rollup_buckets: Dict = {}
+    observations = []
+    for profile in sorted(profiles, key=lambda p: _parse_timestamp(p.get("checked_at"))):
+        account = accounts.get(profile.get("username"))
+        if account is None or account.status == "deleted":
+            continue
+
+        checked_at = _parse_timestamp(profile.get("checked_at"))
+        follower_count = profile.get("follower_count", 0)
+        record_snapshot(
+            db,
+            account.id,
+            follower_count,
+            checked_at=checked_at,
+            full_name=profile.get("full_name"),
+            biography=profile.get("biography"),
+            profile_pic_url=profile.get("profile_pic_url"),
+            latest_by_account=latest_by_account,
+            latest_snapshots=latest_snapshots,
+            rollup_buckets=rollup_buckets
+        )
+        observations.append((account.username, checked_at, follower_count))
+
+    db.commit()
+
+    for account in created:
+        account_index.add(account.username, account.id)
+    for username, checked_at, follower_count in observations:
+        hot_series_store.append(username, checked_at, follower_count)
+
+    for username in usernames:
+        refresh_analytics_cache(username)
+    refresh_summary_cache()
+
+    return {"ingested": len(observations), "accounts_created": len(created)}
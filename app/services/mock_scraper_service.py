@@ -1,4 +1,4 @@
-﻿from typing import List, Dict
+﻿from typing import List, Dict, Optional
 import logging
 from datetime import datetime
 import random
@@ -44,13 +44,15 @@ async def fetch_accounts() -> List[Dict]:
     logger.info("Using mock scraper service: fetch_accounts")
     return _accounts
 
-async def trigger_scrape() -> Dict:
+async def trigger_scrape(username: Optional[str] = None) -> Dict:
     """
     Mock implementation that simulates a scrape.
     """
-    logger.info("Using mock scraper service: trigger_scrape")
+    logger.info(f"Using mock scraper service: trigger_scrape({username})")
     # Update timestamps and follower counts
     for profile in _profiles:
+        if username and profile["username"] != username:
+            continue
         profile["checked_at"] = datetime.now().isoformat()
         profile["follower_count"] += random.randint(-100, 500)
     
@@ -117,4 +119,38 @@ async def delete_account(username: str) -> Dict:
                     
             return {"message": f"Account '{username}' and all associated profile data deleted successfully"}
     
-    return {"status": "error", "message": f"Account '{username}' not found"}
+    return {"status": "error", "message": f"Account '{username}' not found"}
+
+async def add_accounts(usernames: List[str]) -> Dict:
+    """
+    Mock implementation that adds many accounts.
+    
+    Returns the same "added"/"skipped"/"failed" structure as the real bulk call.
+    """
+    logger.info(f"Using mock scraper service: add_accounts({len(usernames)} usernames)")
+    
+    added, skipped = [], []
+    for username in dict.fromkeys(usernames):
+        result = await add_account(username)
+        if result["status"] == "success":
+            added.append(username)
+        else:
+            skipped.append({"username": username, "reason": result["message"]})
+    
+    return {"added": added, "skipped": skipped, "failed": []}
+
+async def delete_accounts(usernames: List[str]) -> Dict:
+    """
+    Mock implementation that deletes many accounts.
+    """
+    logger.info(f"Using mock scraper service: delete_accounts({len(usernames)} usernames)")
+    
+    deleted, failed = [], []
+    for username in dict.fromkeys(usernames):
+        result = await delete_account(username)
+        if "error" in result.get("status", ""):
+            failed.append({"username": username, "reason": result["message"]})
+        else:
+            deleted.append(username)
+    
+    return {"deleted": deleted, "failed": failed}
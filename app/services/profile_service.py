@@ -1,16 +1,140 @@
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Tuple
 from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
-from sqlalchemy import desc, func
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import DateTime, Integer, and_, column, desc, func, literal, select, true, tuple_, union_all, values
 
 from app.models.account import InstagramAccount
 from app.models.profile import InstagramProfile
-from app.services.cache import clear_cache_pattern
+from app.models.profile_attributes import ProfileAttributes
+from app.services.cache import clear_cache_pattern, delete_cache
+from app.services.rollup_service import get_rollup_series, stitch_tiers
+from app.services.retention_service import raw_retention_cutoff, hourly_retention_cutoff
+from app.services.archive_service import archive_cutoff, archived_account_ids, read_archive, read_archive_at
+from app.services.hot_store import hot_series_store
+from app.services.account_index import account_index
 
-def get_latest_profiles(db: Session) -> List[dict]:
+TEXT_FIELDS = ("profile_pic_url", "full_name", "biography")
+PROFILE_FIELDS = ("username", "follower_count", "checked_at") + TEXT_FIELDS
+
+def parse_fields(value: Optional[str]) -> Optional[List[str]]:
+    """
+    Parse a comma-separated fields= selection, None meaning all fields.
+    
+    Raises:
+        ValueError: If a field is unknown
+    """
+    if not value:
+        return None
+    fields = [field.strip() for field in value.split(",") if field.strip()]
+    unknown = [field for field in fields if field not in PROFILE_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return fields
+
+def _text_fields(fields: Optional[List[str]]) -> List[str]:
+    return list(TEXT_FIELDS) if fields is None else [field for field in TEXT_FIELDS if field in fields]
+
+def _project(entry: Dict, fields: Optional[List[str]]) -> Dict:
+    return entry if fields is None else {key: value for key, value in entry.items() if key in fields}
+
+def _with_checked_at(fields: Optional[List[str]]) -> Optional[List[str]]:
+    return fields if fields is None or "checked_at" in fields else fields + ["checked_at"]
+
+def _attributes_dict(attributes, fields: Optional[List[str]] = None) -> Dict:
+    """
+    Text attributes of a snapshot, reconstructed from its attribute version
+    (or read from a row that selected them).
+    """
+    return {field: getattr(attributes, field) if attributes else None for field in _text_fields(fields)}
+
+def _rollup_point(point: Dict) -> Dict:
+    """
+    History entry for a rollup bucket; text attributes are not kept in rollups.
+    """
+    return {
+        "follower_count": point["follower_count"],
+        "checked_at": point["checked_at"],
+        **_attributes_dict(None)
+    }
+
+def _snapshot_query(db: Session, fields: Optional[List[str]], *columns):
+    """
+    Query of snapshot rows selecting only the requested text attributes; the
+    attributes table is not joined when none are requested.
+    """
+    text_fields = _text_fields(fields)
+    query = db.query(
+        *columns,
+        InstagramProfile.id,
+        InstagramProfile.account_id,
+        InstagramProfile.follower_count,
+        InstagramProfile.checked_at,
+        InstagramProfile.last_seen_at,
+        *[getattr(ProfileAttributes, field) for field in text_fields]
+    )
+    if text_fields:
+        query = query.outerjoin(ProfileAttributes, InstagramProfile.attributes_id == ProfileAttributes.id)
+    return query
+
+def _account_id(db: Session, username: str) -> Optional[int]:
+    return account_index.resolve(db, username)
+
+def _attribute_versions(db: Session, observations, fields: Optional[List[str]] = None) -> Dict:
+    """
+    Attribute versions of archived observations by id, looked up in one
+    query (if any text field is requested).
+    """
+    attribute_ids = {attributes_id for _, _, attributes_id in observations if attributes_id}
+    if not attribute_ids or not _text_fields(fields):
+        return {}
+    return {
+        version.id: version
+        for version in db.query(ProfileAttributes).filter(ProfileAttributes.id.in_(attribute_ids))
+    }
+
+def _archived_history(
+    db: Session,
+    account_id: int,
+    start_date: datetime,
+    end_date: datetime,
+    fields: Optional[List[str]] = None
+) -> List[Dict]:
+    """
+    History entries read back from the cold archive, with their attribute
+    versions looked up in one query (if any text field is requested).
+    """
+    observations = read_archive(account_id, start_date, end_date)
+    attributes = _attribute_versions(db, observations, fields)
+    
+    return [
+        _project({
+            "follower_count": follower_count,
+            "checked_at": checked_at,
+            **_attributes_dict(attributes.get(attributes_id), fields)
+        }, fields)
+        for checked_at, follower_count, attributes_id in observations
+    ]
+
+def _observed_at(profile: InstagramProfile, start_date: Optional[datetime] = None) -> List[datetime]:
+    """
+    Observation times represented by a snapshot row.
+    
+    A collapsed row (see PROFILE_STORAGE_MODE) stands for a run of identical
+    scrapes and is expanded into its first and last observation.
+    """
+    times = [profile.checked_at]
+    if profile.last_seen_at and profile.last_seen_at > profile.checked_at:
+        times.append(profile.last_seen_at)
+    if start_date:
+        times = [observed for observed in times if observed >= start_date]
+    return times
+
+def get_latest_profiles(db: Session, fields: Optional[List[str]] = None) -> List[dict]:
     """
     Retrieve latest profile data for all accounts.
     Uses a subquery to get the latest profile for each account.
+    
+    Only the requested fields (default: all) are selected and returned.
     """
     # Subquery to get the latest profile ID for each account
     latest_profiles = db.query(
@@ -18,111 +142,546 @@ def get_latest_profiles(db: Session) -> List[dict]:
         func.max(InstagramProfile.checked_at).label("latest_checked_at")
     ).group_by(InstagramProfile.account_id).subquery()
     
-    # Join with the profiles and accounts tables
-    result = db.query(
-        InstagramAccount.username,
-        InstagramProfile
-    ).join(
+    # Join with the profiles, attributes and accounts tables
+    result = _snapshot_query(db, fields, InstagramAccount.username).join(
         latest_profiles,
         InstagramProfile.account_id == latest_profiles.c.account_id
     ).filter(
         InstagramProfile.checked_at == latest_profiles.c.latest_checked_at
     ).join(
-        InstagramAccount
+        InstagramAccount, InstagramProfile.account_id == InstagramAccount.id
+    ).filter(
+        InstagramAccount.status != "deleted"
     ).all()
     
     return [
-        {
-            "username": username,
-            "follower_count": profile.follower_count,
-            "profile_pic_url": profile.profile_pic_url,
-            "full_name": profile.full_name,
-            "biography": profile.biography,
-            "checked_at": profile.checked_at
-        }
-        for username, profile in result
+        _project({
+            "username": row.username,
+            "follower_count": row.follower_count,
+            **_attributes_dict(row, fields),
+            "checked_at": row.last_seen_at or row.checked_at
+        }, fields)
+        for row in result
     ]
 
-def get_latest_profile(db: Session, username: str) -> Optional[Dict]:
+def get_latest_profile(db: Session, username: str, fields: Optional[List[str]] = None) -> Optional[Dict]:
     """
     Retrieve the most recent profile data for a specific account.
+    
+    Only the requested fields (default: all) are selected and returned.
     """
-    result = db.query(
-        InstagramProfile
-    ).join(
-        InstagramAccount
-    ).filter(
-        InstagramAccount.username == username
+    account_id = _account_id(db, username)
+    if not account_id:
+        return None
+    
+    row = _snapshot_query(db, fields).filter(
+        InstagramProfile.account_id == account_id
     ).order_by(
         desc(InstagramProfile.checked_at)
     ).first()
     
-    if not result:
+    if not row:
         return None
     
-    return {
+    return _project({
         "username": username,
-        "follower_count": result.follower_count,
-        "profile_pic_url": result.profile_pic_url,
-        "full_name": result.full_name,
-        "biography": result.biography,
-        "checked_at": result.checked_at
-    }
+        "follower_count": row.follower_count,
+        **_attributes_dict(row, fields),
+        "checked_at": row.last_seen_at or row.checked_at
+    }, fields)
+
+def _account_profiles(db: Session, account_id: int, fields: Optional[List[str]] = None):
+    return _snapshot_query(db, fields).filter(
+        InstagramProfile.account_id == account_id
+    )
 
-def get_profile_history(db: Session, username: str, days: int = 30) -> List[dict]:
+def _carried_in(account_profiles, start_date: datetime):
+    # A collapsed run that started before the window may still reach into it
+    return account_profiles.filter(
+        InstagramProfile.checked_at < start_date,
+        InstagramProfile.last_seen_at >= start_date
+    ).order_by(
+        desc(InstagramProfile.checked_at)
+    ).first()
+
+def carried_in_runs(query, start_date: datetime):
+    """
+    Filter a snapshot query over many accounts down to the collapsed runs
+    that started before start_date and still reach into it. Only an
+    account's latest row before start_date can do so, and it is found with
+    one seek on the (account_id, checked_at) index.
+    """
+    earlier = aliased(InstagramProfile)
+    latest_before = select(func.max(earlier.checked_at)).where(
+        earlier.account_id == InstagramProfile.account_id,
+        earlier.checked_at < start_date
+    ).scalar_subquery()
+    return query.filter(
+        InstagramProfile.checked_at == latest_before,
+        InstagramProfile.last_seen_at >= start_date
+    )
+
+def _history_entries(rows, start_date: datetime, fields: Optional[List[str]] = None) -> List[dict]:
+    return [
+        _project({
+            "follower_count": row.follower_count,
+            "checked_at": observed_at,
+            **_attributes_dict(row, fields)
+        }, fields)
+        for row in rows
+        for observed_at in _observed_at(row, start_date)
+    ]
+
+def get_profile_history(db: Session, username: str, days: int = 30, fields: Optional[List[str]] = None) -> List[dict]:
     """
     Retrieve historical profile data for a specific account over a period of days.
+    
+    When the window reaches past the archive threshold, archived snapshots
+    are read back from the cold archive. Otherwise, when retention is enabled
+    and the window reaches past the raw retention period, the older part is
+    filled from the hourly and then the daily rollup (one point per bucket,
+    without text attributes). Only the requested fields (default: all) are
+    selected and returned. Selections of follower_count and checked_at only
+    are served from the hot series store when the window is within its range.
     """
+    account_id = _account_id(db, username)
+    if not account_id:
+        return []
+    
+    if fields is not None and set(fields) <= {"follower_count", "checked_at"}:
+        series = hot_series_store.get_series(db, username, days)
+        if series is not None:
+            return [_project(point, fields) for point in series]
+    
     # Calculate the date range
     end_date = datetime.now()
     start_date = end_date - timedelta(days=days)
     
+    account_profiles = _account_profiles(db, account_id, fields)
+    
     # Query the database for the account's profiles within the date range
-    result = db.query(
-        InstagramProfile
-    ).join(
-        InstagramAccount
-    ).filter(
-        InstagramAccount.username == username,
+    result = account_profiles.filter(
         InstagramProfile.checked_at >= start_date
     ).order_by(
         InstagramProfile.checked_at
     ).all()
     
-    return [
-        {
-            "follower_count": profile.follower_count,
-            "checked_at": profile.checked_at,
-            "profile_pic_url": profile.profile_pic_url,
-            "full_name": profile.full_name,
-            "biography": profile.biography
-        }
-        for profile in result
-    ]
+    carried_in = _carried_in(account_profiles, start_date)
+    if carried_in:
+        result.insert(0, carried_in)
+    
+    # Older tiers are stitched in front of the first entry's checked_at
+    projection = _with_checked_at(fields)
+    history = _with_older_tiers(
+        db, account_id, start_date, end_date, _history_entries(result, start_date, projection), projection
+    )
+    return history if projection is fields else [_project(entry, fields) for entry in history]
+
+def _with_older_tiers(
+    db: Session,
+    account_id: int,
+    start_date: datetime,
+    end_date: datetime,
+    history: List[dict],
+    fields: Optional[List[str]] = None
+) -> List[dict]:
+    """
+    Prepend the part of the window that is no longer stored as raw snapshots,
+    from the cold archive or the rollups. Entries must include checked_at.
+    """
+    cold_cutoff = archive_cutoff(end_date)
+    if cold_cutoff and start_date < cold_cutoff:
+        boundary = history[0]["checked_at"] if history else end_date
+        history = _archived_history(db, account_id, start_date, boundary, fields) + history
+    
+    raw_cutoff = raw_retention_cutoff(end_date)
+    if raw_cutoff and start_date < raw_cutoff:
+        history = stitch_tiers(
+            db, account_id, start_date, history, ["hour", "day"],
+            point=lambda point: _project(_rollup_point(point), fields)
+        )
+    
+    return history
+
+def get_profiles_history(
+    db: Session,
+    usernames: List[str],
+    days: int = 30,
+    fields: Optional[List[str]] = None
+) -> Dict[str, List[dict]]:
+    """
+    Retrieve the history of many accounts over a period of days in one query.
+    
+    Snapshots are read ordered by (account_id, checked_at) and grouped per
+    account; older tiers are added as in get_profile_history.
+    
+    Returns:
+        Dict mapping each known username to its history (unknown usernames
+        are left out)
+    """
+    accounts = {}
+    for username in dict.fromkeys(usernames):
+        account_id = _account_id(db, username)
+        if account_id:
+            accounts[account_id] = username
+    if not accounts:
+        return {}
+    
+    end_date = datetime.now()
+    start_date = end_date - timedelta(days=days)
+    
+    # Rows in the window, filtered on checked_at alone so that the index (and
+    # partition pruning) applies; collapsed runs started before it come first
+    projection = _with_checked_at(fields)
+    snapshots = _snapshot_query(db, projection).filter(
+        InstagramProfile.account_id.in_(list(accounts))
+    )
+    result = snapshots.filter(
+        InstagramProfile.checked_at >= start_date
+    ).order_by(
+        InstagramProfile.account_id,
+        InstagramProfile.checked_at
+    ).all()
+    
+    rows_by_account = {account_id: [] for account_id in accounts}
+    for row in carried_in_runs(snapshots, start_date):
+        rows_by_account[row.account_id].append(row)
+    for row in result:
+        rows_by_account[row.account_id].append(row)
+    
+    histories = {}
+    for account_id, rows in rows_by_account.items():
+        history = _with_older_tiers(
+            db, account_id, start_date, end_date, _history_entries(rows, start_date, projection), projection
+        )
+        histories[accounts[account_id]] = history if projection is fields else [_project(entry, fields) for entry in history]
+    return histories
+
+def get_profile_history_page(
+    db: Session,
+    username: str,
+    days: int = 30,
+    limit: int = 1000,
+    after: Optional[Tuple[datetime, int]] = None,
+    fields: Optional[List[str]] = None
+) -> Tuple[List[dict], Optional[Tuple[datetime, int]]]:
+    """
+    One page of an account's snapshot history, keyset-paginated on
+    (checked_at, id) so that every page costs the same however deep it is.
+    
+    Pages cover the snapshots stored in the database; archived snapshots and
+    rollups of compacted periods are only part of get_profile_history.
+    
+    Args:
+        db: Database session
+        username: Account username
+        days: Number of days of history
+        limit: Maximum snapshot rows per page
+        after: (checked_at, id) of the last row of the previous page
+        fields: Fields to select and return (default: all)
+        
+    Returns:
+        Tuple of the page's history entries and the key to pass as after for
+        the next page (None on the last page)
+    """
+    account_id = _account_id(db, username)
+    if not account_id:
+        return [], None
+    
+    start_date = datetime.now() - timedelta(days=days)
+    account_profiles = _account_profiles(db, account_id, fields)
+    
+    query = account_profiles.filter(InstagramProfile.checked_at >= start_date)
+    if after:
+        query = query.filter(tuple_(InstagramProfile.checked_at, InstagramProfile.id) > tuple_(*after))
+    result = query.order_by(
+        InstagramProfile.checked_at,
+        InstagramProfile.id
+    ).limit(limit + 1).all()
+    
+    next_key = None
+    if len(result) > limit:
+        result = result[:limit]
+        last = result[-1]
+        next_key = (last.checked_at, last.id)
+    
+    if not after:
+        carried_in = _carried_in(account_profiles, start_date)
+        if carried_in:
+            result.insert(0, carried_in)
+    
+    return _history_entries(result, start_date, fields), next_key
+
+def get_follower_series(db: Session, username: str, days: int = 30, resolution: str = "raw") -> List[dict]:
+    """
+    Follower counts for an account over a period of days at a given resolution.
+    
+    "raw" returns every observation, from the hot series store when the window
+    is within its range and otherwise from get_profile_history. "hour" and
+    "day" return one point per bucket from the rollup tables, at the bucket's
+    last observation. Falls back to raw snapshots if the account has no
+    rollups, and hourly series are extended with daily points past hourly
+    retention.
+    """
+    account_id = _account_id(db, username)
+    if not account_id:
+        return []
+    
+    if resolution == "raw":
+        series = hot_series_store.get_series(db, username, days)
+        if series is not None:
+            return series
+        return get_profile_history(db, username=username, days=days)
+    
+    end_date = datetime.now()
+    start_date = end_date - timedelta(days=days)
+    series = get_rollup_series(db, account_id, resolution, start_date)
+    if not series:
+        return get_profile_history(db, username=username, days=days)
+    
+    hourly_cutoff = hourly_retention_cutoff(end_date)
+    if resolution == "hour" and hourly_cutoff and start_date < hourly_cutoff:
+        series = stitch_tiers(db, account_id, start_date, series, ["day"])
+    return series
 
 def get_followers_at_time(db: Session, username: str, target_time: datetime) -> Optional[Dict]:
     """
     Get the follower count at or before a specific time.
-    Finds the closest data point before the target time.
+    Finds the closest data point before the target time, reading through to
+    the cold archive before the archive threshold.
     """
+    account_id = _account_id(db, username)
+    if not account_id:
+        return None
+    
     # Find the closest profile before the target time
-    profile = db.query(InstagramProfile).join(
-        InstagramAccount
-    ).filter(
-        InstagramAccount.username == username,
+    profile = db.query(InstagramProfile).filter(
+        InstagramProfile.account_id == account_id,
         InstagramProfile.checked_at <= target_time
     ).order_by(
         desc(InstagramProfile.checked_at)
     ).first()
     
-    if not profile:
-        return None
+    point = None
+    if profile:
+        # Latest observation of a collapsed run that is not after the target time
+        observed = [observed_at for observed_at in _observed_at(profile) if observed_at <= target_time]
+        point = {
+            "follower_count": profile.follower_count,
+            "checked_at": observed[-1]
+        }
+    
+    # Before the archive threshold the closest observation may only be archived
+    cold_cutoff = archive_cutoff()
+    if cold_cutoff and target_time < cold_cutoff:
+        archived = read_archive_at(account_id, target_time)
+        if archived and (point is None or archived[0] > point["checked_at"]):
+            point = {"follower_count": archived[1], "checked_at": archived[0]}
+    
+    return point
+
+def get_profiles_at_times(
+    db: Session,
+    target_times: List[datetime],
+    fields: Optional[List[str]] = None
+) -> Dict[datetime, List[dict]]:
+    """
+    Retrieve every account's latest snapshot at or before each target time
+    in one query.
+    
+    The target times are cross joined with the accounts as a derived table
+    and each pair's latest checked_at is looked up on the (account_id,
+    checked_at) index; a collapsed run reports its latest observation that
+    is not after the target time. Target times before the archive threshold
+    read through to the cold archive.
+    
+    Returns:
+        Dict mapping each target time to its profiles (accounts without a
+        snapshot by then are left out)
+    """
+    target_times = list(dict.fromkeys(target_times))
+    if not target_times:
+        return {}
+    
+    targets = union_all(*[
+        select(literal(target_time, DateTime).label("target_time")) for target_time in target_times
+    ]).subquery()
     
+    # Latest checked_at of each account at or before each target time: one
+    # index seek per (time, account) pair, like a lateral join
+    latest_checked_at = select(
+        func.max(InstagramProfile.checked_at)
+    ).where(
+        InstagramProfile.account_id == InstagramAccount.id,
+        InstagramProfile.checked_at <= targets.c.target_time
+    ).correlate(InstagramAccount, targets).scalar_subquery()
+    latest_profiles = select(
+        targets.c.target_time,
+        InstagramAccount.id.label("account_id"),
+        InstagramAccount.username,
+        latest_checked_at.label("latest_checked_at")
+    ).select_from(InstagramAccount).join(
+        targets, true()
+    ).where(
+        InstagramAccount.status != "deleted"
+    ).subquery()
+    
+    result = _snapshot_query(db, fields, latest_profiles.c.target_time, latest_profiles.c.username).join(
+        latest_profiles,
+        InstagramProfile.account_id == latest_profiles.c.account_id
+    ).filter(
+        InstagramProfile.checked_at == latest_profiles.c.latest_checked_at
+    ).order_by(
+        latest_profiles.c.target_time,
+        latest_profiles.c.username
+    ).all()
+    
+    latest = {target_time: {} for target_time in target_times}
+    for row in result:
+        observed = [observed_at for observed_at in _observed_at(row) if observed_at <= row.target_time]
+        latest[row.target_time][row.username] = {
+            "username": row.username,
+            "follower_count": row.follower_count,
+            **_attributes_dict(row, fields),
+            "checked_at": observed[-1]
+        }
+    
+    cold_cutoff = archive_cutoff()
+    archived_times = [target_time for target_time in target_times if cold_cutoff and target_time < cold_cutoff]
+    if archived_times:
+        _with_archived_profiles(db, latest, archived_times, fields)
+    
+    return {
+        target_time: [_project(entry, fields) for entry in entries.values()]
+        for target_time, entries in latest.items()
+    }
+
+def _with_archived_profiles(
+    db: Session,
+    latest: Dict[datetime, Dict[str, dict]],
+    target_times: List[datetime],
+    fields: Optional[List[str]] = None
+) -> None:
+    """
+    Replace (or add) the entries of get_profiles_at_times whose latest
+    observation before a target time is only left in the cold archive.
+    """
+    account_ids = archived_account_ids()
+    if not account_ids:
+        return
+    
+    accounts = db.query(InstagramAccount.id, InstagramAccount.username).filter(
+        InstagramAccount.id.in_(account_ids),
+        InstagramAccount.status != "deleted"
+    ).all()
+    archived = {
+        (target_time, username): observation
+        for target_time in target_times
+        for account_id, username in accounts
+        for observation in [read_archive_at(account_id, target_time)]
+        if observation
+    }
+    attributes = _attribute_versions(db, archived.values(), fields)
+    
+    for (target_time, username), (checked_at, follower_count, attributes_id) in archived.items():
+        entry = latest[target_time].get(username)
+        if entry is None or checked_at > entry["checked_at"]:
+            latest[target_time][username] = {
+                "username": username,
+                "follower_count": follower_count,
+                **_attributes_dict(attributes.get(attributes_id), fields),
+                "checked_at": checked_at
+            }
+    
+    # Keep each target time's profiles ordered by username
+    for target_time in target_times:
+        latest[target_time] = dict(sorted(latest[target_time].items()))
+
+def get_observations_before(db: Session, targets: Dict[int, List[datetime]]) -> Dict[int, List[Dict]]:
+    """
+    Each account's latest observation at or before each of its own target
+    times, falling back to its earliest observation when it has none that
+    early (as analytics_service.calculate_period_change does), in one query.
+    
+    The (account_id, target_time) pairs are passed as a VALUES CTE and
+    each pair's checked_at is looked up on the (account_id, checked_at)
+    index, like get_profiles_at_times.
+    
+    Args:
+        db: Database session
+        targets: Account ids mapped to their target times
+        
+    Returns:
+        Account ids mapped to one dict (follower_count, checked_at) per
+        target time, in the order given; accounts without snapshots are left out
+    """
+    pairs = [(account_id, target_time) for account_id, times in targets.items() for target_time in times]
+    if not pairs:
+        return {}
+    
+    requested = values(
+        column("account_id", Integer), column("target_time", DateTime), name="targets"
+    ).data(pairs).cte("targets")
+    at_or_before = select(func.max(InstagramProfile.checked_at)).where(
+        InstagramProfile.account_id == requested.c.account_id,
+        InstagramProfile.checked_at <= requested.c.target_time
+    ).correlate(requested).scalar_subquery()
+    earliest = select(func.min(InstagramProfile.checked_at)).where(
+        InstagramProfile.account_id == requested.c.account_id
+    ).correlate(requested).scalar_subquery()
+    anchors = select(
+        requested.c.account_id,
+        requested.c.target_time,
+        func.coalesce(at_or_before, earliest).label("anchor_checked_at")
+    ).subquery()
+    
+    rows = db.query(
+        anchors.c.target_time,
+        InstagramProfile.account_id,
+        InstagramProfile.follower_count,
+        InstagramProfile.checked_at,
+        InstagramProfile.last_seen_at
+    ).join(
+        anchors,
+        and_(
+            InstagramProfile.account_id == anchors.c.account_id,
+            InstagramProfile.checked_at == anchors.c.anchor_checked_at
+        )
+    ).all()
+    
+    found = {}
+    for row in rows:
+        observed = _observed_at(row)
+        # A collapsed run reports its latest observation not after the target
+        # time; the earliest row its first observation
+        before = [observed_at for observed_at in observed if observed_at <= row.target_time]
+        found[(row.account_id, row.target_time)] = {
+            "follower_count": row.follower_count,
+            "checked_at": before[-1] if before else observed[0]
+        }
     return {
-        "follower_count": profile.follower_count,
-        "checked_at": profile.checked_at
+        account_id: [found[(account_id, target_time)] for target_time in times]
+        for account_id, times in targets.items()
+        if all((account_id, target_time) in found for target_time in times)
     }
 
+def get_profiles_at_time(db: Session, target_time: datetime, fields: Optional[List[str]] = None) -> List[dict]:
+    """
+    Retrieve every account's latest snapshot at or before a specific time.
+    
+    Only the requested fields (default: all) are selected and returned.
+    """
+    return get_profiles_at_times(db, [target_time], fields)[target_time]
+
+# Cache key of the fleet-wide dashboard summary (see analytics_service.get_fleet_summary)
+SUMMARY_CACHE_KEY = "analytics_summary"
+
+def refresh_summary_cache() -> None:
+    """
+    Clear the cached dashboard summary after new data or account changes.
+    """
+    delete_cache(SUMMARY_CACHE_KEY)
+
 def refresh_analytics_cache(username: str) -> None:
     """
     Clear analytics cache for a specific username when new data is available.
@@ -131,4 +690,4 @@ def refresh_analytics_cache(username: str) -> None:
     # Clear all analytics cache patterns for this username
     clear_cache_pattern(f"growth_metrics:{username}:*")
     clear_cache_pattern(f"follower_changes:{username}:*")
-    clear_cache_pattern(f"rolling_average:{username}:*")
\ No newline at end of file
+    delete_cache(f"rolling_average:{username}")
\ No newline at end of file
@@ -0,0 +1,152 @@
+from typing import Dict, List, Optional
+from datetime import datetime, timedelta
+import logging
+import uuid
+
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.core.utils.db_chunks import delete_in_chunks
+from app.models.account import InstagramAccount
+from app.models.profile import InstagramProfile
+from app.models.profile_attributes import ProfileAttributes
+from app.models.rollup import FollowerRollupHourly, FollowerRollupDaily
+from app.services.archive_service import delete_archive
+from app.services.cache import get_cache, set_cache
+
+logger = logging.getLogger(__name__)
+
+# Purge jobs started by this process. Job state is also mirrored to the cache
+# so that any worker can answer status requests.
+_jobs: Dict[str, Dict] = {}
+
+JOB_CACHE_SECONDS = 86400
+
+def _evict_finished_jobs(now: Optional[datetime] = None) -> None:
+    # Finished jobs are kept as long as their cache entries
+    horizon = (now or datetime.now()) - timedelta(seconds=JOB_CACHE_SECONDS)
+    for job_id in [
+        job_id for job_id, job in _jobs.items()
+        if job["finished_at"] and datetime.fromisoformat(job["finished_at"]) < horizon
+    ]:
+        del _jobs[job_id]
+
+def _save_job(job: Dict) -> None:
+    _jobs[job["job_id"]] = job
+    set_cache(f"purge_job:{job['job_id']}", job, expire_seconds=JOB_CACHE_SECONDS)
+
+def create_purge_job(accounts: List[Dict]) -> Dict:
+    """
+    Register a purge job for accounts that were already marked as deleted.
+    
+    Args:
+        accounts: Account dicts (with "id" and "username") to purge
+        
+    Returns:
+        The job status dict
+    """
+    _evict_finished_jobs()
+    job = {
+        "job_id": uuid.uuid4().hex,
+        "status": "pending",
+        "usernames": [account["username"] for account in accounts],
+        "account_ids": [account["id"] for account in accounts],
+        "profiles_deleted": 0,
+        "accounts_deleted": 0,
+        "created_at": datetime.now().isoformat(),
+        "finished_at": None,
+        "error": None
+    }
+    _save_job(job)
+    return job
+
+def get_purge_job(job_id: str) -> Optional[Dict]:
+    """
+    Get the status of a purge job.
+    """
+    return _jobs.get(job_id) or get_cache(f"purge_job:{job_id}")
+
+def run_purge_job(job_id: str, session_factory: sessionmaker) -> None:
+    """
+    Delete the profile history and account rows of a purge job.
+    
+    Profiles (with their attribute versions and follower rollups) are
+    removed in chunks of PURGE_CHUNK_SIZE rows, each in its own short
+    transaction, so large histories never block the database or load into
+    memory. The account's cold archive files are removed with it. Intended
+    to run as a background task.
+    """
+    job = _jobs[job_id]
+    job["status"] = "running"
+    _save_job(job)
+    
+    db: Session = session_factory()
+    try:
+        def record_progress(deleted: int) -> None:
+            job["profiles_deleted"] += deleted
+            _save_job(job)
+        
+        for account_id in job["account_ids"]:
+            delete_in_chunks(
+                db,
+                InstagramProfile,
+                InstagramProfile.account_id == account_id,
+                chunk_size=settings.PURGE_CHUNK_SIZE,
+                on_chunk=record_progress
+            )
+            delete_in_chunks(
+                db,
+                ProfileAttributes,
+                ProfileAttributes.account_id == account_id,
+                chunk_size=settings.PURGE_CHUNK_SIZE
+            )
+            for rollup in (FollowerRollupHourly, FollowerRollupDaily):
+                delete_in_chunks(
+                    db,
+                    rollup,
+                    rollup.account_id == account_id,
+                    chunk_size=settings.PURGE_CHUNK_SIZE
+                )
+            job["accounts_deleted"] += db.query(InstagramAccount).filter(
+                InstagramAccount.id == account_id,
+                InstagramAccount.status == "deleted"
+            ).delete(synchronize_session=False)
+            db.commit()
+            delete_archive(account_id)
+        
+        job["status"] = "completed"
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Purge job {job_id} failed: {e}")
+        job["status"] = "failed"
+        job["error"] = str(e)
+    finally:
+        db.close()
+        job["finished_at"] = datetime.now().isoformat()
+        _save_job(job)
+
+def resume_pending_purges(session_factory: sessionmaker) -> Optional[Dict]:
+    """
+    Purge the accounts still marked as deleted, whose purge job did not
+    finish before the process stopped. Intended to run once at startup.
+    
+    Returns:
+        The job status dict, or None if no account was waiting
+    """
+    db: Session = session_factory()
+    try:
+        accounts = [
+            {"id": account_id, "username": username}
+            for account_id, username in db.query(InstagramAccount.id, InstagramAccount.username).filter(
+                InstagramAccount.status == "deleted"
+            )
+        ]
+    finally:
+        db.close()
+    if not accounts:
+        return None
+    
+    logger.info(f"Resuming the purge of {len(accounts)} deleted accounts")
+    job = create_purge_job(accounts)
+    run_purge_job(job["job_id"], session_factory)
+    return job
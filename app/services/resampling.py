@@ -0,0 +1,130 @@
+from typing import Dict, List, Optional
+from datetime import datetime, timedelta
+import re
+
+# Resampling onto a time grid needs the optional "numpy" package
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# step: last observation inside each grid interval, none if it had no scrape
+# locf: last observation at or before each grid point, carried across gaps
+# linear: interpolated between the observations around each grid point
+METHODS = ("step", "locf", "linear")
+
+GRID_UNITS = {"m": timedelta(minutes=1), "h": timedelta(hours=1), "d": timedelta(days=1)}
+
+EPOCH = datetime(1970, 1, 1)
+
+# Largest grid a request may ask for (e.g. 1m spacing over about a week)
+MAX_GRID_POINTS = 10000
+
+def parse_grid(value: str) -> timedelta:
+    """
+    Parse a grid spacing such as "15m", "1h" or "1d".
+
+    Raises:
+        ValueError: If the spacing is malformed or numpy is not installed
+    """
+    if not NUMPY_AVAILABLE:
+        raise ValueError("grid requires the numpy package")
+    match = re.fullmatch(r"(\d+)([mhd])", value.strip())
+    if not match or int(match.group(1)) == 0:
+        raise ValueError(f"Invalid grid: {value} (expected e.g. 15m, 1h or 1d)")
+    return int(match.group(1)) * GRID_UNITS[match.group(2)]
+
+def check_method(method: str) -> None:
+    if method not in METHODS:
+        raise ValueError(f"Unsupported fill: {method} (expected one of {', '.join(METHODS)})")
+
+def build_grid(start_date: datetime, end_date: datetime, step: timedelta) -> List[datetime]:
+    """
+    Grid points every step between start_date and end_date, aligned to
+    multiples of step (so daily points fall on midnight).
+
+    Raises:
+        ValueError: If the grid would have more than MAX_GRID_POINTS points
+    """
+    step_micros = step // timedelta(microseconds=1)
+    first = -((EPOCH - start_date) // step) * step_micros
+    last = ((end_date - EPOCH) // step) * step_micros
+    if last < first:
+        return []
+    count = (last - first) // step_micros + 1
+    if count > MAX_GRID_POINTS:
+        raise ValueError(
+            f"Grid of {count} points exceeds the limit of {MAX_GRID_POINTS}; use a coarser grid or fewer days"
+        )
+    return np.arange(first, last + 1, step_micros, dtype=np.int64).astype("datetime64[us]").tolist()
+
+def _micros(times) -> "np.ndarray":
+    return np.array(list(times), dtype="datetime64[us]").astype(np.int64)
+
+def _resample_values(
+    times: "np.ndarray",
+    counts: "np.ndarray",
+    grid: "np.ndarray",
+    step: int,
+    method: str
+) -> "np.ndarray":
+    if not len(times):
+        return np.full(len(grid), np.nan)
+    if method == "linear":
+        return np.interp(grid, times, counts, left=np.nan, right=np.nan)
+
+    # Index of the last observation at or before each grid point
+    previous = np.searchsorted(times, grid, side="right") - 1
+    values = np.where(previous >= 0, counts[np.maximum(previous, 0)], np.nan)
+    if method == "step":
+        values[times[np.maximum(previous, 0)] <= grid - step] = np.nan
+    return values
+
+def resample(
+    series: Dict[str, List[Dict]],
+    grid: List[datetime],
+    step: timedelta,
+    method: str = "locf"
+) -> Dict[str, List[Optional[float]]]:
+    """
+    Align the follower series of one or many accounts onto a shared grid.
+
+    Args:
+        series: Series (checked_at and follower_count entries, oldest first)
+            keyed by username
+        grid: Grid points from build_grid
+        step: Grid spacing
+        method: step, locf or linear (see METHODS)
+
+    Returns:
+        Follower counts at each grid point keyed by username; None where the
+        method gives no value. Linear values are rounded to 2 decimals.
+    """
+    check_method(method)
+    grid_micros = _micros(grid)
+    step_micros = step // timedelta(microseconds=1)
+
+    aligned = {}
+    for username, points in series.items():
+        values = _resample_values(
+            _micros(point["checked_at"] for point in points),
+            np.array([point["follower_count"] for point in points], dtype=np.float64),
+            grid_micros,
+            step_micros,
+            method
+        )
+        if method == "linear":
+            values = np.round(values, 2)
+        aligned[username] = [
+            None if np.isnan(value) else (float(value) if method == "linear" else int(value))
+            for value in values
+        ]
+    return aligned
+
+def resample_history(history: List[Dict], grid: List[datetime], step: timedelta, method: str = "locf") -> List[Dict]:
+    """
+    History entries (checked_at and follower_count) at each grid point.
+    """
+    values = resample({"": history}, grid, step, method)[""]
+    return [{"checked_at": moment, "follower_count": value} for moment, value in zip(grid, values)]
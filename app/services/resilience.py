@@ -0,0 +1,158 @@
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Status codes that indicate the remote service is struggling rather than
+# rejecting the request itself
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+class CircuitOpenError(Exception):
+    """
+    Raised when a call is rejected because the circuit breaker is open.
+    """
+    pass
+
+def is_transient_error(exc: Exception) -> bool:
+    """
+    Return True for errors worth retrying: transport failures (connect errors,
+    timeouts) and 5xx/429 responses. Other 4xx responses are not retried.
+    """
+    if isinstance(exc, httpx.TransportError):
+        return True
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code in RETRYABLE_STATUS_CODES
+    return False
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    - closed: calls pass through; failures are counted
+    - open: calls are rejected immediately until reset_timeout has elapsed
+    - half_open: a single trial call is let through; success closes the
+      circuit, failure opens it again
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.reset()
+
+    def reset(self) -> None:
+        self._state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self._state == "open" and time.monotonic() - self._opened_at >= self.reset_timeout:
+            return "half_open"
+        return self._state
+
+    def allow_request(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def release_trial(self) -> None:
+        """
+        Free the half-open trial slot without recording an outcome, e.g. when
+        the trial call was cancelled or timed out from outside.
+        """
+        self._trial_in_flight = False
+
+    def record_success(self) -> None:
+        if self._state != "closed":
+            logger.info(f"Circuit '{self.name}' closed")
+        self.reset()
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        self._trial_in_flight = False
+        if self._state == "open" or self._failures >= self.failure_threshold:
+            if self._state != "open":
+                logger.warning(f"Circuit '{self.name}' opened after {self._failures} consecutive failures")
+            self._state = "open"
+            self._opened_at = time.monotonic()
+
+    def status(self) -> Dict:
+        return {
+            "name": self.name,
+            "state": self.state,
+            "consecutive_failures": self._failures
+        }
+
+async def retry_async(
+    func: Callable[[], Awaitable[Any]],
+    attempts: int = 3,
+    base_delay: float = 0.2,
+    max_delay: float = 2.0,
+    budget: Optional[float] = None,
+    should_retry: Callable[[Exception], bool] = is_transient_error
+) -> Any:
+    """
+    Call an async function, retrying transient failures with exponential
+    backoff and full jitter.
+
+    Args:
+        func: Zero-argument coroutine function to call
+        attempts: Maximum number of attempts (including the first one)
+        base_delay: Backoff base in seconds
+        max_delay: Upper bound for a single backoff sleep
+        budget: Optional total time budget in seconds; no retry is started
+            if its backoff would exceed the remaining budget
+        should_retry: Predicate deciding whether an exception is retryable
+
+    Returns:
+        The result of the first successful call
+    """
+    started = time.monotonic()
+    for attempt in range(1, attempts + 1):
+        try:
+            return await func()
+        except Exception as e:
+            if attempt >= attempts or not should_retry(e):
+                raise
+            delay = random.uniform(0, min(max_delay, base_delay * (2 ** (attempt - 1))))
+            if budget is not None and time.monotonic() - started + delay >= budget:
+                raise
+            logger.warning(f"Transient error on attempt {attempt}/{attempts}: {e}. Retrying in {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+class LastGoodCache:
+    """
+    In-process store of the last successful response per key, served for a
+    short time when the upstream service is unavailable.
+    """
+
+    def __init__(self, ttl_seconds: float = 300.0):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[str, Tuple[float, Any]] = {}
+
+    def set(self, key: str, value: Any) -> None:
+        self._entries[key] = (time.monotonic(), value)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        stored_at, value = entry
+        if time.monotonic() - stored_at > self.ttl_seconds:
+            del self._entries[key]
+            return default
+        return value
+
+    def clear(self) -> None:
+        self._entries.clear()
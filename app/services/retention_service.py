@@ -0,0 +1,137 @@
+from typing import Dict, Optional
+from datetime import datetime, timedelta
+import asyncio
+import logging
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.core.utils.db_chunks import delete_in_chunks
+from app.core.utils.partitions import partitioning_enabled, drop_partitions_before
+from app.models.profile import InstagramProfile
+from app.models.rollup import FollowerRollupHourly, FollowerRollupDaily
+from app.services.rollup_service import downsample_before
+from app.services.archive_service import archive_cutoff, archive_before
+
+logger = logging.getLogger(__name__)
+
+def _cutoff(days: int, now: datetime) -> Optional[datetime]:
+    return now - timedelta(days=days) if days > 0 else None
+
+def raw_retention_cutoff(now: Optional[datetime] = None) -> Optional[datetime]:
+    """
+    Time before which raw snapshots may have been compacted into rollups, or
+    None if retention is disabled or old snapshots are archived instead.
+    """
+    if not settings.RETENTION_ENABLED or settings.ARCHIVE_ENABLED:
+        return None
+    return _cutoff(settings.RETENTION_RAW_DAYS, now or datetime.now())
+
+def hourly_retention_cutoff(now: Optional[datetime] = None) -> Optional[datetime]:
+    """
+    Time before which hourly rollups may have been removed, or None.
+    """
+    if not settings.RETENTION_ENABLED:
+        return None
+    return _cutoff(settings.RETENTION_HOURLY_DAYS, now or datetime.now())
+
+def compact_raw_snapshots(db: Session, cutoff: datetime, chunk_size: int = 1000) -> Dict:
+    """
+    Downsample raw snapshots older than cutoff into the rollups and delete them.
+
+    Each account's latest snapshot is always kept so that current follower
+    counts stay available, and a collapsed run that reaches past the cutoff
+    is kept whole. On a partitioned table, monthly partitions that are
+    entirely expired are dropped instead of deleted row by row.
+
+    Returns:
+        Dict with the number of accounts compacted, raw rows deleted and
+        partitions dropped
+    """
+    candidates = db.query(
+        InstagramProfile.account_id,
+        func.max(InstagramProfile.checked_at)
+    ).group_by(InstagramProfile.account_id).having(
+        func.min(InstagramProfile.checked_at) < cutoff
+    ).all()
+
+    result = {"accounts": 0, "raw_deleted": 0, "partitions_dropped": 0}
+    for account_id, _ in candidates:
+        downsample_before(db, account_id, cutoff, batch_size=chunk_size)
+
+    bind = db.get_bind()
+    if partitioning_enabled(bind):
+        result["partitions_dropped"] = len(drop_partitions_before(bind, cutoff))
+
+    for account_id, latest_checked_at in candidates:
+        deleted = delete_in_chunks(
+            db,
+            InstagramProfile,
+            InstagramProfile.account_id == account_id,
+            InstagramProfile.checked_at < min(cutoff, latest_checked_at),
+            func.coalesce(InstagramProfile.last_seen_at, InstagramProfile.checked_at) < cutoff,
+            chunk_size=chunk_size
+        )
+        if deleted:
+            result["accounts"] += 1
+            result["raw_deleted"] += deleted
+    return result
+
+def run_retention(session_factory: sessionmaker, now: Optional[datetime] = None) -> Dict:
+    """
+    Enforce the retention policy once.
+
+    Raw snapshots older than RETENTION_RAW_DAYS are downsampled and deleted
+    (or, with ARCHIVE_ENABLED, moved to the cold archive after
+    ARCHIVE_AFTER_DAYS instead), then hourly and daily rollups older than
+    RETENTION_HOURLY_DAYS and RETENTION_DAILY_DAYS are removed. Deletes run
+    in batches of RETENTION_CHUNK_SIZE rows, each in its own transaction.
+
+    Returns:
+        Dict with the number of rows removed per tier
+    """
+    now = now or datetime.now()
+    chunk_size = settings.RETENTION_CHUNK_SIZE
+    result = {"accounts": 0, "raw_deleted": 0, "partitions_dropped": 0, "hourly_deleted": 0, "daily_deleted": 0}
+
+    db: Session = session_factory()
+    try:
+        cold_cutoff = archive_cutoff(now)
+        raw_cutoff = raw_retention_cutoff(now)
+        if cold_cutoff:
+            result.update(archive_before(db, cold_cutoff, chunk_size=chunk_size))
+        elif raw_cutoff:
+            result.update(compact_raw_snapshots(db, raw_cutoff, chunk_size=chunk_size))
+
+        # Rollup tiers are only trimmed under a retention policy
+        if settings.RETENTION_ENABLED:
+            for key, model, days in (
+                ("hourly_deleted", FollowerRollupHourly, settings.RETENTION_HOURLY_DAYS),
+                ("daily_deleted", FollowerRollupDaily, settings.RETENTION_DAILY_DAYS),
+            ):
+                cutoff = _cutoff(days, now)
+                if cutoff:
+                    result[key] = delete_in_chunks(
+                        db, model, model.bucket_start < cutoff, chunk_size=chunk_size
+                    )
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    logger.info(f"Retention run finished: {result}")
+    return result
+
+async def retention_loop(session_factory: sessionmaker) -> None:
+    """
+    Run the retention and archive job every RETENTION_INTERVAL_SECONDS until
+    cancelled.
+    """
+    while True:
+        try:
+            await asyncio.to_thread(run_retention, session_factory)
+        except Exception as e:
+            logger.error(f"Retention run failed: {e}")
+        await asyncio.sleep(settings.RETENTION_INTERVAL_SECONDS)
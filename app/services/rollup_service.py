@@ -0,0 +1,249 @@
+from typing import List, Dict, Optional, Tuple
+from datetime import datetime
+import logging
+
+from sqlalchemy.orm import Session
+
+from app.models.profile import InstagramProfile
+from app.models.rollup import FollowerRollupHourly, FollowerRollupDaily
+
+logger = logging.getLogger(__name__)
+
+# Rollup table per resolution, finest first
+ROLLUP_MODELS = {
+    "hour": FollowerRollupHourly,
+    "day": FollowerRollupDaily,
+}
+
+RESOLUTIONS = ("raw", "hour", "day")
+
+def bucket_start(moment: datetime, resolution: str) -> datetime:
+    """
+    Start of the hour or day bucket containing moment.
+    """
+    if resolution == "hour":
+        return moment.replace(minute=0, second=0, microsecond=0)
+    if resolution == "day":
+        return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    raise ValueError(f"Unknown rollup resolution: {resolution}")
+
+def _apply_observation(bucket, follower_count: int, observed_at: datetime) -> None:
+    if bucket.sample_count:
+        if observed_at < bucket.first_at:
+            bucket.first_at, bucket.first_count = observed_at, follower_count
+        if observed_at >= bucket.last_at:
+            bucket.last_at, bucket.last_count = observed_at, follower_count
+        bucket.min_count = min(bucket.min_count, follower_count)
+        bucket.max_count = max(bucket.max_count, follower_count)
+    else:
+        bucket.first_at = bucket.last_at = observed_at
+        bucket.first_count = bucket.last_count = follower_count
+        bucket.min_count = bucket.max_count = follower_count
+    bucket.sample_count = (bucket.sample_count or 0) + 1
+
+def _fold_observation(
+    db: Session,
+    resolution: str,
+    account_id: int,
+    follower_count: int,
+    observed_at: datetime,
+    cache: Dict[Tuple, object]
+) -> bool:
+    model = ROLLUP_MODELS[resolution]
+    start = bucket_start(observed_at, resolution)
+    key = (resolution, account_id, start)
+
+    created = False
+    bucket = cache.get(key)
+    if bucket is None:
+        bucket = db.query(model).filter(
+            model.account_id == account_id,
+            model.bucket_start == start
+        ).first()
+    if bucket is None:
+        bucket = model(account_id=account_id, bucket_start=start, sample_count=0)
+        db.add(bucket)
+        created = True
+
+    _apply_observation(bucket, follower_count, observed_at)
+    cache[key] = bucket
+    return created
+
+def update_rollups(
+    db: Session,
+    account_id: int,
+    follower_count: int,
+    observed_at: datetime,
+    buckets: Optional[Dict[Tuple, object]] = None
+) -> None:
+    """
+    Fold one observation into the account's hourly and daily rollups (without
+    committing).
+
+    Args:
+        db: Database session
+        account_id: Account the observation belongs to
+        follower_count: Observed follower count
+        observed_at: Observation time
+        buckets: Optional per-batch cache of rollup rows, keyed by
+            (resolution, account_id, bucket_start)
+    """
+    cache = buckets if buckets is not None else {}
+
+    created = False
+    for resolution in ROLLUP_MODELS:
+        created |= _fold_observation(db, resolution, account_id, follower_count, observed_at, cache)
+
+    # New buckets must be visible to the next lookup in this session
+    if created:
+        db.flush()
+
+def _snapshot_observations(query):
+    """
+    Observation times of snapshot rows (follower_count, checked_at,
+    last_seen_at); a collapsed row contributes its first and last observation.
+    """
+    for follower_count, checked_at, last_seen_at in query:
+        yield follower_count, checked_at
+        if last_seen_at and last_seen_at > checked_at:
+            yield follower_count, last_seen_at
+
+def backfill_rollups(db: Session, account_id: int) -> int:
+    """
+    Rebuild an account's rollups from its raw snapshots and commit.
+
+    Used for data written before rollups existed. A collapsed snapshot row
+    contributes its first and last observation.
+
+    Returns:
+        Number of observations folded into the rollups
+    """
+    for model in ROLLUP_MODELS.values():
+        for bucket in db.query(model).filter(model.account_id == account_id):
+            db.delete(bucket)
+    db.flush()
+
+    snapshots = db.query(
+        InstagramProfile.follower_count,
+        InstagramProfile.checked_at,
+        InstagramProfile.last_seen_at
+    ).filter(
+        InstagramProfile.account_id == account_id
+    ).order_by(InstagramProfile.checked_at).all()
+
+    buckets: Dict[Tuple, object] = {}
+    observations = 0
+    for follower_count, observed_at in _snapshot_observations(snapshots):
+        update_rollups(db, account_id, follower_count, observed_at, buckets)
+        observations += 1
+
+    db.commit()
+    return observations
+
+def downsample_before(db: Session, account_id: int, cutoff: datetime, batch_size: int = 1000) -> int:
+    """
+    Make sure every raw observation of an account before cutoff is represented
+    in the rollups, so the raw rows can be deleted, and commit.
+
+    Rollups are normally maintained on ingest; only buckets that do not exist
+    yet (snapshots written by other tools, or before rollups existed) are
+    built from the raw rows. Existing buckets are left untouched.
+
+    Returns:
+        Number of observations folded into new buckets
+    """
+    existing = {
+        (resolution, start)
+        for resolution, model in ROLLUP_MODELS.items()
+        for (start,) in db.query(model.bucket_start).filter(
+            model.account_id == account_id,
+            model.bucket_start < cutoff
+        )
+    }
+
+    snapshots = db.query(
+        InstagramProfile.follower_count,
+        InstagramProfile.checked_at,
+        InstagramProfile.last_seen_at
+    ).filter(
+        InstagramProfile.account_id == account_id,
+        InstagramProfile.checked_at < cutoff
+    ).order_by(InstagramProfile.checked_at).yield_per(batch_size)
+
+    buckets: Dict[Tuple, object] = {}
+    observations = 0
+    for follower_count, observed_at in _snapshot_observations(snapshots):
+        if observed_at >= cutoff:
+            continue
+        for resolution in ROLLUP_MODELS:
+            if (resolution, bucket_start(observed_at, resolution)) in existing:
+                continue
+            _fold_observation(db, resolution, account_id, follower_count, observed_at, buckets)
+            observations += 1
+
+    db.commit()
+    return observations
+
+def get_rollup_series(
+    db: Session,
+    account_id: int,
+    resolution: str,
+    start: datetime,
+    end: Optional[datetime] = None
+) -> List[Dict]:
+    """
+    One point per bucket overlapping [start, end], at the bucket's last
+    observation.
+
+    Returns:
+        List of dicts with follower_count, checked_at, min_count, max_count
+        and sample_count, oldest first
+    """
+    model = ROLLUP_MODELS[resolution]
+    query = db.query(model).filter(
+        model.account_id == account_id,
+        model.last_at >= start
+    )
+    if end is not None:
+        query = query.filter(model.bucket_start <= end)
+
+    return [
+        {
+            "follower_count": bucket.last_count,
+            "checked_at": bucket.last_at,
+            "min_count": bucket.min_count,
+            "max_count": bucket.max_count,
+            "sample_count": bucket.sample_count
+        }
+        for bucket in query.order_by(model.bucket_start)
+    ]
+
+def stitch_tiers(
+    db: Session,
+    account_id: int,
+    start: datetime,
+    series: List[Dict],
+    resolutions: List[str],
+    point=None
+) -> List[Dict]:
+    """
+    Prepend coarser rollup points for the part of a window that a series no
+    longer covers (e.g. raw snapshots removed by retention).
+
+    Each resolution in turn fills the gap before the earliest point collected
+    so far, so resolutions should go from finest to coarsest.
+
+    Args:
+        series: Points with checked_at, oldest first
+        resolutions: Rollup resolutions to fill from
+        point: Optional function converting a rollup point to the series format
+    """
+    for resolution in resolutions:
+        boundary = series[0]["checked_at"] if series else None
+        older = get_rollup_series(db, account_id, resolution, start, end=boundary)
+        if boundary is not None:
+            older = [p for p in older if p["checked_at"] < boundary]
+        if point is not None:
+            older = [point(p) for p in older]
+        series = older + series
+    return series
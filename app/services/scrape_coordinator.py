@@ -0,0 +1,157 @@
+from typing import Dict, Optional, Tuple
+import asyncio
+import json
+import logging
+import time
+import uuid
+
+from app.core.config import settings
+from app.services import scraper_service
+from app.services.cache import redis_cache
+
+logger = logging.getLogger(__name__)
+
+GLOBAL_SCOPE = "global"
+
+# In-process state: the running scrape per scope and the last finished one
+_in_flight: Dict[str, Tuple[str, asyncio.Task]] = {}
+_last_runs: Dict[str, Dict] = {}
+
+def reset_scrape_state() -> None:
+    """
+    Forget in-process scrape state (used by tests).
+    """
+    _in_flight.clear()
+    _last_runs.clear()
+
+def _use_redis() -> bool:
+    return settings.SCRAPE_COORDINATION == "redis" and redis_cache.redis_client is not None
+
+def _recent_run(scope: str) -> Optional[Dict]:
+    """
+    Return the last successful run for a scope if it finished within the minimum interval.
+    """
+    if _use_redis():
+        try:
+            value = redis_cache.redis_client.get(f"scrape:last:{scope}")
+            return json.loads(value) if value else None
+        except Exception as e:
+            logger.warning(f"Scrape coordination read error: {e}")
+    
+    run = _last_runs.get(scope)
+    if run and time.time() - run["finished_at"] < settings.SCRAPE_MIN_INTERVAL_SECONDS:
+        return run
+    return None
+
+def _remember_run(scope: str, run: Dict) -> None:
+    _last_runs[scope] = run
+    if _use_redis() and settings.SCRAPE_MIN_INTERVAL_SECONDS > 0:
+        try:
+            redis_cache.redis_client.set(
+                f"scrape:last:{scope}", json.dumps(run), ex=settings.SCRAPE_MIN_INTERVAL_SECONDS
+            )
+        except Exception as e:
+            logger.warning(f"Scrape coordination write error: {e}")
+
+def _acquire_redis_lock(scope: str, job_id: str) -> Optional[str]:
+    """
+    Try to claim a scope across workers.
+    
+    Returns None when the lock was acquired, otherwise the job id of the
+    scrape already running in another worker.
+    """
+    key = f"scrape:lock:{scope}"
+    try:
+        if redis_cache.redis_client.set(key, job_id, nx=True, ex=settings.SCRAPE_LOCK_TTL):
+            return None
+        owner = redis_cache.redis_client.get(key)
+        return owner.decode() if isinstance(owner, bytes) else owner
+    except Exception as e:
+        logger.warning(f"Scrape coordination lock error: {e}. Continuing without lock")
+        return None
+
+def _release_redis_lock(scope: str, job_id: str) -> None:
+    key = f"scrape:lock:{scope}"
+    try:
+        owner = redis_cache.redis_client.get(key)
+        if owner is not None and (owner.decode() if isinstance(owner, bytes) else owner) == job_id:
+            redis_cache.redis_client.delete(key)
+    except Exception as e:
+        logger.warning(f"Scrape coordination unlock error: {e}")
+
+def _finish(scope: str, job_id: str, task: asyncio.Task) -> None:
+    """
+    Clean up after a scrape task, even if the caller that started it went away.
+    """
+    if _in_flight.get(scope, (None,))[0] == job_id:
+        del _in_flight[scope]
+    if _use_redis():
+        _release_redis_lock(scope, job_id)
+    
+    if task.cancelled() or task.exception() is not None:
+        return
+    result = task.result()
+    # Failed scrapes do not start the minimum interval so they can be retried
+    if result.get("status") != "error":
+        _remember_run(scope, {"job_id": job_id, "finished_at": time.time(), "result": result})
+
+async def _attach(job_id: str, task: asyncio.Task, scope: str) -> Dict:
+    # Shield so that a disconnecting caller does not cancel the shared scrape
+    result = await asyncio.shield(task)
+    return {**result, "job_id": job_id, "scope": scope, "coalesced": True}
+
+async def coordinate_scrape(username: Optional[str] = None) -> Dict:
+    """
+    Trigger a scrape, coalescing concurrent and repeated requests.
+    
+    - Only one scrape runs per scope (the whole fleet, or a single account).
+      Callers arriving while it runs are attached to it and get its job id;
+      a running fleet-wide scrape also covers per-account requests.
+    - A scope is not scraped again until SCRAPE_MIN_INTERVAL_SECONDS have
+      passed since its last successful scrape; callers in that window get
+      the previous result and job id.
+    
+    Args:
+        username: Account to scrape, or None for all accounts
+        
+    Returns:
+        Scraper result extended with "job_id", "scope" and "coalesced"
+    """
+    scope = username or GLOBAL_SCOPE
+    
+    for candidate in (scope, GLOBAL_SCOPE):
+        if candidate in _in_flight:
+            job_id, task = _in_flight[candidate]
+            logger.info(f"Attaching scrape request for {scope} to running job {job_id}")
+            return await _attach(job_id, task, candidate)
+    
+    recent = _recent_run(scope)
+    if recent:
+        retry_after = max(0, round(settings.SCRAPE_MIN_INTERVAL_SECONDS - (time.time() - recent["finished_at"])))
+        return {
+            **recent["result"],
+            "job_id": recent["job_id"],
+            "scope": scope,
+            "coalesced": True,
+            "retry_after_seconds": retry_after
+        }
+    
+    job_id = uuid.uuid4().hex
+    
+    if _use_redis():
+        owner = _acquire_redis_lock(scope, job_id)
+        if owner:
+            return {
+                "status": "in_progress",
+                "message": "A scrape for this scope is already running",
+                "job_id": owner,
+                "scope": scope,
+                "coalesced": True
+            }
+    
+    task = asyncio.ensure_future(scraper_service.trigger_scrape(username))
+    _in_flight[scope] = (job_id, task)
+    task.add_done_callback(lambda finished: _finish(scope, job_id, finished))
+    
+    result = await asyncio.shield(task)
+    return {**result, "job_id": job_id, "scope": scope, "coalesced": False}
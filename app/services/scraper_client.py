@@ -0,0 +1,81 @@
+from typing import Optional
+import logging
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# HTTP/2 support needs the optional "h2" package (installed via httpx[http2])
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Application-lifetime client shared by every Scraper Service call
+_client: Optional[httpx.AsyncClient] = None
+
+def build_scraper_client() -> httpx.AsyncClient:
+    """
+    Create a pooled HTTP client configured for the Scraper Service.
+
+    Connections are kept alive between calls so that each request reuses an
+    existing TCP/TLS connection instead of paying the handshake again.
+    """
+    use_http2 = settings.SCRAPER_HTTP2 and HTTP2_AVAILABLE
+    if settings.SCRAPER_HTTP2 and not HTTP2_AVAILABLE:
+        logger.warning("HTTP/2 requested but the 'h2' package is not installed. Using HTTP/1.1.")
+
+    limits = httpx.Limits(
+        max_connections=settings.SCRAPER_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.SCRAPER_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.SCRAPER_KEEPALIVE_EXPIRY,
+    )
+    timeout = httpx.Timeout(
+        settings.SCRAPER_READ_TIMEOUT,
+        connect=settings.SCRAPER_CONNECT_TIMEOUT,
+    )
+
+    return httpx.AsyncClient(
+        base_url=settings.SCRAPER_SERVICE_URL,
+        http2=use_http2,
+        limits=limits,
+        timeout=timeout,
+    )
+
+async def start_scraper_client() -> None:
+    """
+    Create the shared client. Called once on application startup.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = build_scraper_client()
+        logger.info(f"Scraper HTTP client started for {settings.SCRAPER_SERVICE_URL}")
+
+async def close_scraper_client() -> None:
+    """
+    Close the shared client and its pooled connections. Called on application shutdown.
+    """
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+        logger.info("Scraper HTTP client closed")
+
+def get_scraper_client() -> httpx.AsyncClient:
+    """
+    Return the shared client, creating it lazily if startup has not run
+    (e.g. when the service functions are used from scripts).
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = build_scraper_client()
+    return _client
+
+def operation_timeout(read_timeout: float) -> httpx.Timeout:
+    """
+    Build a per-operation timeout that keeps the shared connect timeout.
+    """
+    return httpx.Timeout(read_timeout, connect=settings.SCRAPER_CONNECT_TIMEOUT)
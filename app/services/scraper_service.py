@@ -1,89 +1,178 @@
-﻿import httpx
-from typing import List, Optional, Dict
+﻿import asyncio
+import httpx
+from typing import List, Optional, Dict, Iterator
 import logging
 from fastapi import HTTPException
 
 from app.core.config import settings
+from app.services.scraper_client import get_scraper_client, operation_timeout
+from app.services.resilience import (
+    CircuitBreaker, CircuitOpenError, LastGoodCache, is_transient_error, retry_async
+)
 
 logger = logging.getLogger(__name__)
 
+# Shared resilience state for all Scraper Service calls
+scraper_breaker = CircuitBreaker(
+    "scraper",
+    failure_threshold=settings.SCRAPER_BREAKER_FAILURE_THRESHOLD,
+    reset_timeout=settings.SCRAPER_BREAKER_RESET_SECONDS
+)
+last_good_responses = LastGoodCache(ttl_seconds=settings.SCRAPER_LAST_GOOD_TTL)
+
+async def _send(method: str, path: str, read_timeout: float, retry: bool = False, **kwargs) -> httpx.Response:
+    """
+    Send a request to the Scraper Service through the circuit breaker.
+    
+    Idempotent GETs pass retry=True to retry transient failures with jittered
+    backoff. Raises CircuitOpenError without touching the network while the
+    circuit is open.
+    """
+    trial = scraper_breaker.state == "half_open"
+    if not scraper_breaker.allow_request():
+        raise CircuitOpenError("Scraper service circuit is open")
+    
+    client = get_scraper_client()
+    send = getattr(client, method)
+    
+    async def attempt() -> httpx.Response:
+        response = await send(path, timeout=operation_timeout(read_timeout), **kwargs)
+        response.raise_for_status()
+        return response
+    
+    try:
+        if retry:
+            response = await retry_async(
+                attempt,
+                attempts=settings.SCRAPER_RETRY_ATTEMPTS,
+                base_delay=settings.SCRAPER_RETRY_BASE_DELAY,
+                max_delay=settings.SCRAPER_RETRY_MAX_DELAY,
+                budget=settings.SCRAPER_RETRY_BUDGET
+            )
+        else:
+            response = await attempt()
+    except Exception as e:
+        # Only outages count against the breaker; 4xx answers mean the scraper is up
+        if is_transient_error(e):
+            scraper_breaker.record_failure()
+        else:
+            scraper_breaker.record_success()
+        raise
+    finally:
+        # A cancelled trial records no outcome; without this the half-open
+        # slot would stay taken and the breaker would reject every call
+        if trial:
+            scraper_breaker.release_trial()
+    
+    scraper_breaker.record_success()
+    return response
+
+def chunk_usernames(usernames: List[str], size: int) -> Iterator[List[str]]:
+    """
+    Split usernames into batches of at most `size`, dropping duplicates
+    while keeping the original order.
+    """
+    unique = list(dict.fromkeys(usernames))
+    for i in range(0, len(unique), size):
+        yield unique[i:i + size]
+
 # Import mock implementation if configured
 if settings.USE_MOCK_SCRAPER:
     from app.services.mock_scraper_service import (
-        fetch_latest_profiles, fetch_accounts, trigger_scrape, add_account, delete_account
+        fetch_latest_profiles, fetch_accounts, trigger_scrape, add_account, delete_account,
+        add_accounts, delete_accounts
     )
 else:
     # Real implementation that calls the external service
     async def fetch_latest_profiles() -> List[Dict]:
         """
         Fetch the latest profile data from the Scraper Service.
+        
+        Falls back to the last good response (if still fresh) when the
+        scraper is failing or the circuit breaker is open.
         """
         try:
             logger.info(f"Fetching profiles from {settings.SCRAPER_SERVICE_URL}/profiles")
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.get(f"{settings.SCRAPER_SERVICE_URL}/profiles")
-                response.raise_for_status()
-                
-                # Get the JSON data
-                data = response.json()
-                logger.info(f"Received profiles response: {data}")
-                
-                # Handle different response formats
-                if isinstance(data, list):
-                    return data
-                elif isinstance(data, dict) and "profiles" in data:
-                    return data["profiles"]
-                else:
-                    logger.warning(f"Unexpected profiles data format: {type(data)}")
-                    return []
-                
+            response = await _send("get", "/profiles", settings.SCRAPER_READ_TIMEOUT, retry=True)
+            
+            # Get the JSON data
+            data = response.json()
+            logger.info(f"Received profiles response: {data}")
+            
+            # Handle different response formats
+            if isinstance(data, list):
+                profiles = data
+            elif isinstance(data, dict) and "profiles" in data:
+                profiles = data["profiles"]
+            else:
+                logger.warning(f"Unexpected profiles data format: {type(data)}")
+                return []
+            
+            last_good_responses.set("profiles", profiles)
+            return profiles
+            
+        except CircuitOpenError as e:
+            logger.warning(f"Skipping profiles fetch: {e}")
+            return last_good_responses.get("profiles", [])
         except httpx.HTTPError as e:
             logger.error(f"HTTP error while fetching profiles: {e}")
-            return []  # Return empty list instead of raising exception
+            return last_good_responses.get("profiles", [])
         except Exception as e:
             logger.error(f"Unexpected error while fetching profiles: {e}")
-            return []  # Return empty list instead of raising exception
+            return last_good_responses.get("profiles", [])
 
     async def fetch_accounts() -> List[Dict]:
         """
         Fetch the list of tracked accounts from the Scraper Service.
+        
+        Falls back to the last good response (if still fresh) when the
+        scraper is failing or the circuit breaker is open.
         """
         try:
             logger.info(f"Fetching accounts from {settings.SCRAPER_SERVICE_URL}/accounts")
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.get(f"{settings.SCRAPER_SERVICE_URL}/accounts")
-                response.raise_for_status()
-                
-                # Get the JSON data
-                data = response.json()
-                logger.info(f"Received accounts response: {data}")
-                
-                # Handle different response formats
-                if isinstance(data, list):
-                    return data
-                elif isinstance(data, dict) and "accounts" in data:
-                    return data["accounts"]
-                else:
-                    logger.warning(f"Unexpected accounts data format: {type(data)}")
-                    return []
-                
+            response = await _send("get", "/accounts", settings.SCRAPER_READ_TIMEOUT, retry=True)
+            
+            # Get the JSON data
+            data = response.json()
+            logger.info(f"Received accounts response: {data}")
+            
+            # Handle different response formats
+            if isinstance(data, list):
+                accounts = data
+            elif isinstance(data, dict) and "accounts" in data:
+                accounts = data["accounts"]
+            else:
+                logger.warning(f"Unexpected accounts data format: {type(data)}")
+                return []
+            
+            last_good_responses.set("accounts", accounts)
+            return accounts
+            
+        except CircuitOpenError as e:
+            logger.warning(f"Skipping accounts fetch: {e}")
+            return last_good_responses.get("accounts", [])
         except httpx.HTTPError as e:
             logger.error(f"HTTP error while fetching accounts: {e}")
-            return []  # Return empty list instead of raising exception
+            return last_good_responses.get("accounts", [])
         except Exception as e:
             logger.error(f"Unexpected error while fetching accounts: {e}")
-            return []  # Return empty list instead of raising exception
+            return last_good_responses.get("accounts", [])
 
-    async def trigger_scrape() -> Dict:
+    async def trigger_scrape(username: Optional[str] = None) -> Dict:
         """
         Trigger a manual scrape in the Scraper Service.
+        
+        Scrapes every tracked account, or only `username` when given
+        (sent as {"usernames": [username]}).
         """
         try:
             logger.info(f"Triggering scrape at {settings.SCRAPER_SERVICE_URL}/scrape-accounts")
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(f"{settings.SCRAPER_SERVICE_URL}/scrape-accounts")
-                response.raise_for_status()
-                return response.json()
+            kwargs = {"json": {"usernames": [username]}} if username else {}
+            response = await _send("post", "/scrape-accounts", settings.SCRAPER_TRIGGER_TIMEOUT, **kwargs)
+            return response.json()
+        except CircuitOpenError as e:
+            logger.warning(f"Skipping scrape trigger: {e}")
+            return {"status": "error", "message": str(e)}
         except httpx.HTTPError as e:
             logger.error(f"HTTP error while triggering scrape: {e}")
             return {"status": "error", "message": str(e)}
@@ -108,30 +197,33 @@ else:
             }
             headers = {"Content-Type": "application/json"}
             
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.post(
-                    f"{settings.SCRAPER_SERVICE_URL}/accounts",
-                    json=payload,
-                    headers=headers
-                )
-                response.raise_for_status()
-                result = response.json()
+            response = await _send(
+                "post",
+                "/accounts",
+                settings.SCRAPER_WRITE_TIMEOUT,
+                json=payload,
+                headers=headers
+            )
+            result = response.json()
+            
+            # Process response to return meaningful result
+            if username in result.get("added", []):
+                return {
+                    "status": "success", 
+                    "message": f"Successfully added account: {username}"
+                }
+            else:
+                # Find reason in skipped array if account wasn't added
+                reason = next((item["reason"] for item in result.get("skipped", [])
+                            if item["username"] == username), "Unknown reason")
+                return {
+                    "status": "error", 
+                    "message": f"Account not added: {reason}"
+                }
                 
-                # Process response to return meaningful result
-                if username in result.get("added", []):
-                    return {
-                        "status": "success", 
-                        "message": f"Successfully added account: {username}"
-                    }
-                else:
-                    # Find reason in skipped array if account wasn't added
-                    reason = next((item["reason"] for item in result.get("skipped", [])
-                                if item["username"] == username), "Unknown reason")
-                    return {
-                        "status": "error", 
-                        "message": f"Account not added: {reason}"
-                    }
-                    
+        except CircuitOpenError as e:
+            logger.warning(f"Skipping add account: {e}")
+            return {"status": "error", "message": str(e)}
         except httpx.HTTPError as e:
             logger.error(f"HTTP error while adding account: {e}")
             return {"status": "error", "message": str(e)}
@@ -145,15 +237,92 @@ else:
         """
         try:
             logger.info(f"Deleting account {username} at {settings.SCRAPER_SERVICE_URL}/accounts/{username}")
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.delete(
-                    f"{settings.SCRAPER_SERVICE_URL}/accounts/{username}"
-                )
-                response.raise_for_status()
-                return response.json()
+            response = await _send("delete", f"/accounts/{username}", settings.SCRAPER_WRITE_TIMEOUT)
+            return response.json()
+        except CircuitOpenError as e:
+            logger.warning(f"Skipping delete account: {e}")
+            return {"status": "error", "message": str(e)}
         except httpx.HTTPError as e:
             logger.error(f"HTTP error while deleting account: {e}")
             return {"status": "error", "message": str(e)}
         except Exception as e:
             logger.error(f"Unexpected error while deleting account: {e}")
-            return {"status": "error", "message": str(e)}
+            return {"status": "error", "message": str(e)}
+
+    async def add_accounts(usernames: List[str]) -> Dict:
+        """
+        Add many accounts to the Scraper Service.
+        
+        Usernames are sent in batches of SCRAPER_BATCH_SIZE using the scraper's
+        list payload, with at most SCRAPER_BATCH_CONCURRENCY batches in flight.
+        
+        Returns:
+            Dict with "added", "skipped" ({"username", "reason"}) and "failed"
+            ({"username", "reason"}) lists
+        """
+        semaphore = asyncio.Semaphore(settings.SCRAPER_BATCH_CONCURRENCY)
+        
+        async def add_batch(batch: List[str]) -> Dict:
+            payload = {"accounts": [{"username": username} for username in batch]}
+            async with semaphore:
+                try:
+                    logger.info(f"Adding {len(batch)} accounts at {settings.SCRAPER_SERVICE_URL}/accounts")
+                    response = await _send(
+                        "post",
+                        "/accounts",
+                        settings.SCRAPER_WRITE_TIMEOUT,
+                        json=payload,
+                        headers={"Content-Type": "application/json"}
+                    )
+                    result = response.json()
+                    return {
+                        "added": result.get("added", []),
+                        "skipped": result.get("skipped", []),
+                        "failed": []
+                    }
+                except Exception as e:
+                    logger.error(f"Error while adding account batch: {e}")
+                    return {
+                        "added": [],
+                        "skipped": [],
+                        "failed": [{"username": username, "reason": str(e)} for username in batch]
+                    }
+        
+        results = await asyncio.gather(*[
+            add_batch(batch) for batch in chunk_usernames(usernames, settings.SCRAPER_BATCH_SIZE)
+        ])
+        
+        return {
+            "added": [username for result in results for username in result["added"]],
+            "skipped": [item for result in results for item in result["skipped"]],
+            "failed": [item for result in results for item in result["failed"]]
+        }
+    
+    async def delete_accounts(usernames: List[str]) -> Dict:
+        """
+        Delete many accounts from the Scraper Service.
+        
+        The scraper only exposes a per-account DELETE, so calls are fanned out
+        over the shared connection pool with at most SCRAPER_BATCH_CONCURRENCY
+        requests in flight.
+        
+        Returns:
+            Dict with "deleted" and "failed" ({"username", "reason"}) lists
+        """
+        semaphore = asyncio.Semaphore(settings.SCRAPER_BATCH_CONCURRENCY)
+        
+        async def delete_one(username: str) -> Dict:
+            async with semaphore:
+                return await delete_account(username)
+        
+        unique = list(dict.fromkeys(usernames))
+        results = await asyncio.gather(*[delete_one(username) for username in unique])
+        
+        deleted, failed = [], []
+        for username, result in zip(unique, results):
+            if "error" in result.get("status", ""):
+                failed.append({"username": username, "reason": result.get("message", "Unknown reason")})
+            else:
+                deleted.append(username)
+        
+        return {"deleted": deleted, "failed": failed}
@@ -0,0 +1,214 @@
+from array import array
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import logging
+import mmap
+import os
+import struct
+import tempfile
+
+# Electing a single writer needs file locks (POSIX only)
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.models.profile import InstagramProfile
+from app.services.hot_store import hot_series_store, _to_micros, _from_micros
+
+logger = logging.getLogger(__name__)
+
+# A series snapshot holds the hot window of every account's follower series:
+#
+#   header   magic, created_at, window_start, highest profile id, account count,
+#            index offset
+#   columns  per account, n int64 timestamps (microseconds) then n int64 counts
+#   index    per account, username length, username, column offset, n
+#
+# Columns are 8-byte aligned and in native byte order so that readers can map
+# the file and use them in place; the file is only meant for processes on the
+# host that wrote it.
+MAGIC = b"IGS1"
+HEADER = struct.Struct("<4s4xqqqqq")
+INDEX_ENTRY = struct.Struct("<qq")
+NAME_LENGTH = struct.Struct("<H")
+
+# Lock files held by this process, which makes it the writer of their snapshot
+_writer_locks: Dict[str, object] = {}
+
+def _elect_writer(path: str) -> bool:
+    """
+    True if this process is (or now becomes) the writer of the snapshot at
+    path: the first process to lock f"{path}.lock" holds the lock until it
+    exits, so only one of several workers configured as writers writes.
+    """
+    if not FCNTL_AVAILABLE or path in _writer_locks:
+        return True
+    lock_file = open(f"{path}.lock", "a")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return False
+    _writer_locks[path] = lock_file
+    return True
+
+def write_snapshot(session_factory: sessionmaker, path: str) -> Optional[Dict]:
+    """
+    Write the hot window of every account to a series snapshot file.
+
+    The file is written to a temporary file next to path and moved into
+    place, so processes that have mapped the previous file keep reading it
+    undisturbed. Only the process elected by _elect_writer writes.
+
+    Returns:
+        Dict with the number of accounts and points written, or None if
+        another process is the writer
+    """
+    if not _elect_writer(path):
+        return None
+
+    created_at = datetime.now()
+    window_start = created_at - timedelta(days=settings.HOT_STORE_WINDOW_DAYS)
+    db: Session = session_factory()
+    try:
+        # Readers top up with rows above this id, so take it before the window
+        max_profile_id = db.query(func.max(InstagramProfile.id)).scalar() or 0
+        built = hot_series_store.database_window(db)
+    finally:
+        db.close()
+
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(path) or ".", prefix=f"{os.path.basename(path)}.", suffix=".tmp"
+    )
+    # mkstemp creates the file private to this user; readers only need read access
+    os.chmod(tmp_path, 0o644)
+    index: List[Tuple[str, int, int]] = []
+    points = 0
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(HEADER.pack(MAGIC, 0, 0, 0, 0, 0))
+            for username, series in built.items():
+                index.append((username, f.tell(), len(series)))
+                timestamps, counts = zip(*series.points(0)) if len(series) else ((), ())
+                f.write(array("q", timestamps).tobytes())
+                f.write(array("q", counts).tobytes())
+                points += len(series)
+
+            index_offset = f.tell()
+            for username, offset, count in index:
+                name = username.encode("utf-8")
+                f.write(NAME_LENGTH.pack(len(name)) + name + INDEX_ENTRY.pack(offset, count))
+
+            f.seek(0)
+            f.write(HEADER.pack(
+                MAGIC, _to_micros(created_at), _to_micros(window_start), max_profile_id, len(index), index_offset
+            ))
+        os.replace(tmp_path, path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+
+    logger.info(f"Wrote series snapshot of {len(index)} accounts ({points} points) to {path}")
+    return {"accounts": len(index), "points": points}
+
+class SeriesSnapshot:
+    """
+    Read-only memory map of a series snapshot file.
+
+    Series are returned as int64 views into the mapping, so every process
+    mapping the same file shares one copy in the page cache.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.mtime = os.stat(path).st_mtime
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, created_at, window_start, self.max_profile_id, count, position = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Not a series snapshot file: {path}")
+        self.created_at = _from_micros(created_at)
+        self.window_start = _from_micros(window_start)
+
+        self._view = memoryview(self._mmap)
+        self._index: Dict[str, Tuple[int, int]] = {}
+        for _ in range(count):
+            (length,) = NAME_LENGTH.unpack_from(self._mmap, position)
+            position += NAME_LENGTH.size
+            username = bytes(self._mmap[position:position + length]).decode("utf-8")
+            position += length
+            self._index[username] = INDEX_ENTRY.unpack_from(self._mmap, position)
+            position += INDEX_ENTRY.size
+
+    def usernames(self) -> List[str]:
+        return list(self._index)
+
+    def series(self, username: str) -> Optional[Tuple[memoryview, memoryview]]:
+        """
+        (timestamps, counts) columns of an account, or None if the snapshot
+        does not hold it.
+        """
+        entry = self._index.get(username)
+        if entry is None:
+            return None
+        offset, count = entry
+        middle = offset + 8 * count
+        return (
+            self._view[offset:middle].cast("q"),
+            self._view[middle:middle + 8 * count].cast("q")
+        )
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+def attach_snapshot(path: str) -> Optional[SeriesSnapshot]:
+    """
+    Map the snapshot file at path and attach it to the hot series store.
+
+    Returns:
+        The attached snapshot, or None if there is no usable file
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        snapshot = SeriesSnapshot(path)
+    except (OSError, ValueError, struct.error) as e:
+        logger.warning(f"Could not map series snapshot {path}: {e}")
+        return None
+    hot_series_store.attach_snapshot(snapshot)
+    logger.info(f"Attached series snapshot of {len(snapshot)} accounts from {path}")
+    return snapshot
+
+def prepare_snapshot(session_factory: sessionmaker) -> Optional[SeriesSnapshot]:
+    """
+    Attach SERIES_SNAPSHOT_PATH at startup, writing it first if this process
+    is the writer and there is no file yet.
+    """
+    path = settings.SERIES_SNAPSHOT_PATH
+    if settings.SERIES_SNAPSHOT_WRITER and not os.path.exists(path):
+        write_snapshot(session_factory, path)
+    return attach_snapshot(path)
+
+async def snapshot_loop(session_factory: sessionmaker, snapshot: Optional[SeriesSnapshot] = None) -> None:
+    """
+    Every SERIES_SNAPSHOT_INTERVAL_SECONDS, rewrite the snapshot (writer) and
+    attach the newest file once it has changed.
+    """
+    path = settings.SERIES_SNAPSHOT_PATH
+    while True:
+        await asyncio.sleep(settings.SERIES_SNAPSHOT_INTERVAL_SECONDS)
+        try:
+            if settings.SERIES_SNAPSHOT_WRITER:
+                await asyncio.to_thread(write_snapshot, session_factory, path)
+            if os.path.exists(path) and (snapshot is None or os.stat(path).st_mtime != snapshot.mtime):
+                snapshot = await asyncio.to_thread(attach_snapshot, path) or snapshot
+        except Exception as e:
+            logger.error(f"Series snapshot refresh failed: {e}")
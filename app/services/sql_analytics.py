@@ -0,0 +1,149 @@
+from typing import Dict, List, Optional
+from datetime import datetime
+
+from sqlalchemy import DateTime, Float, cast, func, select, union_all
+from sqlalchemy.orm import Session
+
+from app.models.profile import InstagramProfile
+
+# Growth metric building blocks computed inside the database with window
+# functions (PostgreSQL, and SQLite 3.25+), so that only the aggregated
+# result is transferred instead of every snapshot row.
+
+def _observations(account_id: int, start: datetime):
+    """
+    CTE of an account's observations since start, with collapsed runs
+    expanded into their first and last observation as profile_service does.
+
+    Every branch is bounded on checked_at so that it stays an index range
+    scan: a run started before start can only be the account's latest row
+    before it, which is looked up with one seek.
+    """
+    profiles = InstagramProfile.__table__
+    earlier = profiles.alias("earlier")
+    carried_in_at = select(func.max(earlier.c.checked_at)).where(
+        earlier.c.account_id == account_id,
+        earlier.c.checked_at < start
+    ).scalar_subquery()
+
+    first_seen = select(
+        profiles.c.checked_at.label("observed_at"),
+        profiles.c.follower_count
+    ).where(
+        profiles.c.account_id == account_id,
+        profiles.c.checked_at >= start
+    )
+    last_seen = select(
+        profiles.c.last_seen_at.label("observed_at"),
+        profiles.c.follower_count
+    ).where(
+        profiles.c.account_id == account_id,
+        profiles.c.checked_at >= start,
+        profiles.c.last_seen_at > profiles.c.checked_at
+    )
+    carried_in = select(
+        profiles.c.last_seen_at.label("observed_at"),
+        profiles.c.follower_count
+    ).where(
+        profiles.c.account_id == account_id,
+        profiles.c.checked_at == carried_in_at,
+        profiles.c.last_seen_at >= start
+    )
+    return union_all(first_seen, last_seen, carried_in).cte("observations")
+
+def _hours_between(db: Session, later, earlier):
+    if db.get_bind().dialect.name == "postgresql":
+        return func.extract("epoch", later - earlier) / 3600
+    return (func.julianday(later) - func.julianday(earlier)) * 24
+
+def series_summary(db: Session, account_id: int, start: datetime) -> Optional[Dict]:
+    """
+    Number of observations since start and the first and last of them.
+
+    Returns:
+        Dict with data_points, start_date, end_date, start_followers and
+        end_followers, or None without observations
+    """
+    observations = _observations(account_id, start)
+    whole_series = {"order_by": observations.c.observed_at, "rows": (None, None)}
+    row = db.execute(
+        select(
+            func.count().over().label("data_points"),
+            func.first_value(observations.c.observed_at, type_=DateTime).over(**whole_series).label("start_date"),
+            func.last_value(observations.c.observed_at, type_=DateTime).over(**whole_series).label("end_date"),
+            func.first_value(observations.c.follower_count).over(**whole_series).label("start_followers"),
+            func.last_value(observations.c.follower_count).over(**whole_series).label("end_followers")
+        ).limit(1)
+    ).first()
+    return dict(row._mapping) if row else None
+
+def changes_between_scrapes(db: Session, account_id: int, start: datetime) -> List[Dict]:
+    """
+    Change between each pair of consecutive observations since start, using
+    LAG() over the observation time.
+    """
+    observations = _observations(account_id, start)
+    ordered = {"order_by": observations.c.observed_at}
+    steps = select(
+        func.lag(observations.c.follower_count).over(**ordered).label("previous_count"),
+        observations.c.follower_count.label("current_count"),
+        func.lag(observations.c.observed_at, type_=DateTime).over(**ordered).label("previous_timestamp"),
+        observations.c.observed_at.label("current_timestamp")
+    ).subquery()
+
+    rows = db.execute(
+        select(
+            steps.c.previous_count,
+            steps.c.current_count,
+            (steps.c.current_count - steps.c.previous_count).label("change"),
+            steps.c.previous_timestamp,
+            steps.c.current_timestamp,
+            cast(_hours_between(db, steps.c.current_timestamp, steps.c.previous_timestamp), Float).label("hours_between")
+        ).where(
+            steps.c.previous_count.isnot(None)
+        ).order_by(steps.c.current_timestamp)
+    )
+    return [dict(row._mapping) for row in rows]
+
+def observation_before(db: Session, account_id: int, start: datetime, moment: datetime, before: datetime) -> Optional[Dict]:
+    """
+    Latest observation since start at or before moment and strictly before
+    before (an index lookup on (account_id, checked_at)).
+
+    Returns:
+        Dict with checked_at and follower_count, or None
+    """
+    observations = _observations(account_id, start)
+    row = db.execute(
+        select(
+            observations.c.observed_at.label("checked_at"),
+            observations.c.follower_count
+        ).where(
+            observations.c.observed_at <= moment,
+            observations.c.observed_at < before
+        ).order_by(observations.c.observed_at.desc()).limit(1)
+    ).first()
+    return dict(row._mapping) if row else None
+
+def daily_last_values(db: Session, account_id: int, start: datetime) -> List[Dict]:
+    """
+    Last observation of each day since start, picked with ROW_NUMBER(), with
+    the number of observations that day as sample_count.
+    """
+    observations = _observations(account_id, start)
+    day = func.date(observations.c.observed_at)
+    ranked = select(
+        observations.c.observed_at,
+        observations.c.follower_count,
+        func.row_number().over(partition_by=day, order_by=observations.c.observed_at.desc()).label("position"),
+        func.count().over(partition_by=day).label("sample_count")
+    ).subquery()
+
+    rows = db.execute(
+        select(
+            ranked.c.observed_at.label("checked_at"),
+            ranked.c.follower_count,
+            ranked.c.sample_count
+        ).where(ranked.c.position == 1).order_by(ranked.c.observed_at)
+    )
+    return [dict(row._mapping) for row in rows]
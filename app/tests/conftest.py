@@ -5,9 +5,13 @@ from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from app.main import app
+from app.core.config import settings
 from app.db.session import Base, get_db
 from app.models.account import InstagramAccount
 from app.models.profile import InstagramProfile
+from app.services.ingest_service import record_snapshot
+from app.services.hot_store import hot_series_store
+from app.services.account_index import account_index
 from app.tests.fixtures.test_data import create_test_data
 
 # Use in-memory SQLite for tests
@@ -20,6 +24,18 @@ engine = create_engine(
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+@pytest.fixture(autouse=True)
+def hot_store(monkeypatch):
+    # Series are loaded lazily from the test database instead of at startup
+    monkeypatch.setattr(settings, "HOT_STORE_ENABLED", True)
+    monkeypatch.setattr(settings, "HOT_STORE_WARM_ON_STARTUP", False)
+    monkeypatch.setattr(settings, "PURGE_RESUME_ON_STARTUP", False)
+    hot_series_store.clear()
+    account_index.clear()
+    yield hot_series_store
+    hot_series_store.clear()
+    account_index.clear()
+
 @pytest.fixture
 def db_session():
     # Create the database tables
@@ -63,24 +79,24 @@ def sample_data(db_session):
     db_session.add(account2)
     db_session.commit()
     
-    profile1 = InstagramProfile(
-        account_id=account1.id,
+    record_snapshot(
+        db_session,
+        account1.id,
         follower_count=1000,
         profile_pic_url="https://example.com/pic1.jpg",
         full_name="Test User 1",
         biography="This is a test user"
     )
     
-    profile2 = InstagramProfile(
-        account_id=account2.id,
+    record_snapshot(
+        db_session,
+        account2.id,
         follower_count=2000,
         profile_pic_url="https://example.com/pic2.jpg",
         full_name="Test User 2",
         biography="This is another test user"
     )
     
-    db_session.add(profile1)
-    db_session.add(profile2)
     db_session.commit()
     
     return {"account1": account1, "account2": account2}
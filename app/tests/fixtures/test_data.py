@@ -1,7 +1,7 @@
 from datetime import datetime, timedelta
 import pytest
 from app.models.account import InstagramAccount
-from app.models.profile import InstagramProfile
+from app.services.ingest_service import record_snapshot
 
 def create_test_data(db_session):
     """
@@ -27,16 +27,15 @@ def create_test_data(db_session):
             follower_change = 10 + (days_ago % 7) - (days_ago % 5)  # Creates some variability
             follower_count += follower_change
         
-        profile = InstagramProfile(
-            account_id=account.id,
+        record_snapshot(
+            db_session,
+            account.id,
             follower_count=follower_count,
             profile_pic_url=f"https://example.com/pic_{account.username}.jpg",
             full_name=f"Test Account",
             biography="This is a test account for analytics",
             checked_at=date_point
         )
-        
-        db_session.add(profile)
     
     # Add some additional data points for today to simulate multiple scrapes
     hours_offsets = [20, 16, 12, 8, 4, 2, 1]  # Hours ago
@@ -45,16 +44,15 @@ def create_test_data(db_session):
         adjustment = (hours % 5) - 1  # Small random-like adjustment
         date_point = now - timedelta(hours=hours)
         
-        profile = InstagramProfile(
-            account_id=account.id,
+        record_snapshot(
+            db_session,
+            account.id,
             follower_count=follower_count + adjustment,
             profile_pic_url=f"https://example.com/pic_{account.username}.jpg",
             full_name=f"Test Account",
             biography="This is a test account for analytics",
             checked_at=date_point
         )
-        
-        db_session.add(profile)
     
     # Create a second account for comparison
     account2 = InstagramAccount(username="comparison_account", status="active")
@@ -71,16 +69,15 @@ def create_test_data(db_session):
             follower_change = 5 + (days_ago % 10)
             follower_count += follower_change
         
-        profile = InstagramProfile(
-            account_id=account2.id,
+        record_snapshot(
+            db_session,
+            account2.id,
             follower_count=follower_count,
             profile_pic_url=f"https://example.com/pic_{account2.username}.jpg",
             full_name="Comparison Account",
             biography="This is another test account for comparison",
             checked_at=date_point
         )
-        
-        db_session.add(profile)
     
     db_session.commit()
     
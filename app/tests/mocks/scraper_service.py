@@ -1,5 +1,5 @@
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, AsyncMock
 from datetime import datetime, timedelta
 
 # Mock data for testing
@@ -35,7 +35,7 @@ MOCK_ACCOUNTS = [
     }
 ]
 
-# Mock for the httpx client
+# Mock for the httpx response
 class MockResponse:
     def __init__(self, json_data, status_code=200):
         self.json_data = json_data
@@ -51,32 +51,32 @@ class MockResponse:
 # Fixtures and patches for testing
 @pytest.fixture
 def mock_fetch_profiles():
-    with patch("app.services.scraper_service.httpx.AsyncClient") as mock_client:
-        mock_instance = MagicMock()
-        mock_instance.__aenter__.return_value.get.return_value = MockResponse(MOCK_PROFILES)
-        mock_client.return_value = mock_instance
+    with patch("app.services.scraper_service.get_scraper_client") as mock_get_client:
+        mock_client = MagicMock()
+        mock_client.get = AsyncMock(return_value=MockResponse(MOCK_PROFILES))
+        mock_get_client.return_value = mock_client
         yield
 
 @pytest.fixture
 def mock_fetch_accounts():
-    with patch("app.services.scraper_service.httpx.AsyncClient") as mock_client:
-        mock_instance = MagicMock()
-        mock_instance.__aenter__.return_value.get.return_value = MockResponse(MOCK_ACCOUNTS)
-        mock_client.return_value = mock_instance
+    with patch("app.services.scraper_service.get_scraper_client") as mock_get_client:
+        mock_client = MagicMock()
+        mock_client.get = AsyncMock(return_value=MockResponse(MOCK_ACCOUNTS))
+        mock_get_client.return_value = mock_client
         yield
 
 @pytest.fixture
 def mock_trigger_scrape():
-    with patch("app.services.scraper_service.httpx.AsyncClient") as mock_client:
-        mock_instance = MagicMock()
-        mock_instance.__aenter__.return_value.post.return_value = MockResponse({"status": "success", "message": "Scrape initiated"})
-        mock_client.return_value = mock_instance
+    with patch("app.services.scraper_service.get_scraper_client") as mock_get_client:
+        mock_client = MagicMock()
+        mock_client.post = AsyncMock(return_value=MockResponse({"status": "success", "message": "Scrape initiated"}))
+        mock_get_client.return_value = mock_client
         yield
 
 @pytest.fixture
 def mock_add_account():
-    with patch("app.services.scraper_service.httpx.AsyncClient") as mock_client:
-        mock_instance = MagicMock()
-        mock_instance.__aenter__.return_value.post.return_value = MockResponse({"status": "success", "username": "new_account"})
-        mock_client.return_value = mock_instance
+    with patch("app.services.scraper_service.get_scraper_client") as mock_get_client:
+        mock_client = MagicMock()
+        mock_client.post = AsyncMock(return_value=MockResponse({"status": "success", "username": "new_account"}))
+        mock_get_client.return_value = mock_client
         yield
\ No newline at end of file
@@ -0,0 +1,29 @@
+from sqlalchemy import event
+
+from app.services.account_index import account_index
+from app.services.account_service import add_accounts, delete_account
+from app.services.profile_service import get_latest_profile, get_profile_history
+
+def test_usernames_resolved_from_memory(db_session):
+    created = add_accounts(db_session, ["indexed_one", "indexed_two"])
+    ids = {account["username"]: account["id"] for account in created}
+    assert account_index.resolve(db_session, "indexed_one") == ids["indexed_one"]
+
+    statements = []
+    engine = db_session.get_bind()
+
+    def listener(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        assert get_profile_history(db_session, username="unknown_account", days=7) == []
+        assert get_latest_profile(db_session, username="unknown_account") is None
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    assert statements == []
+
+    # Deleted accounts stop resolving at once
+    delete_account(db_session, "indexed_two")
+    assert account_index.resolve(db_session, "indexed_two") is None
+    assert account_index.resolve(db_session, "indexed_one") == ids["indexed_one"]
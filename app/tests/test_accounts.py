@@ -1,3 +1,7 @@
+from datetime import datetime, timedelta
+
+import pytest
+
 def test_read_accounts(client, sample_data):
     response = client.get("/api/v1/accounts/")
     assert response.status_code == 200
@@ -51,4 +55,196 @@ def test_delete_nonexistent_account(client, sample_data, monkeypatch):
     # Try to delete non-existent account
     response = client.delete("/api/v1/accounts/nonexistent_user")
     assert response.status_code == 404
-    assert "not found" in response.json()["detail"]
\ No newline at end of file
+    assert "not found" in response.json()["detail"]
+
+def test_bulk_delete_accounts(client, sample_data, monkeypatch):
+    # Scraper deletes testuser1 but does not know unknown_user
+    async def mock_delete_accounts(usernames):
+        return {
+            "deleted": [username for username in usernames if username != "unknown_user"],
+            "failed": [{"username": "unknown_user", "reason": "Account 'unknown_user' not found"}]
+        }
+    
+    import app.api.v1.accounts
+    monkeypatch.setattr(app.api.v1.accounts, "delete_accounts_from_scraper", mock_delete_accounts)
+    
+    response = client.request(
+        "DELETE", "/api/v1/accounts/", json={"usernames": ["testuser1", "unknown_user"]}
+    )
+    assert response.status_code == 200
+    
+    data = response.json()
+    assert data["status"] == "partial"
+    assert [account["username"] for account in data["deleted"]] == ["testuser1"]
+    assert data["failed"][0]["username"] == "unknown_user"
+    
+    # Only the account the scraper deleted is gone from the database
+    response = client.get("/api/v1/accounts/")
+    usernames = [account["username"] for account in response.json()]
+    assert usernames == ["testuser2"]
+
+def test_delete_account_purges_profiles_in_background(client, analytics_data, db_session, monkeypatch):
+    async def mock_delete_account(username):
+        return {"message": f"Account '{username}' and all associated profile data deleted successfully"}
+    
+    import app.api.v1.accounts
+    from app.core.config import settings
+    from app.models.profile import InstagramProfile
+    monkeypatch.setattr(app.api.v1.accounts, "delete_account_from_scraper", mock_delete_account)
+    monkeypatch.setattr(settings, "PURGE_CHUNK_SIZE", 5)
+    
+    account_id = analytics_data["account1"].id
+    profile_count = db_session.query(InstagramProfile).filter(
+        InstagramProfile.account_id == account_id
+    ).count()
+    
+    response = client.delete("/api/v1/accounts/test_account")
+    assert response.status_code == 200
+    job_id = response.json()["purge_job_id"]
+    
+    # The test client runs background tasks before returning
+    response = client.get(f"/api/v1/accounts/purge-jobs/{job_id}")
+    assert response.status_code == 200
+    
+    job = response.json()
+    assert job["status"] == "completed"
+    assert job["profiles_deleted"] == profile_count
+    assert job["accounts_deleted"] == 1
+    
+    assert db_session.query(InstagramProfile).filter(
+        InstagramProfile.account_id == account_id
+    ).count() == 0
+    
+    # Other accounts keep their history
+    response = client.get("/api/v1/profiles/history/comparison_account")
+    assert response.status_code == 200
+
+def test_purge_job_not_found(client):
+    response = client.get("/api/v1/accounts/purge-jobs/unknown")
+    assert response.status_code == 404
+
+def test_read_accounts_pages_by_cursor(client, sample_data):
+    response = client.get("/api/v1/accounts/?limit=1")
+    assert response.status_code == 200
+    first = response.json()
+    cursor = response.headers["X-Next-Cursor"]
+    
+    response = client.get(f"/api/v1/accounts/?limit=1&cursor={cursor}")
+    second = response.json()
+    assert len(first) == len(second) == 1
+    assert second[0]["id"] > first[0]["id"]
+    
+    response = client.get(f"/api/v1/accounts/?limit=1&cursor={response.headers['X-Next-Cursor']}")
+    assert response.json() == []
+    assert "X-Next-Cursor" not in response.headers
+    
+    assert client.get("/api/v1/accounts/?cursor=bad").status_code == 400
+
+def test_add_accounts_skips_concurrently_added(tmp_path):
+    from sqlalchemy import create_engine, event
+    from sqlalchemy.orm import sessionmaker
+    from app.db.session import Base
+    from app.models.account import InstagramAccount
+    from app.services.account_service import add_accounts
+    
+    engine = create_engine(f"sqlite:///{tmp_path / 'accounts.db'}")
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine)
+    db = session_factory()
+    
+    # Another request adds "raced" after it was looked up as missing
+    raced = []
+    
+    def add_concurrently(session, flush_context, instances):
+        if raced:
+            return
+        raced.append(True)
+        other = session_factory()
+        other.add(InstagramAccount(username="raced", status="active"))
+        other.commit()
+        other.close()
+    
+    event.listen(db, "before_flush", add_concurrently)
+    try:
+        created = add_accounts(db, ["fresh", "raced"])
+        assert [account["username"] for account in created] == ["fresh"]
+        assert db.query(InstagramAccount).filter(InstagramAccount.username == "raced").count() == 1
+    finally:
+        db.close()
+        engine.dispose()
+
+def test_purge_with_foreign_keys_enforced(tmp_path):
+    from sqlalchemy import create_engine, event
+    from sqlalchemy.orm import sessionmaker
+    from app.db.session import Base
+    from app.models.account import InstagramAccount
+    from app.models.rollup import FollowerRollupHourly, FollowerRollupDaily
+    from app.services import purge_service
+    from app.services.account_service import delete_account
+    from app.services.ingest_service import record_snapshot
+    
+    engine = create_engine(f"sqlite:///{tmp_path / 'purge.db'}")
+    
+    @event.listens_for(engine, "connect")
+    def enforce_foreign_keys(connection, record):
+        connection.execute("PRAGMA foreign_keys=ON")
+    
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine)
+    db = session_factory()
+    try:
+        account = InstagramAccount(username="purged", status="active")
+        db.add(account)
+        db.flush()
+        for hours in range(3):
+            record_snapshot(db, account.id, 100 + hours, datetime.now() - timedelta(hours=hours))
+        db.commit()
+        assert db.query(FollowerRollupHourly).count() == 3
+        
+        deleted = delete_account(db, "purged")
+        job = purge_service.create_purge_job([deleted])
+        purge_service.run_purge_job(job["job_id"], session_factory)
+        assert job["status"] == "completed", job["error"]
+        assert job["accounts_deleted"] == 1
+        assert db.query(FollowerRollupHourly).count() == 0
+        assert db.query(FollowerRollupDaily).count() == 0
+    finally:
+        db.close()
+        engine.dispose()
+
+def test_deleted_account_waits_for_its_purge(client, analytics_data, db_session):
+    from sqlalchemy.orm import sessionmaker
+    from app.models.account import InstagramAccount
+    from app.models.profile import InstagramProfile
+    from app.services import purge_service
+    from app.services.account_service import add_accounts, delete_account
+    from app.services.ingest_service import ingest_profiles
+    
+    account_id = analytics_data["account1"].id
+    delete_account(db_session, "test_account")
+    
+    # Re-adding or ingesting while the purge is pending is refused
+    with pytest.raises(ValueError):
+        add_accounts(db_session, ["test_account"])
+    stored = db_session.query(InstagramProfile).filter(InstagramProfile.account_id == account_id).count()
+    result = ingest_profiles(db_session, [{"username": "test_account", "follower_count": 5}])
+    assert result["ingested"] == 0
+    assert db_session.query(InstagramProfile).filter(InstagramProfile.account_id == account_id).count() == stored
+    
+    response = client.post("/api/v1/scraper/accounts", json={"usernames": ["test_account"]})
+    assert response.json()["failed"][0]["username"] == "test_account"
+    assert response.json()["created_in_db"] == 0
+    
+    # A restart picks up the purge that never ran
+    job = purge_service.resume_pending_purges(sessionmaker(bind=db_session.get_bind()))
+    assert job["status"] == "completed"
+    assert job["accounts_deleted"] == 1
+    db_session.expire_all()
+    assert db_session.query(InstagramAccount).filter(InstagramAccount.id == account_id).count() == 0
+    assert purge_service.resume_pending_purges(sessionmaker(bind=db_session.get_bind())) is None
+    
+    assert [account["username"] for account in add_accounts(db_session, ["test_account"])] == ["test_account"]
+    
+    # Finished jobs are forgotten once their cache entry would have expired
+    purge_service._evict_finished_jobs(datetime.now() + timedelta(seconds=purge_service.JOB_CACHE_SECONDS + 1))
+    assert job["job_id"] not in purge_service._jobs
@@ -1,3 +1,15 @@
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.models.account import InstagramAccount
+from app.models.profile import InstagramProfile
+from app.services.account_index import account_index
+from app.services.analytics_service import get_growth_metrics
+from app.services.ingest_service import ingest_profiles, record_snapshot
+from app.services.profile_service import get_latest_profile
+
 def test_growth_metrics(client, analytics_data):
     """
     Test the growth metrics endpoint
@@ -64,6 +76,27 @@ def test_rolling_average(client, analytics_data):
     assert "days_covered" in avg_data
     assert "total_change" in avg_data
 
+def test_rolling_average_of_account_not_scraped_recently(client, db_session):
+    # One scrape a day, 20 to 10 days ago, gaining 10 followers a day
+    last_scrape = (datetime.now() - timedelta(days=10)).replace(hour=12, minute=0, second=0, microsecond=0)
+    ingest_profiles(db_session, [
+        {
+            "username": "paused_account",
+            "follower_count": 1000 - 10 * day,
+            "checked_at": (last_scrape - timedelta(days=day)).isoformat()
+        }
+        for day in range(11)
+    ])
+    
+    response = client.get("/api/v1/analytics/rolling-average/paused_account")
+    assert response.status_code == 200
+    data = response.json()["rolling_avg_7day"]
+    assert data["average_change"] == 10
+    assert data["days_covered"] == 8
+    
+    full = client.get("/api/v1/analytics/growth/paused_account?days=30").json()
+    assert full["rolling_avg_7day"] == data
+
 def test_compare_accounts(client, analytics_data):
     """
     Test the account comparison endpoint
@@ -81,4 +114,141 @@ def test_compare_accounts(client, analytics_data):
     assert "rankings" in test_account
     assert "net_growth" in test_account["rankings"]
     assert "percentage_growth" in test_account["rankings"]
-    assert "daily_growth" in test_account["rankings"]
\ No newline at end of file
+    assert "daily_growth" in test_account["rankings"]
+
+def test_growth_metrics_selection(client, analytics_data):
+    full = client.get("/api/v1/analytics/growth/test_account?days=7").json()
+    
+    response = client.get("/api/v1/analytics/growth/test_account?days=7&metrics=change_24h,growth")
+    assert response.status_code == 200
+    data = response.json()
+    assert "changes_between_scrapes" not in data
+    assert "rolling_avg_7day" not in data
+    assert "change_12h" not in data
+    assert data["change_24h"] == full["change_24h"]
+    assert data["net_growth"] == full["net_growth"]
+    assert data["end_followers"] == full["end_followers"]
+    
+    # The rolling average covers the week up to the latest observation, which
+    # reaches just past a 7-day window ending now
+    rolling = client.get("/api/v1/analytics/rolling-average/test_account").json()
+    month = client.get("/api/v1/analytics/growth/test_account?days=30&metrics=rolling_avg_7day").json()
+    assert rolling["rolling_avg_7day"] == month["rolling_avg_7day"]
+    
+    response = client.get("/api/v1/analytics/growth/test_account?metrics=everything")
+    assert response.status_code == 400
+
+def test_sql_backend_matches_python(db_session, analytics_data, monkeypatch):
+    monkeypatch.setattr(settings, "HOT_STORE_ENABLED", False)
+    
+    def compare(username="test_account"):
+        monkeypatch.setattr(settings, "ANALYTICS_BACKEND", "python")
+        python = get_growth_metrics(db_session, username, days=7, resolution="raw")
+        monkeypatch.setattr(settings, "ANALYTICS_BACKEND", "sql")
+        sql = get_growth_metrics(db_session, username, days=7, resolution="raw")
+        
+        python_steps = python.pop("changes_between_scrapes")
+        sql_steps = sql.pop("changes_between_scrapes")
+        assert sql == python
+        assert len(sql_steps) == len(python_steps)
+        for sql_step, python_step in zip(sql_steps, python_steps):
+            assert sql_step.pop("hours_between") == pytest.approx(python_step.pop("hours_between"), abs=0.01)
+            assert sql_step == python_step
+    
+    compare()
+    
+    # An unchanged count extends the latest row's last_seen_at instead of adding one
+    monkeypatch.setattr(settings, "PROFILE_STORAGE_MODE", "collapsed")
+    latest = get_latest_profile(db_session, username="test_account")
+    record_snapshot(
+        db_session,
+        account_index.resolve(db_session, "test_account"),
+        follower_count=latest["follower_count"],
+        profile_pic_url=latest["profile_pic_url"],
+        full_name=latest["full_name"],
+        biography=latest["biography"],
+        checked_at=datetime.now()
+    )
+    db_session.commit()
+    compare()
+    
+    # A collapsed run that started before the window reaches into it
+    account = InstagramAccount(username="carried_account", status="active")
+    db_session.add(account)
+    db_session.flush()
+    now = datetime.now()
+    for checked_at, follower_count, last_seen_at in [
+        (now - timedelta(days=20), 400, None),
+        (now - timedelta(days=12), 500, now - timedelta(days=3)),
+        (now - timedelta(hours=1), 520, None),
+    ]:
+        db_session.add(InstagramProfile(
+            account_id=account.id, follower_count=follower_count, checked_at=checked_at, last_seen_at=last_seen_at
+        ))
+    db_session.commit()
+    account_index.add("carried_account", account.id)
+    compare("carried_account")
+
+def test_fleet_summary(client, analytics_data, db_session):
+    # An account last scraped days ago is measured back from its last scrape
+    stale = InstagramAccount(username="stale_account", status="active")
+    db_session.add(stale)
+    db_session.flush()
+    last_scrape = datetime.now() - timedelta(days=3)
+    for hours, follower_count in ((30, 900), (20, 950), (0, 1000)):
+        db_session.add(InstagramProfile(
+            account_id=stale.id, follower_count=follower_count, checked_at=last_scrape - timedelta(hours=hours)
+        ))
+    db_session.commit()
+    account_index.load(db_session)
+    
+    statements = []
+    
+    def listener(conn, cursor, statement, *args):
+        statements.append(statement)
+    
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        response = client.get("/api/v1/analytics/summary")
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    assert response.status_code == 200
+    assert len(statements) == 2
+    
+    accounts = {account["username"]: account for account in response.json()["accounts"]}
+    assert set(accounts) == {"test_account", "comparison_account", "stale_account"}
+    assert accounts["stale_account"]["change_12h"]["change"] == 50
+    assert accounts["stale_account"]["change_24h"]["change"] == 100
+    # Nothing a week before the last scrape: measured from the earliest one
+    assert accounts["stale_account"]["change_7d"]["change"] == 100
+    
+    growth = client.get("/api/v1/analytics/growth/test_account?days=30&resolution=raw").json()
+    summary = accounts["test_account"]
+    assert summary["follower_count"] == growth["end_followers"]
+    assert summary["change_24h"]["change"] == growth["change_24h"]["change"]
+    assert summary["change_12h"]["change"] == growth["change_12h"]["change"]
+    assert summary["change_7d"]["previous_count"] <= summary["follower_count"]
+
+def test_fetch_script_clears_cached_summary(client, analytics_data, db_session, monkeypatch):
+    from fetch_data import store_data
+    from app.api.v1 import analytics as analytics_api
+    from app.services import profile_service
+    
+    cache = {}
+    monkeypatch.setattr(analytics_api, "get_cache", cache.get)
+    monkeypatch.setattr(analytics_api, "set_cache", lambda key, value, expire_seconds=3600: cache.__setitem__(key, value))
+    monkeypatch.setattr(profile_service, "delete_cache", lambda key: cache.pop(key, None))
+    monkeypatch.setattr(profile_service, "clear_cache_pattern", lambda pattern: None)
+    
+    client.get("/api/v1/analytics/summary")
+    assert profile_service.SUMMARY_CACHE_KEY in cache
+    
+    # The scraper import path refreshes the summary like any ingest batch
+    store_data(db_session, [], [
+        {"username": "test_account", "follower_count": 5000, "checked_at": datetime.now().isoformat()}
+    ])
+    assert profile_service.SUMMARY_CACHE_KEY not in cache
+    
+    after = {account["username"]: account for account in client.get("/api/v1/analytics/summary").json()["accounts"]}
+    assert after["test_account"]["follower_count"] == 5000
@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta
+import os
+
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.models.profile import InstagramProfile
+from app.services.archive_service import encode_observations, decode_observations, archive_path
+from app.services.ingest_service import ingest_profiles
+from app.services import purge_service
+from app.services.account_service import delete_account
+from app.services.profile_service import get_profile_history, get_followers_at_time, get_profiles_at_time
+from app.services.retention_service import run_retention
+
+def test_archive_encoding_round_trip():
+    start = datetime(2024, 3, 1, 12, 0, 0, 250)
+    observations = [
+        (start + timedelta(hours=6 * i), 1000 + (i % 3) * 7 - i, None if i == 0 else 3 + i // 4)
+        for i in range(50)
+    ]
+    data = encode_observations(observations)
+    assert decode_observations(data) == observations
+    # Regular series compress to a few bytes per point
+    assert len(data) < 50 * 4
+
+def test_archive_moves_old_months_and_history_reads_through(db_session, monkeypatch, tmp_path):
+    now = datetime.now()
+    payload = [
+        {
+            "username": "archived_account",
+            "follower_count": 5000 + i,
+            "full_name": "Archived" if i < 100 else "Archived v2",
+            "checked_at": (now - timedelta(hours=12 * (240 - i))).isoformat()
+        }
+        for i in range(240)
+    ]
+    ingest_profiles(db_session, payload)
+    before = get_profile_history(db_session, username="archived_account", days=150)
+    target_time = now - timedelta(days=100, minutes=1)
+    point_before = get_followers_at_time(db_session, "archived_account", target_time)
+    profiles_before = get_profiles_at_time(db_session, target_time)
+    
+    monkeypatch.setattr(settings, "ARCHIVE_ENABLED", True)
+    monkeypatch.setattr(settings, "ARCHIVE_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "ARCHIVE_AFTER_DAYS", 60)
+    
+    result = run_retention(sessionmaker(bind=db_session.get_bind()), now=now)
+    assert result["archived_rows"] > 0
+    
+    remaining = db_session.query(InstagramProfile).count()
+    assert remaining == 240 - result["archived_rows"]
+    oldest_remaining = db_session.query(InstagramProfile.checked_at).order_by(InstagramProfile.checked_at).first()[0]
+    assert oldest_remaining >= (now - timedelta(days=60)).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    
+    account_id = db_session.query(InstagramProfile.account_id).first()[0]
+    oldest_month = (now - timedelta(hours=12 * 240)).replace(day=1)
+    assert os.path.exists(archive_path(account_id, oldest_month))
+    
+    # History crossing the boundary is identical to before archiving
+    after = get_profile_history(db_session, username="archived_account", days=150)
+    assert after == before
+    
+    # Point-in-time lookups read through to the archive as well
+    assert get_followers_at_time(db_session, "archived_account", target_time) == point_before
+    assert get_profiles_at_time(db_session, target_time) == profiles_before
+    assert profiles_before[0]["full_name"] == "Archived"
+    
+    # Purging the account removes its archive files
+    deleted = delete_account(db_session, "archived_account")
+    job = purge_service.create_purge_job([deleted])
+    purge_service.run_purge_job(job["job_id"], sessionmaker(bind=db_session.get_bind()))
+    assert job["status"] == "completed"
+    assert not os.path.exists(os.path.dirname(archive_path(account_id, oldest_month)))
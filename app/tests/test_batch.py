@@ -0,0 +1,63 @@
+from sqlalchemy import event
+
+from app.core.config import settings
+
+def test_batch_matches_single_requests(client, analytics_data):
+    single = {
+        "profile": client.get("/api/v1/profiles/current/test_account?fields=follower_count").json(),
+        "growth": client.get("/api/v1/analytics/growth/test_account?days=7&metrics=growth,change_24h").json(),
+        "changes": client.get("/api/v1/analytics/changes/comparison_account").json(),
+        "rolling": client.get("/api/v1/analytics/rolling-average/test_account").json()
+    }
+    
+    response = client.post("/api/v1/batch", json={"queries": [
+        {"id": "profile", "type": "profile", "username": "test_account", "fields": "follower_count"},
+        {"id": "growth", "type": "growth", "username": "test_account", "days": 7, "metrics": "growth,change_24h"},
+        {"id": "changes", "type": "changes", "username": "comparison_account"},
+        {"id": "rolling", "type": "rolling_average", "username": "test_account"},
+        {"id": "unknown", "type": "growth", "username": "unknown_account"},
+        {"id": "invalid", "type": "growth", "username": "test_account", "metrics": "everything"}
+    ]})
+    assert response.status_code == 200
+    results = {result["id"]: result for result in response.json()["results"]}
+    
+    for name, expected in single.items():
+        assert results[name]["status"] == 200
+        assert results[name]["body"] == expected
+    assert results["unknown"]["status"] == 404
+    assert results["invalid"]["status"] == 400
+    assert [result["id"] for result in response.json()["results"]] == [
+        "profile", "growth", "changes", "rolling", "unknown", "invalid"
+    ]
+
+def test_batch_shares_series(client, analytics_data, db_session, monkeypatch):
+    monkeypatch.setattr(settings, "HOT_STORE_ENABLED", False)
+    queries = [
+        {"type": "growth", "username": "test_account", "days": 3, "resolution": "raw"},
+        {"type": "changes", "username": "test_account", "days": 2},
+        {"type": "growth", "username": "test_account", "days": 3, "resolution": "raw"},
+        {"type": "growth", "username": "test_account", "days": 7, "resolution": "raw"}
+    ]
+    statements = []
+    
+    def listener(conn, cursor, statement, *args):
+        if "instagram_profiles" in statement:
+            statements.append(statement)
+    
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        client.get("/api/v1/analytics/growth/test_account?days=7&resolution=raw&refresh=true")
+        single_statements = len(statements)
+        statements.clear()
+        results = client.post("/api/v1/batch", json={"queries": queries}).json()["results"]
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    
+    # The 7-day window of snapshots serves all four sub-queries
+    assert len(statements) == single_statements
+    assert results[0] == results[2]
+    assert results[0]["body"]["end_followers"] == results[3]["body"]["end_followers"]
+    assert results[1]["body"] == client.get("/api/v1/analytics/changes/test_account?days=2").json()
+    
+    assert client.post("/api/v1/batch", json={"queries": []}).status_code == 422
@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta
+
+from app.core.config import settings
+from app.services.ingest_service import ingest_profiles
+from app.services.profile_service import get_follower_series, get_profile_history
+
+def _ingest(db_session, username, counts, start):
+    ingest_profiles(db_session, [
+        {
+            "username": username,
+            "follower_count": count,
+            "checked_at": (start + timedelta(hours=i)).isoformat()
+        }
+        for i, count in enumerate(counts)
+    ])
+
+def test_series_served_from_memory_and_appended_on_ingest(db_session, hot_store):
+    start = datetime.now() - timedelta(days=2)
+    _ingest(db_session, "hot_account", [100, 110, 120], start)
+    
+    series = get_follower_series(db_session, "hot_account", days=7)
+    assert hot_store.stats()["misses"] == 1
+    history = get_profile_history(db_session, username="hot_account", days=7)
+    assert series == [{"follower_count": p["follower_count"], "checked_at": p["checked_at"]} for p in history]
+    
+    # New observations are appended without reloading
+    _ingest(db_session, "hot_account", [130], start + timedelta(hours=10))
+    series = get_follower_series(db_session, "hot_account", days=7)
+    assert [p["follower_count"] for p in series] == [100, 110, 120, 130]
+    assert hot_store.stats()["hits"] == 1
+    
+    # Follower-only history selections are served from memory too
+    counts = get_profile_history(db_session, username="hot_account", days=7, fields=["follower_count"])
+    assert counts == [{"follower_count": count} for count in [100, 110, 120, 130]]
+    assert hot_store.stats()["hits"] == 2
+    
+    # Windows beyond the hot range go to the database
+    assert hot_store.get_series(db_session, "hot_account", settings.HOT_STORE_WINDOW_DAYS + 1) is None
+    assert hot_store.get_series(db_session, "unknown_account", 7) is None
+
+def test_fetch_script_appends_to_loaded_series(db_session, hot_store):
+    from fetch_data import store_data
+    
+    start = datetime.now() - timedelta(days=1)
+    _ingest(db_session, "script_hot_account", [100, 110], start)
+    get_follower_series(db_session, "script_hot_account", days=7)
+    
+    # The scraper import path appends like any other ingest batch
+    store_data(db_session, [], [
+        {"username": "script_hot_account", "followers": 125, "checked_at": (start + timedelta(hours=5)).isoformat()}
+    ])
+    series = get_follower_series(db_session, "script_hot_account", days=7)
+    assert [p["follower_count"] for p in series] == [100, 110, 125]
+    assert hot_store.stats()["misses"] == 1
+    
+def test_least_recently_queried_accounts_are_evicted(db_session, hot_store, monkeypatch):
+    monkeypatch.setattr(settings, "HOT_STORE_MAX_POINTS", 5)
+    start = datetime.now() - timedelta(days=1)
+    for username in ("first", "second", "third"):
+        _ingest(db_session, username, [1, 2], start)
+    
+    get_follower_series(db_session, "first", days=7)
+    get_follower_series(db_session, "second", days=7)
+    get_follower_series(db_session, "first", days=7)
+    get_follower_series(db_session, "third", days=7)
+    
+    # "second" was queried least recently
+    assert hot_store.stats() == {"accounts": 2, "points": 4, "hits": 1, "misses": 3}
+    assert hot_store.get_series(db_session, "first", 7) is not None
+    assert hot_store.stats()["hits"] == 2
@@ -0,0 +1,175 @@
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.utils.db_migrations import (
+    migrate_profile_attributes, migrate_attributes_index, migrate_profile_last_seen, migrate_follower_rollups,
+    run_migrations
+)
+from app.models.account import InstagramAccount
+from app.models.profile import InstagramProfile
+from app.models.profile_attributes import ProfileAttributes
+from app.models.rollup import FollowerRollupHourly
+from app.services.ingest_service import ingest_profiles, resolve_attributes
+from app.services.profile_service import get_profile_history, get_latest_profile
+
+def test_attributes_stored_once_per_change(db_session):
+    now = datetime.now()
+    payload = [
+        {
+            "username": "attr_account",
+            "follower_count": 100 + i,
+            "full_name": "Attr Account" if i < 3 else "Renamed Account",
+            "biography": "bio",
+            "profile_pic_url": "https://example.com/pic.jpg",
+            "checked_at": (now - timedelta(hours=5 - i)).isoformat()
+        }
+        for i in range(5)
+    ]
+    
+    result = ingest_profiles(db_session, payload)
+    assert result == {"ingested": 5, "accounts_created": 1}
+    
+    assert db_session.query(InstagramProfile).count() == 5
+    assert db_session.query(ProfileAttributes).count() == 2
+    
+    # Responses are reconstructed from the attribute versions
+    history = get_profile_history(db_session, username="attr_account", days=1)
+    assert [p["full_name"] for p in history] == ["Attr Account"] * 3 + ["Renamed Account"] * 2
+    assert history[0]["biography"] == "bio"
+    
+    latest = get_latest_profile(db_session, username="attr_account")
+    assert latest["full_name"] == "Renamed Account"
+    assert latest["follower_count"] == 104
+
+def test_backfilled_attributes_match_their_version(db_session):
+    account = InstagramAccount(username="backfill_account", status="active")
+    db_session.add(account)
+    db_session.flush()
+    base = datetime(2024, 1, 1)
+    first = {"full_name": "First", "biography": "bio", "profile_pic_url": "pic"}
+    second = {"full_name": "Second", "biography": "bio", "profile_pic_url": "pic"}
+    
+    version_a = resolve_attributes(db_session, account.id, first, base)
+    version_b = resolve_attributes(db_session, account.id, second, base + timedelta(hours=10))
+    
+    # A late scrape from before the rename still matches the first version
+    cache = {}
+    assert resolve_attributes(db_session, account.id, first, base + timedelta(hours=5), cache) is version_a
+    assert resolve_attributes(db_session, account.id, second, base + timedelta(hours=12), cache) is version_b
+    assert db_session.query(ProfileAttributes).count() == 2
+    
+    # A late scrape with attributes that were never current starts a version at its time
+    other = resolve_attributes(
+        db_session, account.id, {**first, "biography": "edited"}, base + timedelta(hours=6), cache
+    )
+    assert other.first_seen_at == base + timedelta(hours=6)
+    assert db_session.query(ProfileAttributes).count() == 3
+
+def test_migrate_legacy_profiles():
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    InstagramAccount.__table__.create(bind=engine)
+    now = datetime.now()
+    
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO instagram_accounts (id, username, status) VALUES (1, 'legacy', 'active')"))
+        conn.execute(text(
+            "CREATE TABLE instagram_profiles ("
+            "id INTEGER PRIMARY KEY, account_id INTEGER, follower_count INTEGER, "
+            "profile_pic_url TEXT, full_name VARCHAR, biography TEXT, checked_at DATETIME)"
+        ))
+        for i, name in enumerate(["Legacy", "Legacy", "Legacy v2", "Legacy v2"]):
+            conn.execute(
+                text(
+                    "INSERT INTO instagram_profiles "
+                    "(account_id, follower_count, profile_pic_url, full_name, biography, checked_at) "
+                    "VALUES (1, :count, 'pic', :name, 'bio', :checked_at)"
+                ),
+                {"count": 10 + i, "name": name, "checked_at": now - timedelta(hours=4 - i)}
+            )
+    
+    run_migrations(engine)
+    # Already migrated: nothing left to do
+    assert migrate_profile_attributes(engine) is False
+    assert migrate_attributes_index(engine) is False
+    assert migrate_profile_last_seen(engine) is False
+    assert migrate_follower_rollups(engine) is False
+    
+    columns = {col["name"] for col in inspect(engine).get_columns("instagram_profiles")}
+    assert "full_name" not in columns
+    assert "attributes_id" in columns
+    
+    db = sessionmaker(bind=engine)()
+    try:
+        assert db.query(ProfileAttributes).count() == 2
+        history = get_profile_history(db, username="legacy", days=1)
+        assert [p["full_name"] for p in history] == ["Legacy", "Legacy", "Legacy v2", "Legacy v2"]
+        assert [p["follower_count"] for p in history] == [10, 11, 12, 13]
+        assert db.query(FollowerRollupHourly).count() == 4
+    finally:
+        db.close()
+
+
+def test_collapsed_storage_extends_unchanged_snapshots(db_session, monkeypatch):
+    from app.core.config import settings
+    from app.services.profile_service import get_followers_at_time
+    monkeypatch.setattr(settings, "PROFILE_STORAGE_MODE", "collapsed")
+    
+    now = datetime.now()
+    counts = [100, 100, 100, 105, 105, 110]
+    payload = [
+        {
+            "username": "quiet_account",
+            "follower_count": count,
+            "full_name": "Quiet",
+            "checked_at": (now - timedelta(hours=len(counts) - i)).isoformat()
+        }
+        for i, count in enumerate(counts)
+    ]
+    ingest_profiles(db_session, payload)
+    
+    # Three runs of identical counts are stored as three rows
+    assert db_session.query(InstagramProfile).count() == 3
+    
+    # History expands each run into its first and last observation
+    history = get_profile_history(db_session, username="quiet_account", days=1)
+    assert [p["follower_count"] for p in history] == [100, 100, 105, 105, 110]
+    assert history[1]["checked_at"] == now - timedelta(hours=4)
+    
+    # A window starting inside a run still sees the run's value
+    history = get_profile_history(db_session, username="quiet_account", days=(4.5 / 24))
+    assert [p["follower_count"] for p in history] == [100, 105, 105, 110]
+    
+    at_time = get_followers_at_time(db_session, "quiet_account", now - timedelta(hours=4, minutes=30))
+    assert at_time["follower_count"] == 100
+    assert at_time["checked_at"] == now - timedelta(hours=6)
+    
+    latest = get_latest_profile(db_session, username="quiet_account")
+    assert latest["follower_count"] == 110
+    assert latest["checked_at"] == now - timedelta(hours=1)
+
+def test_fetch_script_ingests_through_ingest_profiles(db_session):
+    from fetch_data import store_data
+    
+    moment = datetime(2024, 3, 1, 12, 0, tzinfo=timezone(timedelta(hours=2)))
+    result = store_data(
+        db_session,
+        [{"username": "script_account", "status": "active"}],
+        [
+            {"account": "script_account", "followers": 10, "name": "Script", "timestamp": moment.isoformat()},
+            {"username": "script_account", "follower_count": 12, "full_name": "Script",
+             "checked_at": (moment + timedelta(hours=1)).astimezone(timezone.utc).isoformat().replace("+00:00", "Z")}
+        ]
+    )
+    assert result == {"ingested": 2, "accounts_created": 0}
+    
+    # Offsets are converted to local time rather than dropped
+    local = moment.astimezone().replace(tzinfo=None)
+    rows = db_session.query(InstagramProfile).order_by(InstagramProfile.checked_at).all()
+    assert [row.checked_at for row in rows] == [local, local + timedelta(hours=1)]
+    assert db_session.query(FollowerRollupHourly).count() == 2
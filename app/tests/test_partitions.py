@@ -0,0 +1,48 @@
+from datetime import datetime
+
+from app.core.utils.partitions import (
+    add_months, partition_ddl, partition_name, ensure_partitions, drop_partitions_before, list_partitions,
+    months_to_keep
+)
+from app.models.account import InstagramAccount
+from app.models.profile import InstagramProfile
+
+def test_monthly_partition_bounds():
+    assert add_months(datetime(2024, 11, 1), 1) == datetime(2024, 12, 1)
+    assert add_months(datetime(2024, 12, 1), 1) == datetime(2025, 1, 1)
+    assert add_months(datetime(2025, 1, 1), -1) == datetime(2024, 12, 1)
+    
+    assert partition_name(datetime(2024, 12, 1)) == "instagram_profiles_2024_12"
+    assert partition_ddl(datetime(2024, 12, 17, 8, 30)) == (
+        "CREATE TABLE IF NOT EXISTS instagram_profiles_2024_12 PARTITION OF instagram_profiles "
+        "FOR VALUES FROM ('2024-12-01') TO ('2025-01-01')"
+    )
+
+def test_partitioning_is_a_no_op_on_sqlite(db_session):
+    engine = db_session.get_bind()
+    assert ensure_partitions(engine) == []
+    assert list_partitions(engine) == []
+    assert drop_partitions_before(engine, datetime.now()) == []
+
+def test_months_to_keep(db_session):
+    accounts = [InstagramAccount(username=f"kept_{number}", status="active") for number in range(3)]
+    db_session.add_all(accounts)
+    db_session.flush()
+    db_session.add_all([
+        # Expired history with a newer latest snapshot
+        InstagramProfile(account_id=accounts[0].id, follower_count=1, checked_at=datetime(2024, 1, 5)),
+        InstagramProfile(account_id=accounts[0].id, follower_count=2, checked_at=datetime(2024, 6, 5)),
+        # Latest snapshot before the cutoff
+        InstagramProfile(account_id=accounts[1].id, follower_count=3, checked_at=datetime(2024, 2, 5)),
+        # Collapsed run that started before the cutoff and ended after it
+        InstagramProfile(
+            account_id=accounts[2].id, follower_count=4,
+            checked_at=datetime(2024, 3, 5), last_seen_at=datetime(2024, 6, 1)
+        ),
+        InstagramProfile(account_id=accounts[2].id, follower_count=5, checked_at=datetime(2024, 6, 2)),
+    ])
+    db_session.commit()
+    
+    assert months_to_keep(db_session.get_bind(), datetime(2024, 5, 1)) == {
+        datetime(2024, 2, 1), datetime(2024, 3, 1)
+    }
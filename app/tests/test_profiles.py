@@ -1,3 +1,13 @@
+import io
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import event
+
+from app.services import columnar
+from app.services.profile_service import get_followers_at_time
+
 def test_read_latest_profiles(client, sample_data):
     response = client.get("/api/v1/profiles/")
     assert response.status_code == 200
@@ -15,4 +25,194 @@ def test_read_latest_profiles(client, sample_data):
         if profile["username"] == "testuser1":
             assert profile["follower_count"] == 1000
         elif profile["username"] == "testuser2":
-            assert profile["follower_count"] == 2000
\ No newline at end of file
+            assert profile["follower_count"] == 2000
+
+def test_profile_history_pages(client, analytics_data):
+    full = client.get("/api/v1/profiles/history/test_account?days=40").json()
+    
+    pages = []
+    response = client.get("/api/v1/profiles/history/test_account?days=40&limit=10")
+    while True:
+        assert response.status_code == 200
+        pages.append(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+        response = client.get(f"/api/v1/profiles/history/test_account?days=40&limit=10&cursor={cursor}")
+    
+    assert [len(page) for page in pages] == [10, 10, 10, 8]
+    assert [point for page in pages for point in page] == full
+    
+    response = client.get("/api/v1/profiles/history/test_account?cursor=not-a-cursor")
+    assert response.status_code == 400
+
+def test_export_history_streams_ndjson_and_csv(client, analytics_data):
+    history = client.get("/api/v1/profiles/history/test_account?days=40").json()
+    
+    response = client.get("/api/v1/profiles/export?usernames=test_account,comparison_account,unknown&days=40")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    exported = [row for row in rows if row["username"] == "test_account"]
+    assert [(row["checked_at"], row["follower_count"]) for row in exported] == [
+        (point["checked_at"], point["follower_count"]) for point in history
+    ]
+    assert {row["username"] for row in rows} == {"test_account", "comparison_account"}
+    
+    response = client.get("/api/v1/profiles/export?usernames=test_account&days=40&format=csv")
+    lines = response.text.splitlines()
+    assert lines[0] == "username,checked_at,follower_count,full_name,biography,profile_pic_url"
+    assert len(lines) == len(history) + 1
+    
+    assert client.get("/api/v1/profiles/export?usernames=test_account&format=xml").status_code == 400
+    assert client.get("/api/v1/profiles/export?usernames=unknown").status_code == 404
+
+def test_history_includes_runs_carried_into_the_window(client, db_session):
+    from app.models.account import InstagramAccount
+    from app.models.profile import InstagramProfile
+    
+    now = datetime.now()
+    runs = {
+        # (checked_at, last_seen_at) of each collapsed row, in days ago
+        "carried": [(10, 1), (0.5, None)],
+        "carried_only": [(20, 15), (12, 2)],
+        "ended_before": [(20, 10)],
+    }
+    for username, rows in runs.items():
+        account = InstagramAccount(username=username, status="active")
+        db_session.add(account)
+        db_session.flush()
+        for checked, last_seen in rows:
+            db_session.add(InstagramProfile(
+                account_id=account.id,
+                follower_count=100,
+                checked_at=now - timedelta(days=checked),
+                last_seen_at=now - timedelta(days=last_seen) if last_seen else None
+            ))
+    db_session.commit()
+    
+    response = client.get("/api/v1/profiles/export?usernames=carried,carried_only,ended_before&days=5")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [(row["username"], row["checked_at"]) for row in rows] == [
+        ("carried", (now - timedelta(days=1)).isoformat()),
+        ("carried", (now - timedelta(days=0.5)).isoformat()),
+        ("carried_only", (now - timedelta(days=2)).isoformat()),
+    ]
+    
+    # The multi-account history reads the same observations
+    history = client.get("/api/v1/profiles/history?usernames=carried,carried_only,ended_before&days=5").json()
+    assert {username: [point["checked_at"] for point in points] for username, points in history.items()} == {
+        username: [row["checked_at"] for row in rows if row["username"] == username]
+        for username in ("carried", "carried_only", "ended_before")
+    }
+
+def test_history_and_export_as_arrow_and_parquet(client, analytics_data):
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+    
+    history = client.get("/api/v1/profiles/history/test_account?days=40").json()
+    
+    response = client.get("/api/v1/profiles/history/test_account?days=40&format=arrow")
+    assert response.headers["content-type"] == "application/vnd.apache.arrow.stream"
+    table = pa.ipc.open_stream(response.content).read_all()
+    assert table.column_names == ["checked_at", "follower_count"]
+    assert table.column("follower_count").to_pylist() == [point["follower_count"] for point in history]
+    
+    response = client.get("/api/v1/profiles/export?usernames=test_account,comparison_account&days=40&format=parquet")
+    table = pq.read_table(io.BytesIO(response.content))
+    assert table.column_names == ["username", "checked_at", "follower_count"]
+    assert table.column("username").to_pylist().count("test_account") == len(history)
+    
+    assert client.get("/api/v1/profiles/history/test_account?format=xml").status_code == 400
+
+def test_columnar_formats_need_pyarrow(client, analytics_data, monkeypatch):
+    monkeypatch.setattr(columnar, "ARROW_AVAILABLE", False)
+    response = client.get("/api/v1/profiles/history/test_account?format=parquet")
+    assert response.status_code == 400
+    assert "pyarrow" in response.json()["detail"]
+
+def test_multi_account_history(client, analytics_data):
+    single = {
+        username: client.get(f"/api/v1/profiles/history/{username}?days=40").json()
+        for username in ("test_account", "comparison_account")
+    }
+    
+    response = client.get("/api/v1/profiles/history?usernames=test_account,comparison_account,unknown&days=40")
+    assert response.status_code == 200
+    assert response.json() == single
+    
+    assert client.get("/api/v1/profiles/history?usernames=unknown").status_code == 404
+
+def test_sparse_fieldsets(client, analytics_data, db_session):
+    statements = []
+    
+    def listener(conn, cursor, statement, *args):
+        statements.append(statement)
+    
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        latest = client.get("/api/v1/profiles/?fields=username,follower_count").json()
+        history = client.get("/api/v1/profiles/history/test_account?days=40&fields=follower_count").json()
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    
+    assert all(set(profile) == {"username", "follower_count"} for profile in latest)
+    assert history and all(set(point) == {"follower_count"} for point in history)
+    assert not any("instagram_profile_attributes" in statement for statement in statements)
+    
+    current = client.get("/api/v1/profiles/current/test_account?fields=full_name,checked_at").json()
+    assert set(current) == {"full_name", "checked_at"}
+    assert current["full_name"] == "Test Account"
+    
+    assert client.get("/api/v1/profiles/?fields=password").status_code == 400
+
+def test_profiles_at_time(client, analytics_data, db_session):
+    target_time = datetime.now() - timedelta(days=3, hours=5)
+    expected = {
+        username: get_followers_at_time(db_session, username, target_time)
+        for username in ("test_account", "comparison_account")
+    }
+    
+    statements = []
+    
+    def listener(conn, cursor, statement, *args):
+        statements.append(statement)
+    
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        response = client.get("/api/v1/profiles/at", params={"time": target_time.isoformat()})
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    assert response.status_code == 200
+    assert len(statements) == 1
+    
+    profiles = {profile["username"]: profile for profile in response.json()}
+    assert set(profiles) == set(expected)
+    for username, point in expected.items():
+        assert profiles[username]["follower_count"] == point["follower_count"]
+        assert profiles[username]["checked_at"] == point["checked_at"].isoformat()
+    
+    early = (datetime.now() - timedelta(days=90)).isoformat()
+    response = client.get(
+        "/api/v1/profiles/at",
+        params={"times": f"{target_time.isoformat()},{early}", "fields": "username,follower_count"}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data[early] == []
+    assert sorted(data[target_time.isoformat()], key=lambda profile: profile["username"]) == sorted(
+        ({"username": username, "follower_count": point["follower_count"]} for username, point in expected.items()),
+        key=lambda profile: profile["username"]
+    )
+    
+    # Timestamps with an offset are converted to local time
+    shifted = target_time.astimezone(timezone(timedelta(hours=12))).isoformat()
+    response = client.get("/api/v1/profiles/at", params={"time": shifted})
+    assert {profile["username"]: profile["checked_at"] for profile in response.json()} == {
+        username: point["checked_at"].isoformat() for username, point in expected.items()
+    }
+    
+    assert client.get("/api/v1/profiles/at").status_code == 400
+    assert client.get("/api/v1/profiles/at?time=yesterday").status_code == 400
@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.services import resampling
+
+def test_resample_methods():
+    pytest.importorskip("numpy")
+    base = datetime(2024, 1, 1)
+    series = {
+        "a": [
+            {"checked_at": base + timedelta(hours=1), "follower_count": 100},
+            {"checked_at": base + timedelta(hours=2, minutes=30), "follower_count": 130},
+            {"checked_at": base + timedelta(hours=5), "follower_count": 160}
+        ],
+        "b": []
+    }
+    step = resampling.parse_grid("1h")
+    grid = resampling.build_grid(base + timedelta(minutes=20), base + timedelta(hours=5, minutes=40), step)
+    assert grid == [base + timedelta(hours=hours) for hours in range(1, 6)]
+    
+    assert resampling.resample(series, grid, step, "locf") == {
+        "a": [100, 100, 130, 130, 160],
+        "b": [None] * 5
+    }
+    assert resampling.resample(series, grid, step, "step")["a"] == [100, None, 130, None, 160]
+    assert resampling.resample(series, grid, step, "linear")["a"] == [100.0, 120.0, 136.0, 148.0, 160.0]
+    
+    with pytest.raises(ValueError):
+        resampling.build_grid(base, base + timedelta(days=30), resampling.parse_grid("1m"))
+    with pytest.raises(ValueError):
+        resampling.parse_grid("1w")
+    with pytest.raises(ValueError):
+        resampling.check_method("cubic")
+
+def test_history_and_compare_on_grid(client, analytics_data):
+    pytest.importorskip("numpy")
+    
+    history = client.get("/api/v1/profiles/history/test_account?days=7&grid=1d").json()
+    assert len(history) == 7
+    assert all(set(point) == {"checked_at", "follower_count"} for point in history)
+    assert all(datetime.fromisoformat(point["checked_at"]).time() == datetime.min.time() for point in history)
+    
+    latest = client.get("/api/v1/profiles/current/test_account").json()
+    hourly = client.get("/api/v1/profiles/history/test_account?days=2&grid=1h&fill=locf").json()
+    assert hourly[-1]["follower_count"] == latest["follower_count"]
+    
+    many = client.get("/api/v1/profiles/history?usernames=test_account,comparison_account&days=7&grid=1d").json()
+    assert many["test_account"] == history
+    assert [point["checked_at"] for point in many["comparison_account"]] == [point["checked_at"] for point in history]
+    
+    comparison = client.get(
+        "/api/v1/analytics/compare?usernames=test_account&usernames=comparison_account&days=7&grid=1d&fill=linear"
+    ).json()
+    aligned = comparison["aligned"]
+    assert aligned["fill"] == "linear"
+    assert len(aligned["grid"]) == 7
+    assert set(aligned["series"]) == {"test_account", "comparison_account"}
+    assert all(len(values) == 7 for values in aligned["series"].values())
+    
+    assert client.get("/api/v1/profiles/history/test_account?grid=fortnight").status_code == 400
+    assert client.get("/api/v1/profiles/history/test_account?grid=1d&fill=cubic").status_code == 400
+    assert client.get("/api/v1/profiles/history/test_account?grid=1d&limit=10").status_code == 400
+    assert client.get("/api/v1/profiles/history/test_account?days=30&grid=1m").status_code == 400
+    assert client.get("/api/v1/analytics/compare?usernames=test_account&days=30&grid=1m").status_code == 400
+
+def test_grid_needs_numpy(client, analytics_data, monkeypatch):
+    monkeypatch.setattr(resampling, "NUMPY_AVAILABLE", False)
+    response = client.get("/api/v1/profiles/history/test_account?grid=1d")
+    assert response.status_code == 400
+    assert "numpy" in response.json()["detail"]
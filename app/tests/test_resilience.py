@@ -0,0 +1,116 @@
+import asyncio
+import pytest
+import httpx
+from unittest.mock import patch, MagicMock, AsyncMock
+
+from app.services import scraper_service
+from app.services.resilience import CircuitBreaker, LastGoodCache, retry_async
+from app.tests.mocks.scraper_service import MockResponse, MOCK_PROFILES
+
+@pytest.fixture
+def reset_scraper_resilience():
+    scraper_service.scraper_breaker.reset()
+    scraper_service.last_good_responses.clear()
+    yield
+    scraper_service.scraper_breaker.reset()
+    scraper_service.last_good_responses.clear()
+
+def test_circuit_opens_after_threshold():
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=60)
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow_request()
+
+def test_circuit_half_open_allows_single_trial():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    assert breaker.state == "half_open"
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+    
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+def test_retry_recovers_from_transient_errors():
+    calls = {"count": 0}
+    
+    async def flaky():
+        calls["count"] += 1
+        if calls["count"] < 3:
+            raise httpx.ConnectError("connection refused")
+        return "ok"
+    
+    result = asyncio.run(retry_async(flaky, attempts=3, base_delay=0, max_delay=0))
+    assert result == "ok"
+    assert calls["count"] == 3
+
+def test_retry_does_not_retry_client_errors():
+    calls = {"count": 0}
+    request = httpx.Request("GET", "http://scraper/accounts")
+    
+    async def not_found():
+        calls["count"] += 1
+        raise httpx.HTTPStatusError("not found", request=request, response=httpx.Response(404, request=request))
+    
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(retry_async(not_found, attempts=3, base_delay=0, max_delay=0))
+    assert calls["count"] == 1
+
+def test_last_good_cache_expires():
+    cache = LastGoodCache(ttl_seconds=0)
+    cache.set("profiles", [1])
+    assert cache.get("profiles", []) == []
+    
+    cache = LastGoodCache(ttl_seconds=60)
+    cache.set("profiles", [1])
+    assert cache.get("profiles") == [1]
+
+def test_open_circuit_serves_last_good_profiles(client, reset_scraper_resilience, monkeypatch):
+    monkeypatch.setattr(scraper_service.settings, "SCRAPER_RETRY_BASE_DELAY", 0)
+    
+    with patch("app.services.scraper_service.get_scraper_client") as mock_get_client:
+        mock_client = MagicMock()
+        mock_client.get = AsyncMock(return_value=MockResponse(MOCK_PROFILES))
+        mock_get_client.return_value = mock_client
+        
+        response = client.get("/api/v1/scraper/latest")
+        assert len(response.json()) == 2
+        
+        # Scraper goes down: every call times out until the circuit opens
+        mock_client.get = AsyncMock(side_effect=httpx.ReadTimeout("timed out"))
+        for _ in range(scraper_service.settings.SCRAPER_BREAKER_FAILURE_THRESHOLD):
+            response = client.get("/api/v1/scraper/latest")
+            assert len(response.json()) == 2
+        
+        assert scraper_service.scraper_breaker.state == "open"
+        
+        # While open, no network call is made and the cached response is served
+        mock_client.get.reset_mock()
+        response = client.get("/api/v1/scraper/latest")
+        assert response.status_code == 200
+        assert len(response.json()) == 2
+        mock_client.get.assert_not_called()
+
+def test_cancelled_trial_releases_half_open_circuit(reset_scraper_resilience):
+    breaker = scraper_service.scraper_breaker
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    breaker._opened_at -= breaker.reset_timeout
+    assert breaker.state == "half_open"
+    
+    with patch("app.services.scraper_service.get_scraper_client") as mock_get_client:
+        mock_client = MagicMock()
+        mock_client.get = AsyncMock(side_effect=asyncio.CancelledError())
+        mock_get_client.return_value = mock_client
+        
+        with pytest.raises(asyncio.CancelledError):
+            asyncio.run(scraper_service._send("get", "/profiles", 1.0))
+        
+        # The next call is let through as a new trial instead of being rejected
+        mock_client.get = AsyncMock(return_value=MockResponse(MOCK_PROFILES))
+        asyncio.run(scraper_service._send("get", "/profiles", 1.0))
+    
+    assert breaker.state == "closed"
@@ -0,0 +1,79 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.models.account import InstagramAccount
+from app.models.profile import InstagramProfile
+from app.models.rollup import FollowerRollupHourly, FollowerRollupDaily
+from app.services.ingest_service import ingest_profiles
+from app.services.profile_service import get_profile_history
+from app.services.retention_service import run_retention
+
+def test_retention_compacts_and_history_stitches_tiers(db_session, monkeypatch):
+    monkeypatch.setattr(settings, "RETENTION_ENABLED", True)
+    monkeypatch.setattr(settings, "RETENTION_RAW_DAYS", 30)
+    monkeypatch.setattr(settings, "RETENTION_HOURLY_DAYS", 45)
+    monkeypatch.setattr(settings, "RETENTION_CHUNK_SIZE", 50)
+
+    now = datetime.now()
+    # Four scrapes a day for 60 days
+    payload = [
+        {
+            "username": "old_account",
+            "follower_count": 1000 + i,
+            "full_name": "Old Account",
+            "checked_at": (now - timedelta(hours=6 * (240 - i))).isoformat()
+        }
+        for i in range(240)
+    ]
+    ingest_profiles(db_session, payload)
+
+    # Snapshots written without rollups (e.g. by another tool)
+    legacy = InstagramAccount(username="legacy_account", status="active")
+    db_session.add(legacy)
+    db_session.flush()
+    for days_ago in (40, 39, 38):
+        db_session.add(InstagramProfile(
+            account_id=legacy.id,
+            follower_count=500 - days_ago,
+            checked_at=now - timedelta(days=days_ago)
+        ))
+    db_session.commit()
+
+    result = run_retention(sessionmaker(bind=db_session.get_bind()), now=now)
+    assert result["accounts"] == 2
+    assert result["raw_deleted"] > 0
+    assert result["hourly_deleted"] > 0
+    assert result["daily_deleted"] == 0
+
+    raw_cutoff = now - timedelta(days=30)
+    old_account_id = db_session.query(InstagramAccount.id).filter_by(username="old_account").scalar()
+    assert db_session.query(InstagramProfile).filter(
+        InstagramProfile.account_id == old_account_id,
+        InstagramProfile.checked_at < raw_cutoff
+    ).count() == 0
+    assert db_session.query(FollowerRollupHourly).filter(
+        FollowerRollupHourly.bucket_start < now - timedelta(days=46)
+    ).count() == 0
+
+    # The legacy account keeps its latest snapshot and got rollups for the rest
+    assert db_session.query(InstagramProfile).filter_by(account_id=legacy.id).count() == 1
+    assert db_session.query(FollowerRollupDaily).filter_by(account_id=legacy.id).count() == 3
+
+    history = get_profile_history(db_session, username="old_account", days=60)
+    times = [point["checked_at"] for point in history]
+    assert times == sorted(times)
+    assert times[0] < now - timedelta(days=58)
+    assert history[-1]["follower_count"] == 1239
+
+    # Raw points keep their attributes, rollup points carry counts only
+    assert history[-1]["full_name"] == "Old Account"
+    assert history[0]["full_name"] is None
+
+    # Daily points before the hourly retention, hourly points up to the raw cutoff
+    gaps = {
+        (later - earlier).total_seconds() / 3600
+        for earlier, later in zip(times, times[1:])
+    }
+    assert gaps <= {6.0, 24.0}
@@ -0,0 +1,79 @@
+from datetime import datetime, timedelta, timezone
+
+from app.models.rollup import FollowerRollupHourly, FollowerRollupDaily
+from app.services.analytics_service import choose_resolution
+from app.models.account import InstagramAccount
+from app.services.ingest_service import ingest_profiles, record_snapshot
+from app.services.rollup_service import backfill_rollups
+
+def _payload(username, start, counts, step=timedelta(minutes=20)):
+    return [
+        {
+            "username": username,
+            "follower_count": count,
+            "checked_at": (start + step * i).isoformat()
+        }
+        for i, count in enumerate(counts)
+    ]
+
+def test_rollups_maintained_on_ingest(db_session):
+    start = (datetime.now() - timedelta(days=2)).replace(hour=10, minute=0, second=0, microsecond=0)
+    # Three scrapes in the 10:00 hour, two in the 11:00 hour
+    ingest_profiles(db_session, _payload("rollup_account", start, [100, 90, 120, 130, 125]))
+
+    hourly = db_session.query(FollowerRollupHourly).order_by(FollowerRollupHourly.bucket_start).all()
+    assert [bucket.bucket_start.hour for bucket in hourly] == [10, 11]
+    first_hour = hourly[0]
+    assert (first_hour.first_count, first_hour.last_count) == (100, 120)
+    assert (first_hour.min_count, first_hour.max_count, first_hour.sample_count) == (90, 120, 3)
+
+    daily = db_session.query(FollowerRollupDaily).one()
+    assert (daily.first_count, daily.last_count, daily.sample_count) == (100, 125, 5)
+
+    # A later batch folds into the existing buckets
+    ingest_profiles(db_session, _payload("rollup_account", start + timedelta(minutes=50), [80]))
+    db_session.refresh(hourly[0])
+    assert (hourly[0].min_count, hourly[0].last_count, hourly[0].sample_count) == (80, 80, 4)
+
+    # Rebuilding from raw snapshots gives the same buckets
+    account_id = daily.account_id
+    assert backfill_rollups(db_session, account_id) == 6
+    daily = db_session.query(FollowerRollupDaily).one()
+    assert (daily.min_count, daily.max_count, daily.sample_count) == (80, 130, 6)
+
+def test_choose_resolution():
+    assert choose_resolution(7) == "raw"
+    assert choose_resolution(90) == "hour"
+    assert choose_resolution(365) == "day"
+    assert choose_resolution(365, "raw") == "raw"
+
+def test_growth_metrics_from_rollups(client, db_session):
+    start = datetime.now() - timedelta(days=60)
+    counts = [1000 + 10 * day for day in range(60)]
+    ingest_profiles(db_session, _payload("long_account", start, counts, step=timedelta(days=1)))
+
+    response = client.get("/api/v1/analytics/growth/long_account?days=365")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["resolution"] == "day"
+    assert data["data_points"] == 60
+    assert data["net_growth"] == 590
+    assert data["rolling_avg_7day"]["average_change"] == 10
+
+    response = client.get("/api/v1/analytics/growth/long_account?days=90&resolution=week")
+    assert response.status_code == 400
+
+def test_aware_timestamps_fold_into_rollups(db_session):
+    account = InstagramAccount(username="aware_account", status="active")
+    db_session.add(account)
+    db_session.commit()
+    start = datetime(2024, 5, 1, 8, 10, tzinfo=timezone.utc)
+
+    # Two scrapes with UTC timestamps in one hour, stored by separate calls
+    for minutes, count in ((0, 100), (30, 110)):
+        record_snapshot(db_session, account.id, count, checked_at=start + timedelta(minutes=minutes))
+        db_session.commit()
+
+    hourly = db_session.query(FollowerRollupHourly).one()
+    assert hourly.bucket_start == start.astimezone().replace(tzinfo=None, minute=0)
+    assert (hourly.first_count, hourly.last_count, hourly.sample_count) == (100, 110, 2)
@@ -0,0 +1,38 @@
+import asyncio
+
+from app.services import scraper_client
+
+def test_client_is_shared_between_calls():
+    async def run():
+        await scraper_client.start_scraper_client()
+        try:
+            first = scraper_client.get_scraper_client()
+            second = scraper_client.get_scraper_client()
+            assert first is second
+            assert not first.is_closed
+        finally:
+            await scraper_client.close_scraper_client()
+    
+    asyncio.run(run())
+
+def test_client_closed_on_shutdown():
+    async def run():
+        await scraper_client.start_scraper_client()
+        client = scraper_client.get_scraper_client()
+        await scraper_client.close_scraper_client()
+        assert client.is_closed
+        
+        # A new client is created lazily after shutdown
+        replacement = scraper_client.get_scraper_client()
+        assert replacement is not client
+        await scraper_client.close_scraper_client()
+    
+    asyncio.run(run())
+
+def test_client_uses_configured_limits():
+    client = scraper_client.build_scraper_client()
+    try:
+        assert str(client.base_url).rstrip("/") == scraper_client.settings.SCRAPER_SERVICE_URL.rstrip("/")
+        assert client.timeout.connect == scraper_client.settings.SCRAPER_CONNECT_TIMEOUT
+    finally:
+        asyncio.run(client.aclose())
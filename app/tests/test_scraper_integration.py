@@ -1,6 +1,10 @@
+import asyncio
 import pytest
+from unittest.mock import patch, MagicMock, AsyncMock
+from app.core.config import settings
+from app.services import scrape_coordinator, scraper_service
 from app.tests.mocks.scraper_service import (
-    mock_fetch_profiles, mock_fetch_accounts, 
+    MockResponse, mock_fetch_profiles, mock_fetch_accounts, 
     mock_trigger_scrape, mock_add_account
 )
 
@@ -26,7 +30,13 @@ def test_get_accounts(client, mock_fetch_accounts):
     assert "test_account" in usernames
     assert "comparison_account" in usernames
 
-def test_trigger_scrape(client, mock_trigger_scrape):
+@pytest.fixture
+def scrape_state():
+    scrape_coordinator.reset_scrape_state()
+    yield
+    scrape_coordinator.reset_scrape_state()
+
+def test_trigger_scrape(client, mock_trigger_scrape, scrape_state):
     response = client.post("/api/v1/scraper/trigger")
     assert response.status_code == 200
     
@@ -40,4 +50,109 @@ def test_add_account(client, mock_add_account):
     
     data = response.json()
     assert data["status"] == "success"
-    assert data["username"] == "new_account"
\ No newline at end of file
+    assert data["username"] == "new_account"
+
+def test_bulk_add_accounts(client, db_session, monkeypatch):
+    monkeypatch.setattr(settings, "SCRAPER_BATCH_SIZE", 2)
+    
+    # The scraper skips accounts it already tracks
+    async def post(path, json=None, **kwargs):
+        batch = [account["username"] for account in json["accounts"]]
+        return MockResponse({
+            "added": [username for username in batch if username != "existing"],
+            "skipped": [
+                {"username": username, "reason": "Account already exists"}
+                for username in batch if username == "existing"
+            ]
+        })
+    
+    with patch("app.services.scraper_service.get_scraper_client") as mock_get_client:
+        mock_client = MagicMock()
+        mock_client.post = AsyncMock(side_effect=post)
+        mock_get_client.return_value = mock_client
+        
+        usernames = ["alpha", "beta", "existing", "gamma", "alpha"]
+        response = client.post("/api/v1/scraper/accounts", json={"usernames": usernames})
+        
+        # Duplicates are dropped and the rest sent in batches of two
+        assert mock_client.post.call_count == 2
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "success"
+    assert sorted(data["added"]) == ["alpha", "beta", "gamma"]
+    assert data["skipped"][0]["username"] == "existing"
+    assert data["created_in_db"] == 3
+    
+    response = client.get("/api/v1/accounts/")
+    assert sorted(account["username"] for account in response.json()) == ["alpha", "beta", "gamma"]
+
+
+def test_trigger_scrape_enforces_min_interval(client, scrape_state):
+    with patch("app.services.scraper_service.get_scraper_client") as mock_get_client:
+        mock_client = MagicMock()
+        mock_client.post = AsyncMock(return_value=MockResponse({"status": "success", "message": "Scrape initiated"}))
+        mock_get_client.return_value = mock_client
+        
+        first = client.post("/api/v1/scraper/trigger").json()
+        second = client.post("/api/v1/scraper/trigger").json()
+        
+        # The second request reuses the first scrape instead of starting another
+        assert mock_client.post.call_count == 1
+        assert first["coalesced"] is False
+        assert second["coalesced"] is True
+        assert second["job_id"] == first["job_id"]
+        assert "retry_after_seconds" in second
+        
+        # Per-account scrapes are tracked in their own scope
+        other = client.post("/api/v1/scraper/trigger?username=test_account").json()
+        assert other["scope"] == "test_account"
+        assert other["job_id"] != first["job_id"]
+        assert mock_client.post.call_count == 2
+
+def test_concurrent_triggers_share_one_scrape(scrape_state):
+    calls = {"count": 0}
+    
+    async def slow_trigger(username=None):
+        calls["count"] += 1
+        await asyncio.sleep(0.05)
+        return {"status": "success", "message": "Scrape completed"}
+    
+    async def run():
+        return await asyncio.gather(
+            scrape_coordinator.coordinate_scrape(),
+            scrape_coordinator.coordinate_scrape(),
+            scrape_coordinator.coordinate_scrape("test_account")
+        )
+    
+    with patch("app.services.scraper_service.trigger_scrape", slow_trigger):
+        results = asyncio.run(run())
+    
+    # A running fleet-wide scrape also covers per-account requests
+    assert calls["count"] == 1
+    assert len({result["job_id"] for result in results}) == 1
+    assert [result["coalesced"] for result in results] == [False, True, True]
+
+def test_trigger_scrape_against_mock_scraper():
+    import httpx
+    import mock_scraper_server
+    
+    scraper_service.scraper_breaker.reset()
+    scraper = httpx.AsyncClient(transport=httpx.ASGITransport(app=mock_scraper_server.app), base_url="http://scraper")
+    
+    async def run():
+        try:
+            single = await scraper_service.trigger_scrape("instagram")
+            everything = await scraper_service.trigger_scrape()
+            unknown = await scraper_service.trigger_scrape("no_such_account")
+        finally:
+            await scraper.aclose()
+        return single, everything, unknown
+    
+    with patch("app.services.scraper_service.get_scraper_client", return_value=scraper):
+        single, everything, unknown = asyncio.run(run())
+    
+    # The mock scraper accepts the per-account body and limits the scrape to it
+    assert single["scraped"] == ["instagram"]
+    assert len(everything["scraped"]) == len(mock_scraper_server.profiles)
+    assert unknown["status"] == "error"
@@ -0,0 +1,74 @@
+from datetime import datetime, timedelta
+import os
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.services.ingest_service import ingest_profiles
+from app.services.profile_service import get_follower_series, get_profile_history
+from app.services import series_snapshot
+from app.services.series_snapshot import SeriesSnapshot, attach_snapshot, write_snapshot
+
+def _ingest(db_session, username, counts, start):
+    ingest_profiles(db_session, [
+        {
+            "username": username,
+            "follower_count": count,
+            "checked_at": (start + timedelta(hours=i)).isoformat()
+        }
+        for i, count in enumerate(counts)
+    ])
+
+def test_snapshot_round_trip_and_top_up(db_session, hot_store, tmp_path):
+    start = datetime.now() - timedelta(days=3)
+    _ingest(db_session, "mapped_one", [100, 110, 120], start)
+    _ingest(db_session, "mapped_two", [5, 4], start)
+
+    path = str(tmp_path / "series.bin")
+    assert write_snapshot(sessionmaker(bind=db_session.get_bind()), path) == {"accounts": 2, "points": 5}
+
+    snapshot = SeriesSnapshot(path)
+    timestamps, counts = snapshot.series("mapped_one")
+    assert list(counts) == [100, 110, 120]
+    assert timestamps.readonly
+    assert snapshot.series("unknown") is None
+
+    # Observations after the snapshot are read from the database on load
+    _ingest(db_session, "mapped_one", [130], start + timedelta(hours=10))
+    assert attach_snapshot(path) is not None
+    series = get_follower_series(db_session, "mapped_one", days=7)
+    history = get_profile_history(db_session, username="mapped_one", days=7)
+    assert series == [{"follower_count": p["follower_count"], "checked_at": p["checked_at"]} for p in history]
+    assert [p["follower_count"] for p in series] == [100, 110, 120, 130]
+
+    # Ingest into a mapped series, including out of order, keeps the mapping intact
+    _ingest(db_session, "mapped_one", [125], start + timedelta(hours=1, minutes=30))
+    series = get_follower_series(db_session, "mapped_one", days=7)
+    assert [p["follower_count"] for p in series] == [100, 110, 125, 120, 130]
+    assert list(snapshot.series("mapped_one")[1]) == [100, 110, 120]
+
+def test_attach_ignores_missing_or_invalid_files(hot_store, tmp_path):
+    assert attach_snapshot(str(tmp_path / "missing.bin")) is None
+    path = tmp_path / "invalid.bin"
+    path.write_bytes(b"not a snapshot")
+    assert attach_snapshot(str(path)) is None
+
+def test_only_the_elected_writer_writes(db_session, hot_store, tmp_path):
+    fcntl = pytest.importorskip("fcntl")
+    _ingest(db_session, "mapped_one", [100], datetime.now() - timedelta(days=1))
+    session_factory = sessionmaker(bind=db_session.get_bind())
+    path = str(tmp_path / "series.bin")
+
+    # Another worker holds the writer lock
+    with open(f"{path}.lock", "a") as other:
+        fcntl.flock(other, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        assert write_snapshot(session_factory, path) is None
+        assert not os.path.exists(path)
+
+    # Once it is gone this process takes over and keeps the lock
+    try:
+        assert write_snapshot(session_factory, path) == {"accounts": 1, "points": 1}
+        assert write_snapshot(session_factory, path) == {"accounts": 1, "points": 1}
+        assert sorted(os.listdir(tmp_path)) == ["series.bin", "series.bin.lock"]
+    finally:
+        series_snapshot._writer_locks.pop(path).close()
@@ -0,0 +1,116 @@
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, delete, insert, select
+from sqlalchemy.orm import sessionmaker
+
+# Add root directory to path so we can import app modules
+sys.path.insert(0, os.getcwd())
+
+from app.core.config import settings
+from app.db.session import Base
+from app.models.account import InstagramAccount
+from app.models.profile import InstagramProfile
+from app.services.analytics_service import get_growth_metrics
+
+ITERATIONS = int(os.getenv("BENCHMARK_ITERATIONS", "50"))
+ACCOUNTS = int(os.getenv("BENCHMARK_ACCOUNTS", "20"))
+SCRAPES_PER_DAY = int(os.getenv("BENCHMARK_SCRAPES_PER_DAY", "96"))
+DAYS = int(os.getenv("BENCHMARK_DAYS", "30"))
+# Database to benchmark on (e.g. a scratch PostgreSQL database); a temporary
+# SQLite file when empty. Seeded accounts are removed again afterwards.
+DATABASE_URL = os.getenv("BENCHMARK_DATABASE_URL", "")
+
+def seed(session_factory):
+    """
+    ACCOUNTS accounts with a snapshot every 24 / SCRAPES_PER_DAY hours over
+    the last DAYS days.
+    """
+    now = datetime.now()
+    step = timedelta(days=1) / SCRAPES_PER_DAY
+    db = session_factory()
+    try:
+        for number in range(ACCOUNTS):
+            account = InstagramAccount(username=f"bench_{number}", status="active")
+            db.add(account)
+            db.flush()
+            follower_count = 10000
+            rows = []
+            for position in range(DAYS * SCRAPES_PER_DAY):
+                follower_count += (position * 7 + number) % 11 - 4
+                rows.append({
+                    "account_id": account.id,
+                    "follower_count": follower_count,
+                    "checked_at": now - timedelta(days=DAYS) + step * position
+                })
+            db.execute(insert(InstagramProfile), rows)
+        db.commit()
+    finally:
+        db.close()
+
+def cleanup(session_factory):
+    """
+    Remove the seeded accounts and their snapshots.
+    """
+    db = session_factory()
+    try:
+        seeded = select(InstagramAccount.id).where(InstagramAccount.username.like("bench\\_%", escape="\\"))
+        db.execute(delete(InstagramProfile).where(InstagramProfile.account_id.in_(seeded)))
+        db.execute(delete(InstagramAccount).where(InstagramAccount.id.in_(seeded)))
+        db.commit()
+    finally:
+        db.close()
+
+def bench(session_factory, backend: str):
+    settings.ANALYTICS_BACKEND = backend
+    timings = []
+    db = session_factory()
+    try:
+        for iteration in range(ITERATIONS):
+            username = f"bench_{iteration % ACCOUNTS}"
+            start = time.perf_counter()
+            get_growth_metrics(db, username, days=DAYS, resolution="raw")
+            timings.append((time.perf_counter() - start) * 1000)
+    finally:
+        db.close()
+    return timings
+
+def summarize(label: str, timings):
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(
+        f"{label:<28} mean={statistics.mean(timings):7.2f}ms "
+        f"p50={statistics.median(timings):7.2f}ms p95={p95:7.2f}ms"
+    )
+
+def run(database_url: str):
+    engine = create_engine(database_url)
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    seed(session_factory)
+    try:
+        print(
+            f"Benchmarking {ITERATIONS} growth metric calls over {DAYS} days "
+            f"({DAYS * SCRAPES_PER_DAY} snapshots per account) on {engine.dialect.name}\n"
+        )
+        summarize("  python backend", bench(session_factory, "python"))
+        summarize("  sql backend", bench(session_factory, "sql"))
+    finally:
+        cleanup(session_factory)
+        engine.dispose()
+
+def main():
+    # Measure the database paths, not the in-process series cache
+    settings.HOT_STORE_ENABLED = False
+    if DATABASE_URL:
+        run(DATABASE_URL)
+        return
+    with tempfile.TemporaryDirectory() as directory:
+        run(f"sqlite:///{os.path.join(directory, 'benchmark.db')}")
+
+if __name__ == "__main__":
+    main()
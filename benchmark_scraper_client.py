@@ -0,0 +1,89 @@
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+# Add root directory to path so we can import app modules
+sys.path.insert(0, os.getcwd())
+
+from app.services.scraper_client import build_scraper_client
+
+SCRAPER_URL = os.getenv("SCRAPER_SERVICE_URL", "http://localhost:8001")
+ITERATIONS = int(os.getenv("BENCHMARK_ITERATIONS", "200"))
+
+async def wait_for_server(url: str, attempts: int = 50) -> bool:
+    async with httpx.AsyncClient(timeout=1.0) as client:
+        for _ in range(attempts):
+            try:
+                await client.get(f"{url}/")
+                return True
+            except httpx.HTTPError:
+                await asyncio.sleep(0.1)
+    return False
+
+async def bench_new_client_per_call(path: str):
+    """
+    Old behaviour: a brand-new AsyncClient (and connection) for every call.
+    """
+    timings = []
+    for _ in range(ITERATIONS):
+        start = time.perf_counter()
+        async with httpx.AsyncClient(timeout=10.0) as client:
+            response = await client.get(f"{SCRAPER_URL}{path}")
+            response.raise_for_status()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+async def bench_shared_client(path: str):
+    """
+    New behaviour: one pooled client reused for every call.
+    """
+    timings = []
+    client = build_scraper_client()
+    try:
+        # Warm up the pool so the first handshake is not counted
+        await client.get(path)
+        for _ in range(ITERATIONS):
+            start = time.perf_counter()
+            response = await client.get(path)
+            response.raise_for_status()
+            timings.append((time.perf_counter() - start) * 1000)
+    finally:
+        await client.aclose()
+    return timings
+
+def summarize(label: str, timings):
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(
+        f"{label:<28} mean={statistics.mean(timings):7.2f}ms "
+        f"p50={statistics.median(timings):7.2f}ms p95={p95:7.2f}ms"
+    )
+
+async def main():
+    server = None
+    if not await wait_for_server(SCRAPER_URL, attempts=1):
+        print(f"Starting mock scraper server for {SCRAPER_URL}...")
+        server = subprocess.Popen([sys.executable, "mock_scraper_server.py"])
+        if not await wait_for_server(SCRAPER_URL):
+            server.terminate()
+            print("Mock scraper server did not start")
+            return
+
+    try:
+        print(f"Benchmarking {ITERATIONS} calls per endpoint against {SCRAPER_URL}\n")
+        for path in ("/profiles", "/accounts"):
+            print(f"GET {path}")
+            summarize("  new client per call", await bench_new_client_per_call(path))
+            summarize("  shared pooled client", await bench_shared_client(path))
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -10,10 +10,88 @@ import json
 # Add root directory to path so we can import app modules
 sys.path.insert(0, os.getcwd())
 
+from app.core.utils.date_utils import to_local_naive
 from app.models.account import InstagramAccount
-from app.models.profile import InstagramProfile
+from app.services.ingest_service import ingest_profiles
 from app.db.session import Base
 
+def normalize_profile(profile_data):
+    """
+    Map a profile from the Scraper Service, whatever field names it uses, to
+    the payload ingest_profiles expects. Returns None if it has no username.
+    """
+    if isinstance(profile_data, str):
+        # Skip if profile is just a string
+        print(f"Skipping string profile: {profile_data}")
+        return None
+    
+    # Get username from profile data
+    if "username" in profile_data:
+        username = profile_data["username"]
+    elif "account" in profile_data and isinstance(profile_data["account"], dict):
+        username = profile_data["account"].get("username", "unknown")
+    elif "account" in profile_data and isinstance(profile_data["account"], str):
+        username = profile_data["account"]
+    else:
+        print(f"Could not determine username for profile: {profile_data}")
+        return None
+    
+    return {
+        "username": username,
+        "follower_count": profile_data.get("follower_count", profile_data.get("followers", 0)),
+        "profile_pic_url": profile_data.get("profile_pic_url", profile_data.get("profile_picture", "")),
+        "full_name": profile_data.get("full_name", profile_data.get("name", "")),
+        "biography": profile_data.get("biography", profile_data.get("bio", "")),
+        # Parsed (and converted to local time) by ingest_profiles
+        "checked_at": profile_data.get("checked_at", profile_data.get("timestamp"))
+    }
+
+def store_data(db, accounts_data, profiles_data):
+    """
+    Store fetched accounts, then ingest the profiles through ingest_profiles
+    so they get the same parsing, rollups and cache refreshes as any batch.
+    """
+    for account_data in accounts_data:
+        try:
+            if isinstance(account_data, str):
+                # Handle case where account is just a string (username)
+                username = account_data
+                status = "active"
+                created_at = datetime.now()
+            else:
+                # Handle dictionary format
+                username = account_data.get("username", "unknown")
+                status = account_data.get("status", "active")
+                created_at_str = account_data.get("created_at")
+                if created_at_str:
+                    try:
+                        created_at = to_local_naive(datetime.fromisoformat(created_at_str.replace("Z", "+00:00")))
+                    except Exception:
+                        created_at = datetime.now()
+                else:
+                    created_at = datetime.now()
+            
+            # Check if account already exists
+            existing = db.query(InstagramAccount).filter_by(username=username).first()
+            if not existing:
+                account = InstagramAccount(
+                    username=username,
+                    status=status,
+                    created_at=created_at
+                )
+                db.add(account)
+                print(f"Added account: {username}")
+            else:
+                print(f"Account already exists: {username}")
+        except Exception as e:
+            print(f"Error processing account: {e}, data: {account_data}")
+    
+    # Commit to get account IDs
+    db.commit()
+    
+    profiles = [profile for profile in map(normalize_profile, profiles_data) if profile is not None]
+    return ingest_profiles(db, profiles)
+
 async def fetch_and_store_data():
     print("Fetching data from Scraper Service...")
     scraper_url = os.getenv("SCRAPER_SERVICE_URL")
@@ -82,128 +160,8 @@ async def fetch_and_store_data():
         if profiles_data:
             print(f"First profile sample: {json.dumps(profiles_data[0], indent=2)}")
         
-        # Store accounts
-        for account_data in accounts_data:
-            try:
-                if isinstance(account_data, str):
-                    # Handle case where account is just a string (username)
-                    username = account_data
-                    status = "active"
-                    created_at = datetime.now()
-                else:
-                    # Handle dictionary format
-                    username = account_data.get("username", "unknown")
-                    status = account_data.get("status", "active")
-                    created_at_str = account_data.get("created_at")
-                    if created_at_str:
-                        try:
-                            created_at = datetime.fromisoformat(created_at_str.replace("Z", "+00:00"))
-                        except Exception:
-                            created_at = datetime.now()
-                    else:
-                        created_at = datetime.now()
-                
-                # Check if account already exists
-                existing = db.query(InstagramAccount).filter_by(username=username).first()
-                if not existing:
-                    account = InstagramAccount(
-                        username=username,
-                        status=status,
-                        created_at=created_at
-                    )
-                    db.add(account)
-                    print(f"Added account: {username}")
-                else:
-                    print(f"Account already exists: {username}")
-            except Exception as e:
-                print(f"Error processing account: {e}, data: {account_data}")
-        
-        # Commit to get account IDs
-        db.commit()
-        
-        # Store profiles
-        for profile_data in profiles_data:
-            try:
-                if isinstance(profile_data, str):
-                    # Skip if profile is just a string
-                    print(f"Skipping string profile: {profile_data}")
-                    continue
-                
-                # Get username from profile data
-                if "username" in profile_data:
-                    username = profile_data["username"]
-                elif "account" in profile_data and isinstance(profile_data["account"], dict):
-                    username = profile_data["account"].get("username", "unknown")
-                elif "account" in profile_data and isinstance(profile_data["account"], str):
-                    username = profile_data["account"]
-                else:
-                    print(f"Could not determine username for profile: {profile_data}")
-                    continue
-                
-                # Get follower count
-                follower_count = 0
-                if "follower_count" in profile_data:
-                    follower_count = profile_data["follower_count"]
-                elif "followers" in profile_data:
-                    follower_count = profile_data["followers"]
-                
-                # Get profile pic URL
-                profile_pic_url = ""
-                if "profile_pic_url" in profile_data:
-                    profile_pic_url = profile_data["profile_pic_url"]
-                elif "profile_picture" in profile_data:
-                    profile_pic_url = profile_data["profile_picture"]
-                
-                # Get full name
-                full_name = ""
-                if "full_name" in profile_data:
-                    full_name = profile_data["full_name"]
-                elif "name" in profile_data:
-                    full_name = profile_data["name"]
-                
-                # Get biography
-                biography = ""
-                if "biography" in profile_data:
-                    biography = profile_data["biography"]
-                elif "bio" in profile_data:
-                    biography = profile_data["bio"]
-                
-                # Get checked_at time
-                checked_at = datetime.now()
-                if "checked_at" in profile_data:
-                    try:
-                        checked_at_str = profile_data["checked_at"]
-                        checked_at = datetime.fromisoformat(checked_at_str.replace("Z", "+00:00"))
-                    except Exception:
-                        pass
-                elif "timestamp" in profile_data:
-                    try:
-                        timestamp_str = profile_data["timestamp"]
-                        checked_at = datetime.fromisoformat(timestamp_str.replace("Z", "+00:00"))
-                    except Exception:
-                        pass
-                
-                # Get account ID
-                account = db.query(InstagramAccount).filter_by(username=username).first()
-                if account:
-                    # Create profile
-                    profile = InstagramProfile(
-                        account_id=account.id,
-                        follower_count=follower_count,
-                        profile_pic_url=profile_pic_url,
-                        full_name=full_name,
-                        biography=biography,
-                        checked_at=checked_at
-                    )
-                    db.add(profile)
-                    print(f"Added profile for: {username}")
-                else:
-                    print(f"Account not found for profile: {username}")
-            except Exception as e:
-                print(f"Error processing profile: {e}, data: {profile_data}")
-        
-        # Final commit
-        db.commit()
+        result = store_data(db, accounts_data, profiles_data)
+        print(f"Stored {result['ingested']} profiles ({result['accounts_created']} new accounts)")
         print("Data import complete!")
         
     except Exception as e:
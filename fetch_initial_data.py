@@ -10,7 +10,7 @@ import os
 sys.path.insert(0, os.getcwd())
 
 from app.models.account import InstagramAccount
-from app.models.profile import InstagramProfile
+from app.services.ingest_service import ingest_profiles
 from app.db.session import Base
 
 async def fetch_and_store_data():
@@ -61,28 +61,9 @@ async def fetch_and_store_data():
         # Commit to get account IDs
         db.commit()
         
-        # Store profiles
-        for profile_data in profiles_data:
-            username = profile_data.get("username")
-            # Get account ID
-            account = db.query(InstagramAccount).filter_by(username=username).first()
-            if account:
-                # Create profile
-                profile = InstagramProfile(
-                    account_id=account.id,
-                    follower_count=profile_data.get("follower_count", 0),
-                    profile_pic_url=profile_data.get("profile_pic_url", ""),
-                    full_name=profile_data.get("full_name", ""),
-                    biography=profile_data.get("biography", ""),
-                    checked_at=datetime.fromisoformat(profile_data.get("checked_at")) if "checked_at" in profile_data else datetime.now()
-                )
-                db.add(profile)
-                print(f"Added profile for: {username}")
-            else:
-                print(f"Account not found for profile: {username}")
-        
-        # Final commit
-        db.commit()
+        # Store profiles (creates accounts the scraper did not list)
+        result = ingest_profiles(db, profiles_data)
+        print(f"Stored {result['ingested']} profiles ({result['accounts_created']} new accounts)")
         print("Data import complete!")
         
     except Exception as e:
@@ -0,0 +1,8 @@
+# Script to apply pending schema migrations to the configured database
+from app.db.session import engine
+from app.core.utils.db_migrations import run_migrations
+
+if __name__ == "__main__":
+    print("Applying database migrations...")
+    run_migrations(engine)
+    print("Database migrations complete.")
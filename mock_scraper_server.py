@@ -1,11 +1,49 @@
-﻿from fastapi import FastAPI
+﻿from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
+import asyncio
+import os
+import random
 import uvicorn
 from datetime import datetime
 
 app = FastAPI(title="Mock Scraper Service")
 
+# Fault injection for resilience testing. Configure at startup through
+# environment variables or at runtime through POST /fault.
+fault_config = {
+    "failure_rate": float(os.getenv("MOCK_FAULT_RATE", "0")),
+    "latency_seconds": float(os.getenv("MOCK_FAULT_LATENCY", "0")),
+    "status_code": int(os.getenv("MOCK_FAULT_STATUS", "503")),
+}
+
+class FaultConfig(BaseModel):
+    failure_rate: float = 0.0
+    latency_seconds: float = 0.0
+    status_code: int = 503
+
+@app.middleware("http")
+async def inject_faults(request: Request, call_next):
+    if request.url.path != "/fault":
+        if fault_config["latency_seconds"] > 0:
+            await asyncio.sleep(fault_config["latency_seconds"])
+        if random.random() < fault_config["failure_rate"]:
+            return JSONResponse(
+                status_code=fault_config["status_code"],
+                content={"status": "error", "message": "Injected fault"}
+            )
+    return await call_next(request)
+
+@app.get("/fault")
+async def get_fault():
+    return fault_config
+
+@app.post("/fault")
+async def set_fault(config: FaultConfig):
+    fault_config.update(config.model_dump())
+    return fault_config
+
 # Sample data
 accounts = [
     {"username": "instagram", "status": "active", "created_at": "2023-01-01T00:00:00"},
@@ -34,6 +72,9 @@ profiles = [
 class AccountCreate(BaseModel):
     username: str
 
+class AccountsCreate(BaseModel):
+    accounts: List[AccountCreate]
+
 @app.get("/")
 async def root():
     return {"message": "Mock Scraper Service"}
@@ -47,37 +88,78 @@ async def get_profiles():
     return profiles
 
 @app.post("/accounts")
-async def add_account(account: AccountCreate):
-    new_account = {
-        "username": account.username,
-        "status": "active",
-        "created_at": datetime.now().isoformat()
-    }
-    accounts.append(new_account)
+async def add_accounts(request: AccountsCreate):
+    # Matches the real scraper API: a list payload with added/skipped arrays
+    added, skipped = [], []
+    for account in request.accounts:
+        if any(existing["username"] == account.username for existing in accounts):
+            skipped.append({"username": account.username, "reason": "Account already exists"})
+            continue
+        
+        accounts.append({
+            "username": account.username,
+            "status": "active",
+            "created_at": datetime.now().isoformat()
+        })
+        
+        # Also add a profile
+        profiles.append({
+            "username": account.username,
+            "follower_count": 10000,
+            "profile_pic_url": f"https://example.com/{account.username}.jpg",
+            "full_name": account.username.capitalize(),
+            "biography": f"This is {account.username}'s account",
+            "checked_at": datetime.now().isoformat()
+        })
+        added.append(account.username)
     
-    # Also add a profile
-    new_profile = {
-        "username": account.username,
-        "follower_count": 10000,
-        "profile_pic_url": f"https://example.com/{account.username}.jpg",
-        "full_name": account.username.capitalize(),
-        "biography": f"This is {account.username}'s account",
-        "checked_at": datetime.now().isoformat()
-    }
-    profiles.append(new_profile)
+    return {"added": added, "skipped": skipped}
+
+@app.delete("/accounts/{username}")
+async def delete_account(username: str):
+    for account in accounts:
+        if account["username"] == username:
+            accounts.remove(account)
+            profiles[:] = [profile for profile in profiles if profile["username"] != username]
+            return {"message": f"Account '{username}' and all associated profile data deleted successfully"}
     
-    return new_account
+    return JSONResponse(
+        status_code=404,
+        content={"status": "error", "message": f"Account '{username}' not found"}
+    )
+
+class ScrapeRequest(BaseModel):
+    # Body sent by trigger_scrape for a per-account scrape: {"usernames": [...]}.
+    # This mirrors the Logic Service's own payload, not a documented schema
+    # of the real scraper
+    model_config = {"extra": "forbid"}
+    
+    usernames: List[str]
 
 @app.post("/scrape-accounts")
-async def scrape_accounts():
+async def scrape_accounts(request: Optional[ScrapeRequest] = None):
+    # Without a body every account is scraped; otherwise only the listed ones
+    if request is not None:
+        if not request.usernames:
+            return JSONResponse(status_code=422, content={"status": "error", "message": "usernames must not be empty"})
+        unknown = [username for username in request.usernames if not any(p["username"] == username for p in profiles)]
+        if unknown:
+            return JSONResponse(
+                status_code=404,
+                content={"status": "error", "message": f"Accounts not found: {', '.join(unknown)}"}
+            )
+    
     # Simulate scraping by updating the checked_at time
+    scraped = []
     for profile in profiles:
+        if request is not None and profile["username"] not in request.usernames:
+            continue
         profile["checked_at"] = datetime.now().isoformat()
         # Add a small random change to follower count
-        import random
         profile["follower_count"] += random.randint(-100, 500)
+        scraped.append(profile["username"])
     
-    return {"status": "success", "message": "Scrape completed successfully"}
+    return {"status": "success", "message": "Scrape completed successfully", "scraped": scraped}
 
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8001)